@@ -5,27 +5,47 @@ GUI主界面
 功能：提供图形用户界面
 """
 
+import importlib
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pandas as pd
 
 # 修正导入路径 - modules 在项目根目录下
 from modules.symbolic_calc import SymbolicCalculator
 from modules.numerical_calc import NumericalCalculator
 from modules.data_processing import DataProcessor
 from modules.visualization import DataVisualizer
+from modules.spectrum import SpectrumAnalyzer
 # excel_handler 在 utils 文件夹中
 from utils.excel_handler import ExcelHandler
+from utils.sandbox import SandboxPool
+from utils.lazy_import import lazy_import, startup_phase, startup_report
+
+pd = lazy_import('pandas')
+
+# 各个功能选项卡：(属性名 / ui_components中的模块名, 类名, 标题)，按显示顺序排列
+# 选项卡在第一次被选中（或被其他选项卡访问）时才导入并构建
+TABS = [
+    ('symbolic_tab', 'SymbolicTab', "符号计算"),
+    ('numerical_tab', 'NumericalTab', "数值计算"),
+    ('data_processing_tab', 'DataProcessingTab', "数据处理"),
+    ('visualization_tab', 'VisualizationTab', "数据可视化"),
+    ('excel_tab', 'ExcelTab', "Excel处理"),
+]
+
+
+class _LazyTabFrame(ttk.Frame):
+    """选项卡占位框架
+    
+    选项卡类会在父容器中创建自己的框架并调用 parent.add(frame, text=...)，
+    占位框架提供同名方法，把选项卡框架铺满自身。
+    """
+    
+    def add(self, child, **kwargs):
+        child.pack(fill=tk.BOTH, expand=True)
 
-# 导入各个功能模块的UI和处理器
-from .ui_components.symbolic_tab import SymbolicTab
-from .ui_components.numerical_tab import NumericalTab
-from .ui_components.data_processing_tab import DataProcessingTab
-from .ui_components.visualization_tab import VisualizationTab
-from .ui_components.excel_tab import ExcelTab
 
 class ScientificCalculatorGUI:
-    def __init__(self):
+    def __init__(self, show_startup_report=False):
         self.root = tk.Tk()
         self.root.title("科学计算器")
         self.root.geometry("1200x800")
@@ -34,18 +54,57 @@ class ScientificCalculatorGUI:
         # 设置现代简约样式
         self.setup_modern_style()
         
-        # 初始化计算模块
-        self.symbolic_calc = SymbolicCalculator()
-        self.numerical_calc = NumericalCalculator()
-        self.data_processor = DataProcessor()
-        self.visualizer = DataVisualizer()
-        self.excel_handler = ExcelHandler()
+        # 初始化计算模块（重量级依赖在第一次计算时才导入）
+        with startup_phase('初始化计算模块'):
+            # 数值表达式求值放到沙箱工作进程中，失控的输入只会超时而不会卡死界面；
+            # 工作进程启动时在后台预先导入计算模块，超时从预热完成后开始计算
+            self.sandbox = SandboxPool(size=2, timeout=10.0, memory_limit_mb=2048,
+                                       warm_imports=('numpy', 'sympy', 'scipy.integrate', 'scipy.optimize',
+                                                     'modules.numerical_calc', 'modules.symbolic_calc'))
+            self.symbolic_calc = SymbolicCalculator()
+            self.numerical_calc = NumericalCalculator()
+            self.data_processor = DataProcessor()
+            self.visualizer = DataVisualizer(sandbox=self.sandbox)
+            self.excel_handler = ExcelHandler()
+            self.spectrum_analyzer = SpectrumAnalyzer(self.visualizer.compile_bridge)
         
         # 当前数据
         self.current_data = None
+        self.show_startup_report = show_startup_report
         
         # 设置UI
-        self.setup_ui()
+        with startup_phase('创建主窗口'):
+            self.setup_ui()
+    
+    def __getattr__(self, name):
+        # 尚未构建的选项卡在第一次访问时构建
+        if name in self._tab_names():
+            return self.build_tab(name)
+        raise AttributeError(name)
+    
+    @staticmethod
+    def _tab_names():
+        return [attr for attr, _, _ in TABS]
+    
+    def build_tab(self, name):
+        """导入并构建选项卡，已构建时直接返回"""
+        if name in self.__dict__:
+            return self.__dict__[name]
+        index = self._tab_names().index(name)
+        _, class_name, title = TABS[index]
+        with startup_phase(f'构建选项卡 {title}'):
+            module = importlib.import_module(f'.ui_components.{name}', __package__)
+            tab = getattr(module, class_name)(self.tab_frames[index], self)
+        setattr(self, name, tab)
+        return tab
+    
+    def on_tab_changed(self, event=None):
+        """切换选项卡时构建尚未构建的选项卡"""
+        index = self.notebook.index('current')
+        self.build_tab(TABS[index][0])
+        if self.show_startup_report:
+            self.show_startup_report = False
+            print(startup_report())
     
     
     def append_to_current_data(self, new_data_dict):
@@ -162,12 +221,15 @@ class ScientificCalculatorGUI:
         self.notebook = ttk.Notebook(main_container)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
-        # 创建各个选项卡
-        self.symbolic_tab = SymbolicTab(self.notebook, self)
-        self.numerical_tab = NumericalTab(self.notebook, self)
-        self.data_processing_tab = DataProcessingTab(self.notebook, self)
-        self.visualization_tab = VisualizationTab(self.notebook, self)
-        self.excel_tab = ExcelTab(self.notebook, self)
+        # 创建各个选项卡的占位框架，内容在第一次选中时构建
+        self.tab_frames = []
+        for _, _, title in TABS:
+            frame = _LazyTabFrame(self.notebook)
+            self.notebook.add(frame, text=title)
+            self.tab_frames.append(frame)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        # 窗口显示后构建默认选中的选项卡
+        self.root.after_idle(self.on_tab_changed)
     
     def save_excel_data(self):
         """保存Excel数据"""
@@ -188,8 +250,16 @@ class ScientificCalculatorGUI:
     
     def run(self):
         """运行GUI应用"""
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.root.mainloop()
     
+    def on_close(self):
+        """关闭窗口时结束后台工作进程"""
+        self.sandbox.shutdown()
+        self.numerical_calc.shutdown()
+        self.symbolic_calc.shutdown()
+        self.root.destroy()
+    
     def append_to_current_data(self, new_data_dict):
         """累积保存操作结果到current_data"""
         new_df = pd.DataFrame(new_data_dict)
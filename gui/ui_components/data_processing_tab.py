@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
+
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
 
 class DataProcessingTab:
     def __init__(self, parent, main_window):
@@ -192,8 +195,8 @@ class DataProcessingTab:
                 self.data_result_text.insert(tk.END, f"错误: {result}")
                 return
             
-            # 绘制拟合图像
-            plot_result = self.main_window.visualizer.plot_curve_fitting(x_data, y_data, fit_type)
+            # 绘制拟合图像，直接使用上面的拟合结果
+            plot_result = self.main_window.visualizer.plot_curve_fitting(x_data, y_data, fit_type, fit_result=result)
             self.data_result_text.insert(tk.END, f"\n图像: {plot_result}")
             
         except Exception as e:
@@ -1,8 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pandas as pd
+
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
 
 class ExcelTab:
+    # 数据点数超过该值时改用Welch分段平均
+    welch_threshold = 8192
+    welch_segment_length = 2048
+    
     def __init__(self, parent, main_window):
         self.main_window = main_window
         self.frame = ttk.Frame(parent)
@@ -49,7 +56,12 @@ class ExcelTab:
         
         ttk.Button(button_container1, text="导入到数值计算", command=self.import_to_numerical, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(button_container1, text="导入到数据处理", command=self.import_to_data_processing, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
-        ttk.Button(button_container1, text="导入到可视化", command=self.import_to_visualization, style='Modern.TButton').pack(side=tk.LEFT)
+        ttk.Button(button_container1, text="导入到可视化", command=self.import_to_visualization, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(button_container1, text="频谱分析", command=self.spectrum_analysis, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Label(button_container1, text="采样率:", style='Modern.TLabel').pack(side=tk.LEFT, padx=(0, 5))
+        self.sample_rate_entry = ttk.Entry(button_container1, width=8, style='Modern.TEntry')
+        self.sample_rate_entry.pack(side=tk.LEFT)
+        self.sample_rate_entry.insert(0, "1.0")
         
         # 第二行
         ttk.Label(operation_content, text="X列:", style='Modern.TLabel').grid(row=1, column=0, sticky=tk.W, padx=(0, 10), pady=8)
@@ -62,6 +74,18 @@ class ExcelTab:
         
         ttk.Button(operation_content, text="导入XY数据", command=self.import_xy_data, style='Modern.TButton').grid(row=1, column=4, padx=0, pady=8)
         
+        # 第三行：对所有数值列的整表运算
+        button_container2 = ttk.Frame(operation_content)
+        button_container2.grid(row=2, column=0, columnspan=5, padx=0, pady=8, sticky=tk.W)
+        
+        ttk.Button(button_container2, text="列统计", command=self.column_statistics, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(button_container2, text="整表统计", command=self.table_statistics, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(button_container2, text="相关矩阵", command=self.correlation_matrix, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
+        self.correlation_method_combo = ttk.Combobox(button_container2, width=10, state='readonly',
+                                                     values=['pearson', 'spearman', 'kendall'], style='Modern.TCombobox')
+        self.correlation_method_combo.pack(side=tk.LEFT)
+        self.correlation_method_combo.set('pearson')
+        
         # 计算功能框架
         # 删除整个计算功能框架
         # calc_frame = ttk.LabelFrame(main_container, text="Excel数据计算")
@@ -260,6 +284,173 @@ class ExcelTab:
         else:
             messagebox.showwarning("警告", "请选择有效的列")
     
+    def column_statistics(self):
+        """对选中的列做流式统计：直接按块读取文件，不需要把整个文件读入内存"""
+        if not hasattr(self.main_window, 'excel_file_path'):
+            messagebox.showwarning("警告", "请先选择Excel文件")
+            return
+        
+        column = self.column_combo.get()
+        if not column:
+            messagebox.showwarning("警告", "请选择要统计的列")
+            return
+        
+        result = self.main_window.data_processor.file_statistics(self.main_window.excel_file_path, column)
+        if isinstance(result, str):
+            messagebox.showerror("错误", result)
+            return
+        
+        lower, _, upper = result.pop('四分位数')
+        table = pd.DataFrame([{'列名': column, **result, '下四分位数': lower, '上四分位数': upper}])
+        self.show_result_table(table, f"列统计（{column}）")
+    
+    def table_statistics(self):
+        """一次统计当前数据的所有数值列，结果在单独的窗口中显示"""
+        if self.main_window.current_data is None:
+            if not hasattr(self.main_window, 'excel_file_path'):
+                messagebox.showwarning("警告", "请先选择Excel文件")
+                return
+            self.read_excel_data()
+            if self.main_window.current_data is None:
+                return  # 读取失败
+        
+        result = self.main_window.data_processor.table_statistics(self.main_window.current_data)
+        if isinstance(result, str):
+            messagebox.showerror("错误", result)
+            return
+        self.show_result_table(result, f"整表统计（{len(result)} 个数值列）")
+    
+    def correlation_matrix(self, event=None):
+        """计算所有数值列的相关系数矩阵，在数据可视化选项卡中画热力图并显示数值表"""
+        if self.main_window.current_data is None:
+            if not hasattr(self.main_window, 'excel_file_path'):
+                messagebox.showwarning("警告", "请先选择Excel文件")
+                return
+            self.read_excel_data()
+            if self.main_window.current_data is None:
+                return  # 读取失败
+        
+        method = self.correlation_method_combo.get() or 'pearson'
+        result = self.main_window.data_processor.correlation_matrix(self.main_window.current_data, method)
+        if isinstance(result, str):
+            messagebox.showerror("错误", result)
+            return
+        
+        visualization_tab = self.main_window.visualization_tab
+        plot_result = self.main_window.visualizer.plot_heatmap(result['相关系数'], title=f"相关系数矩阵 ({method})")
+        if plot_result.startswith('错误'):
+            messagebox.showerror("错误", plot_result)
+            return
+        self.main_window.notebook.select(visualization_tab.frame.master)
+        
+        # 长表：每对列一行，便于查看和保存p值
+        corr, p_values = result['相关系数'], result['p值']
+        columns = list(corr.columns)
+        pairs = [(a, b) for i, a in enumerate(columns) for b in columns[i + 1:]]
+        table = pd.DataFrame({
+            '列1': [a for a, _ in pairs],
+            '列2': [b for _, b in pairs],
+            '相关系数': [corr.at[a, b] for a, b in pairs],
+            'p值': [p_values.at[a, b] for a, b in pairs],
+            '样本数': [result['样本数'].at[a, b] for a, b in pairs],
+        })
+        self.show_result_table(table, f"相关系数矩阵（{method}，{len(columns)} 列）")
+    
+    def show_result_table(self, df, title):
+        """在新窗口中以表格显示结果DataFrame，可另存为Excel"""
+        window = tk.Toplevel(self.frame)
+        window.title(title)
+        window.geometry("900x500")
+        
+        content = ttk.Frame(window)
+        content.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
+        
+        button_row = ttk.Frame(content)
+        button_row.pack(fill=tk.X, pady=(0, 10))
+        ttk.Button(button_row, text="保存为Excel", command=lambda: self.save_result_table(df),
+                   style='Modern.TButton').pack(side=tk.LEFT)
+        
+        tree_frame = ttk.Frame(content)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        tree = ttk.Treeview(tree_frame, columns=list(map(str, df.columns)), show='headings')
+        scrollbar_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        scrollbar_x = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=tree.xview)
+        tree.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
+        scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
+        scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        for col in df.columns:
+            tree.heading(str(col), text=str(col))
+            tree.column(str(col), width=100)
+        for row in df.itertuples(index=False):
+            tree.insert('', 'end', values=[f"{v:.6g}" if isinstance(v, float) else v for v in row])
+    
+    def save_result_table(self, df):
+        """把结果表格保存为Excel文件"""
+        file_path = filedialog.asksaveasfilename(
+            title="保存Excel文件",
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")]
+        )
+        if file_path:
+            result = self.main_window.excel_handler.save_excel(df, file_path)
+            if result == "保存成功":
+                messagebox.showinfo("成功", f"数据已保存到: {file_path}")
+            else:
+                messagebox.showerror("错误", result)
+    
+    def spectrum_analysis(self):
+        """对选中列做频谱分析并在数据可视化选项卡中绘制
+        
+        短信号直接画加窗幅度谱和相位，长信号用Welch分段平均画功率谱密度。
+        """
+        if not hasattr(self.main_window, 'excel_file_path'):
+            messagebox.showwarning("警告", "请先选择Excel文件")
+            return
+        
+        if self.main_window.current_data is None:
+            self.read_excel_data()
+            if self.main_window.current_data is None:
+                return  # 读取失败
+        
+        column = self.column_combo.get()
+        if not column or column not in self.main_window.current_data.columns:
+            messagebox.showwarning("警告", "请选择有效的列")
+            return
+        try:
+            sample_rate = float(self.sample_rate_entry.get())
+        except ValueError:
+            messagebox.showwarning("警告", "采样率应为数字")
+            return
+        
+        data = self.main_window.excel_handler.export_column_to_list(self.main_window.current_data, column)
+        if not data:
+            messagebox.showwarning("警告", "选择的列没有有效数据")
+            return
+        
+        analyzer = self.main_window.spectrum_analyzer
+        if len(data) > self.welch_threshold:
+            result = analyzer.welch_spectrum(data, sample_rate, segment_length=self.welch_segment_length)
+        else:
+            result = analyzer.data_spectrum(data, sample_rate)
+        if isinstance(result, str):
+            messagebox.showerror("错误", result)
+            return
+        
+        visualization_tab = self.main_window.visualization_tab
+        if '功率谱密度' in result:
+            plot_result = self.main_window.visualizer.plot_spectrum(
+                result['频率'], result['功率谱密度'], title=f"{column} 的功率谱密度 (Welch, {result['段数']} 段)",
+                ylabel="功率谱密度", log_scale=True)
+        else:
+            plot_result = self.main_window.visualizer.plot_spectrum(
+                result['频率'], result['幅值'], result['相位'], title=f"{column} 的幅度谱")
+        if plot_result.startswith('错误'):
+            messagebox.showerror("错误", plot_result)
+            return
+        self.main_window.notebook.select(visualization_tab.frame.master)
+    
     def import_xy_data(self):
         """导入XY数据到相关模块"""
         # 检查是否选择了文件
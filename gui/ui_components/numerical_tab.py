@@ -1,10 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
+
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 class NumericalTab:
+    # 方程组求解的超时（秒）：符号求解限时5秒，之后还要做多起点数值求根
+    system_timeout = 60.0
+    
     def __init__(self, parent, main_window):
         self.main_window = main_window
+        # 正在沙箱中进行的计算：(SandboxJob, 结果回调)
+        self.current_job = None
         self.frame = ttk.Frame(parent)
         parent.add(self.frame, text="数值计算")
         self.create_ui()
@@ -60,6 +69,13 @@ class NumericalTab:
         ttk.Button(button_frame2, text="数值积分", command=self.numerical_integrate, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(button_frame2, text="求解方程", command=self.numerical_solve, style='Modern.TButton').pack(side=tk.LEFT)
         
+        # 第三行：常微分方程初值问题，函数框为 ; 分隔的右端表达式，变量框为状态变量，点/范围框为时间区间
+        ttk.Label(advanced_content, text="初值:", style='Modern.TLabel').grid(row=2, column=0, sticky=tk.W, padx=(0, 10), pady=8)
+        self.numerical_initial_entry = ttk.Entry(advanced_content, width=25, style='Modern.TEntry')
+        self.numerical_initial_entry.grid(row=2, column=1, padx=(0, 15), pady=8)
+        
+        ttk.Button(advanced_content, text="解微分方程", command=self.numerical_solve_ode, style='Modern.TButton').grid(row=2, column=2, columnspan=2, padx=0, pady=8, sticky=tk.W)
+        
         # 结果显示框架
         result_frame = ttk.LabelFrame(main_container, text="结果")
         result_frame.pack(fill=tk.BOTH, expand=True)
@@ -81,17 +97,53 @@ class NumericalTab:
         self.numerical_result_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         numerical_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
     
-    def numerical_calculate(self):
-        """执行基本数值计算"""
+    def run_numerical(self, operation, *args, on_result, description, timeout=None,
+                      target='modules.numerical_calc:NumericalCalculator', **kwargs):
+        """把计算模块（默认NumericalCalculator）的方法提交到沙箱工作进程，不阻塞界面
+        
+        计算完成后在界面线程中调用 on_result(result)；沙箱出错（超时、进程异常）时显示错误信息。
+        """
+        if self.current_job is not None:
+            messagebox.showwarning("计算中", "已有计算正在进行，请等待完成")
+            return
         try:
-            expression = self.numerical_expr_entry.get()
-            if not expression:
-                messagebox.showwarning("输入错误", "请输入表达式")
-                return
-                
-            result = self.main_window.numerical_calc.evaluate_expression(expression)
-            
+            job = self.main_window.sandbox.submit(target, operation, *args, timeout=timeout, **kwargs)
+        except Exception as e:
+            self.numerical_result_text.delete(1.0, tk.END)
+            self.numerical_result_text.insert(tk.END, f"错误: {str(e)}")
+            return
+        
+        self.current_job = (job, on_result)
+        self.numerical_result_text.delete(1.0, tk.END)
+        self.numerical_result_text.insert(tk.END, f"正在计算: {description} ...\n")
+        self.frame.after(100, self.poll_job)
+    
+    def poll_job(self):
+        """定时检查后台计算是否完成"""
+        if self.current_job is None:
+            return
+        job, on_result = self.current_job
+        if not job.done():
+            self.frame.after(100, self.poll_job)
+            return
+        
+        self.current_job = None
+        try:
+            result = job.result()
+            self.numerical_result_text.delete(1.0, tk.END)
+            on_result(result)
+        except Exception as e:
             self.numerical_result_text.delete(1.0, tk.END)
+            self.numerical_result_text.insert(tk.END, f"错误: {str(e)}")
+    
+    def numerical_calculate(self):
+        """执行基本数值计算"""
+        expression = self.numerical_expr_entry.get()
+        if not expression:
+            messagebox.showwarning("输入错误", "请输入表达式")
+            return
+        
+        def show(result):
             self.numerical_result_text.insert(tk.END, f"表达式: {expression}\n")
             self.numerical_result_text.insert(tk.END, f"计算结果: {result}\n")
             
@@ -102,26 +154,33 @@ class NumericalTab:
                 '操作类型': ['数值计算']
             }
             self.main_window.append_to_current_data(result_data)
-            
-        except Exception as e:
-            self.numerical_result_text.delete(1.0, tk.END)
-            self.numerical_result_text.insert(tk.END, f"错误: {str(e)}")
+        
+        self.run_numerical('evaluate_expression', expression, on_result=show, description=expression)
     
     def numerical_derivative(self):
         """执行数值求导"""
+        func_str = self.numerical_func_entry.get()
+        var = self.numerical_var_entry.get() or 'x'
+        point_str = self.numerical_point_entry.get()
+        
+        if not func_str or not point_str:
+            messagebox.showwarning("输入错误", "请输入函数和求导点")
+            return
+        
         try:
-            func_str = self.numerical_func_entry.get()
-            var = self.numerical_var_entry.get() or 'x'
-            point_str = self.numerical_point_entry.get()
-            
-            if not func_str or not point_str:
-                messagebox.showwarning("输入错误", "请输入函数和求导点")
-                return
-                
-            point = float(point_str)
-            result = self.main_window.numerical_calc.numerical_derivative(func_str, var, point)
+            # 多个求导点用逗号分隔，一次向量化计算
+            if ',' in point_str:
+                point = [float(p.strip()) for p in point_str.split(',') if p.strip()]
+            else:
+                point = float(point_str)
+        except ValueError:
+            messagebox.showerror("错误", "求导点格式错误，请输入数值或用逗号分隔的多个数值")
+            return
+        
+        def show(result):
+            if not isinstance(result, (str, float)):
+                result = result.tolist()
             
-            self.numerical_result_text.delete(1.0, tk.END)
             self.numerical_result_text.insert(tk.END, f"函数: {func_str}\n")
             self.numerical_result_text.insert(tk.END, f"变量: {var}\n")
             self.numerical_result_text.insert(tk.END, f"求导点: {point}\n")
@@ -136,35 +195,42 @@ class NumericalTab:
                 '操作类型': ['数值求导']
             }
             self.main_window.append_to_current_data(result_data)
-            
-        except Exception as e:
-            self.numerical_result_text.delete(1.0, tk.END)
-            self.numerical_result_text.insert(tk.END, f"错误: {str(e)}")
+        
+        self.run_numerical('numerical_derivative', func_str, var, point, on_result=show,
+                           description=f"d({func_str})/d{var}")
     
     def numerical_integrate(self):
         """执行数值积分"""
-        try:
-            func_str = self.numerical_func_entry.get()
-            var = self.numerical_var_entry.get() or 'x'
-            range_str = self.numerical_point_entry.get()
+        func_str = self.numerical_func_entry.get()
+        var = self.numerical_var_entry.get() or 'x'
+        range_str = self.numerical_point_entry.get()
+        
+        if not func_str or not range_str:
+            messagebox.showwarning("输入错误", "请输入函数和积分范围")
+            return
             
-            if not func_str or not range_str:
-                messagebox.showwarning("输入错误", "请输入函数和积分范围")
-                return
-                
-            try:
-                a, b = map(float, range_str.split(','))
-            except:
-                messagebox.showerror("错误", "积分范围格式错误，请使用 a,b 格式")
-                return
-                
-            result = self.main_window.numerical_calc.numerical_integration(func_str, var, a, b)
+        try:
+            a, b = map(float, range_str.split(','))
+        except:
+            messagebox.showerror("错误", "积分范围格式错误，请使用 a,b 格式")
+            return
+        
+        def show(details):
+            if isinstance(details, str):
+                result, error, engine, warning = details, None, None, None
+            else:
+                result, error, engine = details['积分值'], details['误差估计'], details['引擎']
+                warning = details.get('警告')
             
-            self.numerical_result_text.delete(1.0, tk.END)
             self.numerical_result_text.insert(tk.END, f"函数: {func_str}\n")
             self.numerical_result_text.insert(tk.END, f"变量: {var}\n")
             self.numerical_result_text.insert(tk.END, f"积分范围: [{a}, {b}]\n")
             self.numerical_result_text.insert(tk.END, f"积分值: {result}\n")
+            if engine is not None:
+                self.numerical_result_text.insert(tk.END, f"误差估计: {error}\n")
+                self.numerical_result_text.insert(tk.END, f"积分引擎: {engine}\n")
+            if warning:
+                self.numerical_result_text.insert(tk.END, f"警告: {warning}（积分可能发散，结果不可信）\n")
             
             # 保存结果到current_data
             result_data = {
@@ -173,29 +239,41 @@ class NumericalTab:
                 '积分下限': [a],
                 '积分上限': [b],
                 '积分值': [result],
+                '误差估计': [error],
                 '操作类型': ['数值积分']
             }
             self.main_window.append_to_current_data(result_data)
-            
-        except Exception as e:
-            self.numerical_result_text.delete(1.0, tk.END)
-            self.numerical_result_text.insert(tk.END, f"错误: {str(e)}")
+        
+        self.run_numerical('numerical_integration_details', func_str, var, a, b, method='auto',
+                           on_result=show, description=f"∫ {func_str} d{var}, [{a}, {b}]")
     
     def numerical_solve(self):
         """执行数值求解"""
+        func_str = self.numerical_func_entry.get()
+        var = self.numerical_var_entry.get() or 'x'
+        initial_str = self.numerical_point_entry.get()
+        
+        # 用 ; 分隔的多个方程按方程组求解
+        if ';' in func_str:
+            self.numerical_solve_system(func_str, var, initial_str)
+            return
+        
+        if not func_str or not initial_str:
+            messagebox.showwarning("输入错误", "请输入函数和初始猜测值")
+            return
+        
+        # 输入 a,b 形式的区间时求区间内全部根
+        if ',' in initial_str:
+            self.numerical_solve_all(func_str, var, initial_str)
+            return
+        
         try:
-            func_str = self.numerical_func_entry.get()
-            var = self.numerical_var_entry.get() or 'x'
-            initial_str = self.numerical_point_entry.get()
-            
-            if not func_str or not initial_str:
-                messagebox.showwarning("输入错误", "请输入函数和初始猜测值")
-                return
-                
             initial_guess = float(initial_str)
-            result = self.main_window.numerical_calc.solve_equation_numerical(func_str, var, initial_guess)
-            
-            self.numerical_result_text.delete(1.0, tk.END)
+        except ValueError:
+            messagebox.showerror("错误", "初始猜测值格式错误，请输入数值")
+            return
+        
+        def show(result):
             self.numerical_result_text.insert(tk.END, f"方程: {func_str} = 0\n")
             self.numerical_result_text.insert(tk.END, f"变量: {var}\n")
             self.numerical_result_text.insert(tk.END, f"初始猜测: {initial_guess}\n")
@@ -210,10 +288,139 @@ class NumericalTab:
                 '操作类型': ['数值求解']
             }
             self.main_window.append_to_current_data(result_data)
+        
+        self.run_numerical('solve_equation_numerical', func_str, var, initial_guess, on_result=show,
+                           description=f"{func_str} = 0")
+    
+    def numerical_solve_all(self, func_str, var, range_str):
+        """求区间内的全部根"""
+        try:
+            a, b = map(float, range_str.split(','))
+        except:
+            messagebox.showerror("错误", "求根区间格式错误，请使用 a,b 格式")
+            return
+        
+        def show(result):
+            self.numerical_result_text.insert(tk.END, f"方程: {func_str} = 0\n")
+            self.numerical_result_text.insert(tk.END, f"变量: {var}\n")
+            self.numerical_result_text.insert(tk.END, f"求根区间: [{a}, {b}]\n")
+            if isinstance(result, str):
+                self.numerical_result_text.insert(tk.END, f"{result}\n")
+                return
             
-        except Exception as e:
-            self.numerical_result_text.delete(1.0, tk.END)
-            self.numerical_result_text.insert(tk.END, f"错误: {str(e)}")
+            roots = result['根'].tolist()
+            self.numerical_result_text.insert(tk.END, f"共找到 {len(roots)} 个根:\n")
+            for root, converged in zip(roots, result['收敛']):
+                flag = "" if converged else " (未收敛)"
+                self.numerical_result_text.insert(tk.END, f"  {var} = {root}{flag}\n")
+            
+            # 保存结果到current_data
+            result_data = {
+                '方程': [func_str] * len(roots),
+                '变量': [var] * len(roots),
+                '求根区间': [range_str] * len(roots),
+                '数值解': roots,
+                '收敛': result['收敛'].tolist(),
+                '操作类型': ['区间求根'] * len(roots)
+            }
+            if roots:
+                self.main_window.append_to_current_data(result_data)
+        
+        self.run_numerical('solve_all_roots', func_str, var, a, b, on_result=show,
+                           description=f"{func_str} = 0, [{a}, {b}]")
+    
+    def numerical_solve_system(self, func_str, var, range_str):
+        """求解方程组，点/范围框中的 a,b 为多起点数值求解的取点范围（默认 -10,10）"""
+        try:
+            bounds = tuple(map(float, range_str.split(','))) if range_str else (-10, 10)
+            if len(bounds) != 2:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("错误", "求解范围格式错误，请使用 a,b 格式")
+            return
+        
+        def show(result):
+            self.numerical_result_text.insert(tk.END, f"方程组: {func_str}\n")
+            self.numerical_result_text.insert(tk.END, f"未知数: {var}\n")
+            if isinstance(result, str):
+                self.numerical_result_text.insert(tk.END, f"{result}\n")
+                return
+            
+            names = result['变量']
+            solutions = [', '.join(f"{name} = {value:.10g}" for name, value in zip(names, point))
+                         for point in result['解']]
+            self.numerical_result_text.insert(tk.END, f"求解方法: {result['方法']}\n")
+            if result['方法'] == '符号':
+                self.numerical_result_text.insert(tk.END, f"共 {len(result['符号解'])} 组解:\n")
+                for text in result['符号解']:
+                    self.numerical_result_text.insert(tk.END, f"  {text}\n")
+            else:
+                self.numerical_result_text.insert(tk.END, f"求解范围: {bounds}, 起点数: {result['起点数']}\n")
+                self.numerical_result_text.insert(tk.END, f"共找到 {len(solutions)} 组实数解:\n")
+                for text, count in zip(solutions, result['收敛起点数']):
+                    self.numerical_result_text.insert(tk.END, f"  {text}  ({count} 个起点收敛到此解)\n")
+            
+            # 保存结果到current_data
+            if solutions:
+                result_data = {
+                    '方程': [func_str] * len(solutions),
+                    '变量': [var] * len(solutions),
+                    '数值解': solutions,
+                    '操作类型': ['方程组求解'] * len(solutions)
+                }
+                self.main_window.append_to_current_data(result_data)
+        
+        # 沙箱工作进程是守护进程，SystemSolver 在其中不再创建子进程：
+        # 符号求解在当前线程中用 SIGALRM 限时，多起点求根也在工作进程内串行进行
+        self.run_numerical('solve_system', func_str, var, bounds=bounds, on_result=show,
+                           timeout=self.system_timeout, description=func_str)
+    
+    def numerical_solve_ode(self):
+        """求解常微分方程初值问题 dy/dt = f(t, y)，解曲线绘制到数据可视化页"""
+        rhs = [e.strip() for e in self.numerical_func_entry.get().split(';') if e.strip()]
+        states = [v.strip() for v in (self.numerical_var_entry.get() or 'y').split(',') if v.strip()]
+        range_str = self.numerical_point_entry.get()
+        initial_str = self.numerical_initial_entry.get()
+        
+        if not rhs or not range_str or not initial_str:
+            messagebox.showwarning("输入错误", "请输入右端表达式（多个用 ; 分隔）、时间区间 t0,t1 和初值")
+            return
+        try:
+            t0, t1 = map(float, range_str.split(','))
+            y0 = [float(v) for v in initial_str.split(',') if v.strip()]
+        except ValueError:
+            messagebox.showerror("错误", "时间区间请使用 t0,t1 格式，初值用逗号分隔")
+            return
+        if len(y0) != len(states) or len(rhs) != len(states):
+            messagebox.showerror("错误", "方程个数、状态变量个数与初值个数必须相同")
+            return
+        
+        def show(result):
+            self.numerical_result_text.insert(tk.END, f"方程: {'; '.join(f'd{v}/dt = {e}' for v, e in zip(states, rhs))}\n")
+            self.numerical_result_text.insert(tk.END, f"时间区间: [{t0}, {t1}], 初值: {y0}\n")
+            if isinstance(result, str):
+                self.numerical_result_text.insert(tk.END, f"{result}\n")
+                return
+            self.numerical_result_text.insert(tk.END, f"求解方法: {result['方法']}, 函数求值次数: {result['函数求值次数']}\n")
+            self.numerical_result_text.insert(tk.END, f"求解信息: {result['信息']}\n")
+            final = ', '.join(f"{v} = {value:.10g}" for v, value in zip(states, result['y'][:, -1]))
+            self.numerical_result_text.insert(tk.END, f"终点 t = {result['t'][-1]:.10g}: {final}\n")
+            
+            visualizer = self.main_window.visualizer
+            visualization_tab = self.main_window.visualization_tab
+            plot_result = visualizer.plot_stream([(result['t'], result['y'])], labels=states,
+                                                 title="常微分方程数值解")
+            if not plot_result.startswith('错误'):
+                self.main_window.notebook.select(visualization_tab.frame.master)
+            
+            # 保存结果到current_data
+            result_data = {'t': result['t'].tolist()}
+            result_data.update({v: row.tolist() for v, row in zip(states, result['y'])})
+            self.main_window.current_data = pd.DataFrame(result_data)
+        
+        self.run_numerical('solve', rhs, states, (t0, t1), y0, t_eval=np.linspace(t0, t1, 1000),
+                           target='modules.ode_solver:ODESolver', on_result=show,
+                           description=f"常微分方程 {', '.join(states)}")
     
     def save_to_excel(self):
         """保存数值计算结果到Excel"""
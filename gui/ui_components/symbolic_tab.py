@@ -1,19 +1,40 @@
+import base64
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from modules.expression_cache import LRUCache
+from modules.visualization import render_latex_png
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
+# 后台符号运算：(结果标签, 输入标签, 保存列名-输入, 保存列名-结果, 操作类型)
+SYMBOLIC_JOBS = {
+    'integrate': ('积分结果', '表达式', '原表达式', '积分结果', '符号积分'),
+    'solve': ('解', '方程', '方程', '解', '符号求解'),
+    'fourier': ('傅里叶变换', '表达式', '原表达式', '傅里叶变换', '傅里叶变换'),
+}
 
 class SymbolicTab:
+    # 单个符号运算的时间预算（秒）
+    job_timeout = 60.0
+    # LaTeX 预览的防抖间隔（毫秒）：停止输入这么久之后才渲染
+    preview_delay_ms = 250
+    
     def __init__(self, parent, main_window):
         self.main_window = main_window
+        self.current_job = None
         self.frame = ttk.Frame(parent)
         parent.add(self.frame, text="符号计算")
-        self.figure = plt.Figure(figsize=(3, 2), dpi=100)
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
+        # 预览渲染在后台线程中进行，渲染好的PNG按表达式缓存
+        self.preview_cache = LRUCache(maxsize=256)
+        self.preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='latex-preview')
+        self.preview_after_id = None
+        self.preview_future = None
+        self.preview_expression = None
+        self.preview_image = None
         self.create_ui()
-        self.latex_preview = self.figure.add_subplot(111)
-        self.latex_preview.axis('off')
 
     def create_ui(self):
         """创建符号计算界面"""
@@ -38,12 +59,25 @@ class SymbolicTab:
         self.symbolic_var_entry.grid(row=0, column=3, padx=0, pady=8)
         self.symbolic_var_entry.insert(0, "x")
         
+        # 数值频谱的采样网格
+        ttk.Label(input_content, text="采样区间:", style='Modern.TLabel').grid(row=1, column=0, sticky=tk.W, padx=(0, 10), pady=8)
+        self.spectrum_range_entry = ttk.Entry(input_content, width=40, style='Modern.TEntry')
+        self.spectrum_range_entry.grid(row=1, column=1, padx=(0, 15), pady=8, sticky=tk.EW)
+        self.spectrum_range_entry.insert(0, "-10, 10")
+        
+        ttk.Label(input_content, text="采样点数:", style='Modern.TLabel').grid(row=1, column=2, sticky=tk.W, padx=(0, 10), pady=8)
+        self.spectrum_points_entry = ttk.Entry(input_content, width=10, style='Modern.TEntry')
+        self.spectrum_points_entry.grid(row=1, column=3, padx=0, pady=8)
+        self.spectrum_points_entry.insert(0, "4096")
+        
         input_content.columnconfigure(1, weight=1)
         
         # LaTeX 预览框
         preview_frame = ttk.LabelFrame(main_container, text="LaTeX 预览")
         preview_frame.pack(fill=tk.X, pady=(0, 15))
-        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+        self.preview_label = tk.Label(preview_frame, height=4, bg='#ffffff', fg='#495057',
+                                      font=('Microsoft YaHei UI', 10))
+        self.preview_label.pack(side=tk.TOP, fill=tk.BOTH, expand=1, padx=15, pady=10)
 
         # 操作按钮框架
         button_frame = ttk.LabelFrame(main_container, text="操作")
@@ -59,7 +93,10 @@ class SymbolicTab:
         ttk.Button(button_container, text="积分", command=self.symbolic_integrate, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(button_container, text="求解方程", command=self.symbolic_solve, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(button_container, text="傅里叶变换", command=self.symbolic_fourier, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
-        ttk.Button(button_container, text="保存到Excel", command=self.save_to_excel, style='Modern.TButton').pack(side=tk.LEFT)
+        ttk.Button(button_container, text="数值频谱", command=self.numeric_spectrum, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(button_container, text="保存到Excel", command=self.save_to_excel, style='Modern.TButton').pack(side=tk.LEFT, padx=(0, 8))
+        self.cancel_button = ttk.Button(button_container, text="取消计算", command=self.cancel_job, style='Modern.TButton', state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT)
 
         # 结果显示框架
         result_frame = ttk.LabelFrame(main_container, text="结果")
@@ -83,14 +120,64 @@ class SymbolicTab:
         symbolic_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
     def update_latex_preview(self, event=None):
-        self.latex_preview.clear()
-        expression = self.symbolic_expr_entry.get()
+        """按键时只重置防抖定时器，停止输入后再渲染预览"""
+        if self.preview_after_id is not None:
+            self.frame.after_cancel(self.preview_after_id)
+        self.preview_after_id = self.frame.after(self.preview_delay_ms, self.render_latex_preview)
+    
+    def render_latex_preview(self):
+        """渲染当前表达式：命中缓存直接显示，否则提交到后台线程"""
+        self.preview_after_id = None
+        expression = self.symbolic_expr_entry.get().strip()
+        self.preview_expression = expression
+        if not expression:
+            self.show_latex_preview(None)
+            return
+        
+        png = self.preview_cache.get(expression)
+        if png is not None:
+            self.show_latex_preview(png)
+            return
+        # 上一次渲染还没结束时不重复提交，结束后由 poll_latex_preview 补上最新的表达式
+        if self.preview_future is None:
+            self.preview_future = (expression, self.preview_executor.submit(self._render_png, expression))
+            self.frame.after(30, self.poll_latex_preview)
+    
+    @staticmethod
+    def _render_png(expression):
+        """后台线程中渲染，无效公式返回空字节串"""
         try:
-            self.latex_preview.text(0.5, 0.5, f'${expression}$', fontsize=12, ha='center', va='center')
-        except Exception as e:
-            self.latex_preview.text(0.5, 0.5, '无效的 LaTeX 公式', fontsize=12, ha='center', va='center')
-        self.latex_preview.axis('off')
-        self.canvas.draw()
+            return render_latex_png(expression, fontsize=12)
+        except Exception:
+            return b''
+    
+    def poll_latex_preview(self):
+        """定时检查后台渲染是否完成"""
+        expression, future = self.preview_future
+        if not future.done():
+            self.frame.after(30, self.poll_latex_preview)
+            return
+        self.preview_future = None
+        png = future.result()
+        self.preview_cache.put(expression, png)
+        if expression == self.preview_expression:
+            self.show_latex_preview(png)
+        elif self.preview_after_id is None:
+            # 渲染期间表达式又变了，渲染最新的表达式
+            self.render_latex_preview()
+    
+    def show_latex_preview(self, png):
+        """显示渲染结果；png 为 None 表示清空，空字节串表示公式无效"""
+        if png is None:
+            self.preview_image = None
+            self.preview_label.config(image='', text='')
+        elif not png:
+            self.preview_image = None
+            self.preview_label.config(image='', text='无效的 LaTeX 公式')
+        else:
+            # 保留引用，否则 PhotoImage 会被回收
+            self.preview_image = tk.PhotoImage(data=base64.b64encode(png))
+            self.preview_label.config(image=self.preview_image, text='')
 
     def symbolic_differentiate(self):
         """执行符号求导"""
@@ -130,111 +217,123 @@ class SymbolicTab:
     
     def symbolic_integrate(self):
         """执行符号积分"""
-        try:
-            expression = self.symbolic_expr_entry.get()
-            variable = self.symbolic_var_entry.get() or 'x'
-            
-            if not expression:
-                messagebox.showwarning("输入错误", "请输入表达式")
-                return
-                
-            try:
-                _, latex_expr = self.main_window.symbolic_calc.latex_to_sympy(expression)
-                if latex_expr is None:
-                    raise ValueError
-                result_str, result_expr = self.main_window.symbolic_calc.integrate_symbolic(str(latex_expr), variable)
-            except Exception:
-                result_str, result_expr = self.main_window.symbolic_calc.integrate_symbolic(expression, variable)
-            
-            self.symbolic_result_text.delete(1.0, tk.END)
-            self.symbolic_result_text.insert(tk.END, f"表达式: {expression}\n")
-            self.symbolic_result_text.insert(tk.END, f"变量: {variable}\n")
-            self.symbolic_result_text.insert(tk.END, f"积分结果: {result_str}\n")
-            
-            # 保存结果到current_data
-            result_data = {
-                '原表达式': [expression],
-                '变量': [variable],
-                '积分结果': [result_str],
-                '操作类型': ['符号积分']
-            }
-            self.main_window.append_to_current_data(result_data)
-            
-        except Exception as e:
-            self.symbolic_result_text.delete(1.0, tk.END)
-            self.symbolic_result_text.insert(tk.END, f"错误: {str(e)}")
+        self.start_job('integrate')
     
     def symbolic_solve(self):
         """执行符号方程求解"""
+        self.start_job('solve')
+    
+    def symbolic_fourier(self):
+        """执行傅里叶变换"""
+        self.start_job('fourier')
+    
+    def start_job(self, operation):
+        """把符号运算提交到沙箱工作进程，不阻塞界面"""
+        expression = self.symbolic_expr_entry.get()
+        variable = self.symbolic_var_entry.get() or 'x'
+        
+        if not expression:
+            messagebox.showwarning("输入错误", "请输入表达式")
+            return
+        if self.current_job is not None:
+            messagebox.showwarning("计算中", "已有计算正在进行，请等待完成或取消")
+            return
+        
         try:
-            expression = self.symbolic_expr_entry.get()
-            variable = self.symbolic_var_entry.get() or 'x'
-            
-            if not expression:
-                messagebox.showwarning("输入错误", "请输入表达式")
-                return
-                
-            try:
-                _, latex_expr = self.main_window.symbolic_calc.latex_to_sympy(expression)
-                if latex_expr is None:
-                    raise ValueError
-                result_str, result_expr = self.main_window.symbolic_calc.solve_equation(str(latex_expr), variable)
-            except Exception:
-                result_str, result_expr = self.main_window.symbolic_calc.solve_equation(expression, variable)
-            
-            self.symbolic_result_text.delete(1.0, tk.END)
-            self.symbolic_result_text.insert(tk.END, f"方程: {expression}\n")
-            self.symbolic_result_text.insert(tk.END, f"变量: {variable}\n")
-            self.symbolic_result_text.insert(tk.END, f"解: {result_str}\n")
-            
-            # 保存结果到current_data
-            result_data = {
-                '方程': [expression],
-                '变量': [variable],
-                '解': [result_str],
-                '操作类型': ['符号求解']
-            }
-            self.main_window.append_to_current_data(result_data)
-            
+            job = self.main_window.sandbox.submit(
+                'modules.symbolic_calc:SymbolicCalculator', 'calculate_from_input',
+                operation, expression, variable, timeout=self.job_timeout
+            )
         except Exception as e:
             self.symbolic_result_text.delete(1.0, tk.END)
             self.symbolic_result_text.insert(tk.END, f"错误: {str(e)}")
+            return
+        
+        self.current_job = (job, operation, expression, variable)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.symbolic_result_text.delete(1.0, tk.END)
+        self.symbolic_result_text.insert(tk.END, f"正在计算: {expression} ...\n")
+        self.frame.after(100, self.poll_job)
     
-    def symbolic_fourier(self):
-        """执行傅里叶变换"""
+    def poll_job(self):
+        """定时检查后台计算是否完成"""
+        if self.current_job is None:
+            return
+        job, operation, expression, variable = self.current_job
+        if not job.done():
+            self.frame.after(100, self.poll_job)
+            return
+        
+        self.current_job = None
+        self.cancel_button.config(state=tk.DISABLED)
+        self.symbolic_result_text.delete(1.0, tk.END)
         try:
-            expression = self.symbolic_expr_entry.get()
-            variable = self.symbolic_var_entry.get() or 'x'
-            
-            if not expression:
-                messagebox.showwarning("输入错误", "请输入表达式")
-                return
-                
-            try:
-                _, latex_expr = self.main_window.symbolic_calc.latex_to_sympy(expression)
-                if latex_expr is None:
-                    raise ValueError
-                result_str, result_expr = self.main_window.symbolic_calc.fourier_transform(str(latex_expr), variable)
-            except Exception:
-                result_str, result_expr = self.main_window.symbolic_calc.fourier_transform(expression, variable)
-            
-            self.symbolic_result_text.delete(1.0, tk.END)
-            self.symbolic_result_text.insert(tk.END, f"表达式: {expression}\n")
-            self.symbolic_result_text.insert(tk.END, f"变量: {variable}\n")
-            self.symbolic_result_text.insert(tk.END, f"傅里叶变换: {result_str}\n")
-            
-            # 保存结果到current_data
-            result_data = {
-                '原表达式': [expression],
-                '变量': [variable],
-                '傅里叶变换': [result_str],
-                '操作类型': ['傅里叶变换']
-            }
-            self.main_window.append_to_current_data(result_data)
-            
+            result_str, _ = job.result()
         except Exception as e:
-            self.symbolic_result_text.delete(1.0, tk.END)
             self.symbolic_result_text.insert(tk.END, f"错误: {str(e)}")
+            return
+        self.show_job_result(operation, expression, variable, result_str, job.elapsed)
+    
+    def cancel_job(self):
+        """取消正在进行的符号运算（终止工作进程）"""
+        if self.current_job is not None:
+            self.current_job[0].cancel()
+    
+    def show_job_result(self, operation, expression, variable, result_str, elapsed):
+        """显示后台运算结果并保存到current_data"""
+        result_label, input_label, input_column, result_column, op_type = SYMBOLIC_JOBS[operation]
+        self.symbolic_result_text.insert(tk.END, f"{input_label}: {expression}\n")
+        self.symbolic_result_text.insert(tk.END, f"变量: {variable}\n")
+        self.symbolic_result_text.insert(tk.END, f"{result_label}: {result_str}\n")
+        self.symbolic_result_text.insert(tk.END, f"耗时: {elapsed:.2f} 秒\n")
+        
+        # 保存结果到current_data
+        result_data = {
+            input_column: [expression],
+            '变量': [variable],
+            result_column: [result_str],
+            '操作类型': [op_type]
+        }
+        self.main_window.append_to_current_data(result_data)
+        
+        # sympy求不出闭式解时给出数值频谱
+        if operation == 'fourier' and (result_str.startswith('错误') or 'FourierTransform' in result_str):
+            self.symbolic_result_text.insert(tk.END, "\n未找到闭式解，改用数值频谱:\n")
+            self.show_numeric_spectrum(expression, variable)
+    
+    def numeric_spectrum(self):
+        """对表达式采样做FFT，绘制数值频谱"""
+        expression = self.symbolic_expr_entry.get()
+        if not expression:
+            messagebox.showwarning("输入错误", "请输入表达式")
+            return
+        self.symbolic_result_text.delete(1.0, tk.END)
+        self.show_numeric_spectrum(expression, self.symbolic_var_entry.get() or 'x')
+    
+    def show_numeric_spectrum(self, expression, variable):
+        """按采样网格计算数值频谱，在数据可视化选项卡中绘制幅值和相位"""
+        try:
+            t_range = [float(v) for v in self.spectrum_range_entry.get().split(',')]
+            num_points = int(self.spectrum_points_entry.get())
+        except ValueError:
+            self.symbolic_result_text.insert(tk.END, "错误: 采样区间应为 \"起点, 终点\"，采样点数应为整数\n")
+            return
+        result = self.main_window.symbolic_calc.numeric_fourier_transform(expression, variable, t_range, num_points)
+        if isinstance(result, str):
+            self.symbolic_result_text.insert(tk.END, f"{result}\n")
+            return
+        
+        freq, magnitude = result['频率'], result['幅值']
+        peak = magnitude.argmax()
+        self.symbolic_result_text.insert(tk.END, f"采样: {num_points} 点, 间隔 {result['采样间隔']:.4g}\n")
+        self.symbolic_result_text.insert(tk.END, f"频率范围: ±{freq.max():.4g}\n")
+        self.symbolic_result_text.insert(tk.END, f"幅值峰值: {magnitude[peak]:.6g} (频率 {freq[peak]:.4g})\n")
+        
+        # 访问 visualization_tab 时会构建该选项卡及其画布
+        visualization_tab = self.main_window.visualization_tab
+        self.main_window.visualizer.plot_spectrum(freq, magnitude, result['相位'],
+                                                  title=f"{expression} 的数值频谱")
+        self.main_window.notebook.select(visualization_tab.frame.master)
     
     def save_to_excel(self):
         """保存符号计算结果到Excel"""
@@ -1,10 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
+
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
 
 class VisualizationTab:
     def __init__(self, parent, main_window):
         self.main_window = main_window
+        # 正在沙箱中计算的函数图像：(SandboxJob, 函数, 范围)
+        self.current_job = None
         self.frame = ttk.Frame(parent)
         parent.add(self.frame, text="数据可视化")
         self.create_ui()
@@ -193,7 +198,9 @@ class VisualizationTab:
                 messagebox.showwarning("数据错误", "X和Y数据的长度不一致")
                 return
             
-            self.main_window.visualizer.plot_curve_fitting(x_data, y_data)
+            # 与数据处理选项卡共用拟合缓存，相同数据不会重复拟合
+            fit_result = self.main_window.data_processor.curve_fitting(x_data, y_data)
+            self.main_window.visualizer.plot_curve_fitting(x_data, y_data, fit_result=fit_result)
             
             # 保存绘图数据到current_data
             result_data = {
@@ -207,7 +214,7 @@ class VisualizationTab:
             messagebox.showerror("错误", f"绘图错误: {str(e)}")
     
     def plot_function(self):
-        """绘制函数图像"""
+        """绘制函数图像，数据点在沙箱工作进程中计算，不阻塞界面"""
         try:
             func_str = self.plot_func_entry.get()
             range_str = self.plot_range_entry.get()
@@ -215,25 +222,54 @@ class VisualizationTab:
             if not func_str:
                 messagebox.showwarning("输入错误", "请输入函数")
                 return
+            if self.current_job is not None:
+                messagebox.showwarning("计算中", "函数图像正在计算，请等待完成")
+                return
                 
             # 解析范围
             range_parts = range_str.split(',')
             x_min = float(range_parts[0].strip())
             x_max = float(range_parts[1].strip())
             
-            # 修复：传递元组参数而不是两个分离的参数
-            self.main_window.visualizer.plot_function(func_str, x_range=(x_min, x_max))
-            
-            # 保存绘图数据到current_data
-            result_data = {
-                '函数': [func_str],
-                '范围': [range_str],
-                '图表类型': ['函数图像']
-            }
-            self.main_window.current_data = pd.DataFrame(result_data)
+            job = self.main_window.visualizer.submit_function_values(func_str, x_range=(x_min, x_max))
+            if job is None:
+                self.show_function_result(func_str, range_str,
+                                          self.main_window.visualizer.plot_function(func_str, x_range=(x_min, x_max)))
+                return
+            self.current_job = (job, func_str, range_str)
+            self.frame.after(100, self.poll_function_job)
             
         except Exception as e:
-            messagebox.showerror("错误", f"绘图错误: {str(e)}")
+            messagebox.showerror("错误", f"绘图错误: {type(e).__name__}: {e}")
+    
+    def poll_function_job(self):
+        """定时检查函数图像的数据点是否算完"""
+        if self.current_job is None:
+            return
+        job, func_str, range_str = self.current_job
+        if not job.done():
+            self.frame.after(100, self.poll_function_job)
+            return
+        
+        self.current_job = None
+        try:
+            x, y = job.result()
+        except Exception as e:
+            messagebox.showerror("错误", f"绘图错误: {type(e).__name__}: {e}")
+            return
+        self.show_function_result(func_str, range_str, self.main_window.visualizer.draw_function(func_str, x, y))
+    
+    def show_function_result(self, func_str, range_str, status):
+        """显示绘图结果，成功时保存绘图数据到current_data"""
+        if status.startswith('错误'):
+            messagebox.showerror("错误", f"绘图错误: {status}")
+            return
+        result_data = {
+            '函数': [func_str],
+            '范围': [range_str],
+            '图表类型': ['函数图像']
+        }
+        self.main_window.current_data = pd.DataFrame(result_data)
     
     def plot_histogram(self):
         """绘制直方图"""
@@ -7,14 +7,35 @@
 
 import sys
 import os
+import argparse
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from gui.main_window import ScientificCalculatorGUI
+# 尽早导入，作为启动耗时统计的起点
+from utils.lazy_import import startup_phase
 
 def main():
     """主函数"""
-    app = ScientificCalculatorGUI()
+    parser = argparse.ArgumentParser(description="科学计算工具")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="显示首个选项卡后输出启动耗时报告（各阶段及各依赖的导入耗时）")
+    parser.add_argument('--batch', metavar='JOBS',
+                        help="不启动界面，批量执行JSONL/CSV文件中的计算任务")
+    parser.add_argument('--output', metavar='PATH', default='-',
+                        help="批量模式的结果文件（JSONL），默认输出到终端")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="批量模式的进程数，默认为CPU核数")
+    args = parser.parse_args()
+    
+    if args.batch:
+        # 批量模式不导入tkinter，可在无图形界面的服务器上运行
+        from utils.batch_runner import main as batch_main
+        return batch_main(args.batch, args.output, args.workers)
+    
+    with startup_phase('导入GUI模块'):
+        from gui.main_window import ScientificCalculatorGUI
+    app = ScientificCalculatorGUI(show_startup_report=args.startup_report)
     app.run()
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+符号-数值编译桥
+功能：把sympy表达式经公共子表达式消除后编译为NumPy（可选numexpr）核函数，
+按表达式缓存，并在大规模网格上分块求值
+"""
+
+import numpy as np
+
+from utils.lazy_import import lazy_import
+from .expression_cache import LRUCache
+from .symbolic_cache import SymbolicResultCache
+
+sp = lazy_import('sympy')
+
+# lambdify 使用的函数模块：scipy 提供 erf、gamma、Si、polygamma 等特殊函数的向量化实现，
+# 只用 numpy 时这些函数会落到逐点的 mpmath/math 实现上，无法处理数组
+LAMBDIFY_MODULES = ['numpy', 'scipy']
+
+# 网格求值时每块的点数：公共子表达式的中间数组按块分配，内存占用与网格大小无关
+DEFAULT_CHUNK_SIZE = 1 << 18
+
+
+def _numexpr():
+    """numexpr 为可选依赖，未安装时返回None"""
+    try:
+        import numexpr
+    except ImportError:
+        return None
+    return numexpr
+
+
+def _as_symbols(variables):
+    """变量名列表、"x, y" 字符串或Symbol列表统一为Symbol列表"""
+    if isinstance(variables, str):
+        variables = [v.strip() for v in variables.split(',') if v.strip()]
+    elif not isinstance(variables, (list, tuple)):
+        variables = [variables]
+    return [v if isinstance(v, sp.Symbol) else sp.Symbol(str(v)) for v in variables]
+
+
+class CompiledKernel:
+    """编译后的数值核函数
+
+    表达式先经 sympy.cse 提取公共子表达式，每个子表达式只计算一次。
+    backend='numpy' 使用 lambdify 生成逐语句的NumPy代码（特殊函数使用scipy.special）；
+    backend='numexpr' 把每个子表达式交给 numexpr.evaluate，多线程且不产生整块临时数组。
+    """
+
+    def __init__(self, expr, variables, backend='numpy'):
+        self.expr = sp.sympify(expr)
+        # 按名称对应表达式中的符号，带假设（如 real=True）的同名符号也能匹配
+        by_name = {str(s): s for s in self.expr.free_symbols}
+        self.variables = [by_name.get(str(v), v) for v in _as_symbols(variables)]
+        unknown = self.expr.free_symbols - set(self.variables)
+        if unknown:
+            raise ValueError(f"未知的符号: {', '.join(sorted(map(str, unknown)))}")
+
+        # cse 只做一次，numpy 后端把结果直接交给 lambdify，不再让它重复消除
+        replacements, reduced = sp.cse(self.expr, list=False)
+        self.subexpressions = len(replacements)
+        self.backend = backend
+        if backend == 'numpy':
+            self._kernel = sp.lambdify(self.variables, self.expr, LAMBDIFY_MODULES,
+                                       cse=lambda _: (replacements, reduced))
+        elif backend == 'numexpr':
+            self._kernel = self._build_numexpr(replacements, reduced)
+        else:
+            raise ValueError(f"未知的编译后端: {backend}")
+
+    def _build_numexpr(self, replacements, reduced):
+        numexpr = _numexpr()
+        if numexpr is None:
+            raise ValueError("未安装numexpr")
+        from sympy.printing.lambdarepr import NumExprPrinter
+
+        printer = NumExprPrinter()
+        # numexpr 不认识 pi、E 等符号常量，替换为浮点数
+        def to_code(expr):
+            constants = {c: sp.Float(c) for c in expr.atoms(sp.NumberSymbol)}
+            return printer._print(expr.xreplace(constants))
+
+        names = [str(v) for v in self.variables]
+        steps = [(str(symbol), to_code(sub)) for symbol, sub in replacements]
+        final = to_code(reduced)
+
+        def kernel(*values):
+            local = dict(zip(names, values))
+            for name, code in steps:
+                local[name] = numexpr.evaluate(code, local_dict=local)
+            return numexpr.evaluate(final, local_dict=local)
+        return kernel
+
+    def __call__(self, *values):
+        """对标量或同形状数组求值"""
+        return self._kernel(*values)
+
+    def evaluate(self, *values, chunk_size=DEFAULT_CHUNK_SIZE):
+        """在网格上分块求值
+
+        各变量的取值按NumPy规则广播为同一形状，展平后每次计算 chunk_size 个点，
+        结果写入预先分配的输出数组。与变量无关的常数表达式同样返回完整形状的数组。
+        """
+        if len(values) != len(self.variables):
+            raise ValueError(f"需要 {len(self.variables)} 个变量的取值，实际为 {len(values)} 个")
+        if not values:
+            return np.asarray(self._kernel())
+        arrays = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in values])
+        shape = arrays[0].shape
+        flat = [a.reshape(-1) for a in arrays]
+        size = flat[0].size
+
+        output = None
+        for start in range(0, size, chunk_size):
+            chunk = [a[start:start + chunk_size] for a in flat]
+            part = np.asarray(self._kernel(*chunk))
+            if output is None:
+                dtype = np.result_type(part.dtype, float)
+                output = np.empty(size, dtype=dtype)
+            elif not np.can_cast(part.dtype, output.dtype, 'same_kind'):
+                output = output.astype(np.result_type(output.dtype, part.dtype))
+            output[start:start + chunk_size] = part
+        if output is None:
+            output = np.empty(0)
+        return output.reshape(shape)
+
+
+class CompileBridge:
+    """符号结果到数值核函数的桥接，编译结果按表达式哈希缓存
+
+    键为 srepr(表达式) + 变量 + 后端 的SHA-256摘要，同一表达式只做一次cse和lambdify。
+    """
+
+    def __init__(self, cache_size=128):
+        self.cache = LRUCache(maxsize=cache_size)
+
+    def compile(self, expr, variables='x', backend='auto'):
+        """编译表达式，返回 CompiledKernel
+
+        expr 可以是sympy对象或字符串；backend 为 'numpy'、'numexpr' 或 'auto'
+        （已安装numexpr时优先使用，编译失败时回退到NumPy）。
+        """
+        expr = sp.sympify(expr)
+        symbols = _as_symbols(variables)
+        backends = [backend] if backend != 'auto' else (
+            ['numexpr', 'numpy'] if _numexpr() is not None else ['numpy'])
+
+        error = None
+        for name in backends:
+            key = SymbolicResultCache.make_key('kernel', expr, *symbols, name)
+            kernel = self.cache.get(key)
+            if kernel is not None:
+                return kernel
+            try:
+                kernel = CompiledKernel(expr, symbols, backend=name)
+            except (ValueError, TypeError, KeyError, NotImplementedError) as e:
+                # numexpr 不支持的函数（如特殊函数）回退到下一个后端
+                error = e
+                continue
+            self.cache.put(key, kernel)
+            return kernel
+        raise error
+
+    def evaluate(self, expr, variables, *values, backend='auto', chunk_size=DEFAULT_CHUNK_SIZE):
+        """编译（或取缓存）并在网格上求值"""
+        return self.compile(expr, variables, backend).evaluate(*values, chunk_size=chunk_size)
+
+    def cache_stats(self):
+        """核函数缓存命中统计"""
+        return self.cache.stats()
@@ -5,34 +5,148 @@
 功能：统计分析、曲线拟合等
 """
 
+import hashlib
+import os
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
 import numpy as np
-import pandas as pd
-from scipy import stats
-from scipy.optimize import curve_fit
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
-# Fix the import for PolynomialFeatures
-from sklearn.preprocessing import PolynomialFeatures  # Changed from sklearn.polynomial
+
+from utils.lazy_import import lazy_import
+from .expression_cache import LRUCache
+from .streaming_stats import StreamingStatistics
+
+# pandas/scipy 在第一次用到时才导入
+pd = lazy_import('pandas')
+stats = lazy_import('scipy.stats')
+optimize = lazy_import('scipy.optimize')
+
+# Kendall τ 只能逐对调用 kendalltau（m(m-1)/2 次），列数超过此值时拒绝计算
+KENDALL_MAX_COLUMNS = 50
+
+class FitResult(dict):
+    """拟合结果
+    
+    作为字典保留 '拟合方程'、'拟合数据'、'R²'、'拟合类型' 等键，
+    另外保存模型参数，predict(x) 对数组整体求值。
+    """
+    
+    # 各拟合类型的模型函数 f(x, *参数)
+    MODELS = {
+        'linear': lambda x, slope, intercept: slope * x + intercept,
+        'polynomial': lambda x, *coeffs: np.polyval(coeffs, x),
+        'exponential': lambda x, a, b, c: a * np.exp(b * x) + c,
+    }
+    
+    def __init__(self, fit_type, params, equation, fitted_y, r_squared):
+        super().__init__({
+            '拟合方程': equation,
+            '拟合数据': np.asarray(fitted_y).tolist(),
+            'R²': r_squared,
+            '拟合类型': fit_type,
+            '参数': [float(p) for p in params],
+        })
+        self.fit_type = fit_type
+        self.params = tuple(float(p) for p in params)
+    
+    def predict(self, x):
+        """在新的x上计算拟合值"""
+        return self.MODELS[self.fit_type](np.asarray(x, dtype=float), *self.params)
+
 
 class DataProcessor:
-    def __init__(self):
-        pass
+    def __init__(self, fit_cache_size=64):
+        # 拟合结果按数据内容缓存
+        self.fit_cache = LRUCache(maxsize=fit_cache_size)
     
     def basic_statistics(self, data):
-        """基本统计分析"""
+        """基本统计分析
+        
+        data 可以是数值列表/数组，也可以是逐块产出数组的可迭代对象
+        （如 ExcelHandler.iter_column_chunks），按块单遍累积，不需要一次载入全部数据。
+        """
         try:
-            data = np.array(data)
-            stats_dict = {
-                '数据点数': len(data),
-                '平均值': np.mean(data),
-                '中位数': np.median(data),
-                '标准差': np.std(data),
-                '方差': np.var(data),
-                '最小值': np.min(data),
-                '最大值': np.max(data),
-                '四分位数': np.percentile(data, [25, 50, 75]).tolist()
-            }
-            return stats_dict
+            accumulator = StreamingStatistics()
+            # 列表、数组、Series 视为一块数据，其余可迭代对象视为按块产出
+            if isinstance(data, (list, tuple)) or hasattr(data, 'dtype'):
+                accumulator.update(data)
+            else:
+                for chunk in data:
+                    accumulator.update(chunk)
+            return accumulator.result()
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    def parallel_statistics(self, chunks, workers=None, max_in_flight=None):
+        """多进程流式统计：各块在工作进程中分别统计，部分结果合并
+        
+        同时在途的块最多 max_in_flight 个（默认为进程数的2倍），内存占用与数据总量无关。
+        """
+        try:
+            workers = workers or os.cpu_count() or 1
+            max_in_flight = max_in_flight or workers * 2
+            accumulator = StreamingStatistics()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = set()
+                for chunk in chunks:
+                    if len(pending) >= max_in_flight:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            accumulator.merge(future.result())
+                    pending.add(executor.submit(_chunk_statistics, np.asarray(chunk, dtype=float)))
+                for future in pending:
+                    accumulator.merge(future.result())
+            return accumulator.result()
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    def file_statistics(self, file_path, column, chunk_size=100_000, sheet_name=0, workers=1):
+        """对Excel/CSV文件中的一列做流式统计，按块读取，不把整个文件读入内存"""
+        from utils.excel_handler import ExcelHandler
+        
+        chunks = ExcelHandler().iter_column_chunks(file_path, column, chunk_size=chunk_size, sheet_name=sheet_name)
+        if workers == 1:
+            return self.basic_statistics(chunks)
+        return self.parallel_statistics(chunks, workers=workers)
+    
+    def table_statistics(self, df):
+        """整表统计：一次计算所有数值型列的全部统计量
+        
+        数值列组成二维数组后按列向量化计算，NaN视为缺失值跳过；
+        每列只排序一次，中位数、四分位数、最小值和最大值都从排序结果中读取
+        （分位数与 np.percentile 的线性插值相同）。
+        返回每个数值列一行的DataFrame。
+        """
+        try:
+            numeric = df.select_dtypes(include=[np.number])
+            if numeric.shape[1] == 0:
+                return "错误: 没有数值型列"
+            # 转置为每列一行的连续数组，按行排序时访问连续内存
+            values = np.ascontiguousarray(numeric.to_numpy(dtype=float, na_value=np.nan).T)
+            valid = ~np.isnan(values)
+            count = valid.sum(axis=1)
+            
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(valid, values, 0.0).sum(axis=1) / count
+                variance = np.square(np.where(valid, values - mean[:, None], 0.0)).sum(axis=1) / count
+                # NaN 排在每行末尾，前 count 个为有效数据
+                ordered = np.sort(values, axis=1)
+                lower, median, upper = _sorted_quantiles(ordered, count, (0.25, 0.5, 0.75))
+                minimum, maximum = _sorted_quantiles(ordered, count, (0.0, 1.0))
+            
+            return pd.DataFrame({
+                '列名': [str(c) for c in numeric.columns],
+                '数据点数': count,
+                '缺失值': len(numeric) - count,
+                '平均值': mean,
+                '中位数': median,
+                '标准差': np.sqrt(variance),
+                '方差': variance,
+                '最小值': minimum,
+                '最大值': maximum,
+                '下四分位数': lower,
+                '上四分位数': upper,
+            })
         except Exception as e:
             return f"错误: {str(e)}"
     
@@ -48,6 +162,76 @@ class DataProcessor:
         except Exception as e:
             return f"错误: {str(e)}"
     
+    def correlation_matrix(self, df, method='pearson', block_size=256):
+        """所有数值型列两两之间的相关系数矩阵及p值
+        
+        - pearson:  各列中心化后按 block_size 列一块做矩阵乘法，中间结果只有块大小，
+                    NaN按成对删除处理（每对列只用两列都有值的行）
+        - spearman: 没有NaN时每列只排名一次（平均秩），再对秩做分块Pearson；
+                    含NaN时每对列在共同有效的行上重新排名（DataFrame.corr 的逐对实现）
+        - kendall:  没有矩阵形式，逐对调用 scipy.stats.kendalltau（未向量化），
+                    最多 KENDALL_MAX_COLUMNS 列
+        Pearson/Spearman 的p值由 t = r·√((n-2)/(1-r²)) 的t分布整体向量化计算。
+        返回 {'相关系数', 'p值', '样本数'}（均为以列名为行列索引的DataFrame）和 '方法'。
+        """
+        try:
+            numeric = df.select_dtypes(include=[np.number])
+            if numeric.shape[1] < 2:
+                return "错误: 至少需要两个数值型列"
+            columns = [str(c) for c in numeric.columns]
+            
+            if method == 'kendall':
+                if numeric.shape[1] > KENDALL_MAX_COLUMNS:
+                    return (f"错误: Kendall 相关系数需要逐对计算，最多支持 {KENDALL_MAX_COLUMNS} 列"
+                            f"（当前 {numeric.shape[1]} 列），请减少列数或改用 spearman")
+                corr, p_values, counts = self._kendall_matrix(numeric.to_numpy(dtype=float, na_value=np.nan))
+            elif method in ('pearson', 'spearman'):
+                values = numeric.to_numpy(dtype=float, na_value=np.nan)
+                if method == 'spearman' and np.isnan(values).any():
+                    # 含NaN时每对列要在两列都有值的行上重新排名，交给 pandas 的逐对实现
+                    corr = numeric.corr(method='spearman').to_numpy()
+                    counts = _pairwise_counts(values, block_size)
+                else:
+                    if method == 'spearman':
+                        values = numeric.rank(method='average').to_numpy(dtype=float)
+                    corr, counts = _blockwise_pearson(values, block_size)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    dof = counts - 2
+                    t_stat = corr * np.sqrt(dof / (1 - corr ** 2))
+                    p_values = np.where(dof > 0, 2 * stats.t.sf(np.abs(t_stat), dof), np.nan)
+                np.fill_diagonal(p_values, 0.0)
+            else:
+                return f"错误: 不支持的相关系数类型 {method}"
+            
+            frame = lambda matrix: pd.DataFrame(matrix, index=columns, columns=columns)
+            return {
+                '相关系数': frame(corr),
+                'p值': frame(p_values),
+                '样本数': frame(counts),
+                '方法': method
+            }
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    @staticmethod
+    def _kendall_matrix(values):
+        """逐对计算Kendall τ及p值（成对删除NaN）"""
+        m = values.shape[1]
+        corr = np.eye(m)
+        p_values = np.zeros((m, m))
+        valid = ~np.isnan(values)
+        counts = valid.T.astype(float) @ valid.astype(float)
+        for i in range(m):
+            for j in range(i + 1, m):
+                rows = valid[:, i] & valid[:, j]
+                if rows.sum() < 2:
+                    tau, p = np.nan, np.nan
+                else:
+                    tau, p = stats.kendalltau(values[rows, i], values[rows, j])
+                corr[i, j] = corr[j, i] = tau
+                p_values[i, j] = p_values[j, i] = p
+        return corr, p_values, counts.astype(int)
+    
     def _interpret_correlation(self, corr):
         """解释相关性强度"""
         abs_corr = abs(corr)
@@ -61,45 +245,62 @@ class DataProcessor:
             return "几乎无相关"
     
     def curve_fitting(self, x_data, y_data, fit_type='linear'):
-        """曲线拟合"""
+        """曲线拟合
+        
+        返回 FitResult（仍是含 '拟合方程'、'拟合数据'、'R²'、'拟合类型' 的字典），
+        可用 predict(x) 在新的x上求值，绘图时不必重新拟合。
+        结果按数据内容和拟合类型缓存，相同数据再次拟合直接返回缓存结果。
+        """
         try:
-            x_data = np.array(x_data)
-            y_data = np.array(y_data)
+            x_data = np.asarray(x_data, dtype=float)
+            y_data = np.asarray(y_data, dtype=float)
+            key = self._fit_key(x_data, y_data, fit_type)
+            result = self.fit_cache.get(key)
+            if result is not None:
+                return result
             
             if fit_type == 'linear':
                 # 线性拟合
                 slope, intercept, r_value, p_value, std_err = stats.linregress(x_data, y_data)
-                fitted_y = slope * x_data + intercept
+                params = (slope, intercept)
                 equation = f"y = {slope:.4f}x + {intercept:.4f}"
-                r_squared = r_value ** 2
                 
             elif fit_type == 'polynomial':
                 # 多项式拟合（二次）
-                coeffs = np.polyfit(x_data, y_data, 2)
-                fitted_y = np.polyval(coeffs, x_data)
-                equation = f"y = {coeffs[0]:.4f}x² + {coeffs[1]:.4f}x + {coeffs[2]:.4f}"
-                r_squared = self._calculate_r_squared(y_data, fitted_y)
+                params = tuple(np.polyfit(x_data, y_data, 2))
+                equation = f"y = {params[0]:.4f}x² + {params[1]:.4f}x + {params[2]:.4f}"
                 
             elif fit_type == 'exponential':
                 # 指数拟合
-                def exp_func(x, a, b, c):
-                    return a * np.exp(b * x) + c
-                
-                popt, _ = curve_fit(exp_func, x_data, y_data, maxfev=1000)
-                fitted_y = exp_func(x_data, *popt)
-                equation = f"y = {popt[0]:.4f} * exp({popt[1]:.4f}x) + {popt[2]:.4f}"
+                params, _ = optimize.curve_fit(FitResult.MODELS['exponential'], x_data, y_data, maxfev=1000)
+                params = tuple(params)
+                equation = f"y = {params[0]:.4f} * exp({params[1]:.4f}x) + {params[2]:.4f}"
+            
+            else:
+                return f"错误: 不支持的拟合类型 {fit_type}"
+            
+            fitted_y = FitResult.MODELS[fit_type](x_data, *params)
+            if fit_type == 'linear':
+                r_squared = r_value ** 2
+            else:
                 r_squared = self._calculate_r_squared(y_data, fitted_y)
             
-            return {
-                '拟合方程': equation,
-                '拟合数据': fitted_y.tolist(),
-                'R²': r_squared,
-                '拟合类型': fit_type
-            }
+            result = FitResult(fit_type, params, equation, fitted_y, r_squared)
+            self.fit_cache.put(key, result)
+            return result
             
         except Exception as e:
             return f"错误: {str(e)}"
     
+    @staticmethod
+    def _fit_key(x_data, y_data, fit_type):
+        """拟合缓存的键：数据内容和拟合类型的SHA-256摘要"""
+        digest = hashlib.sha256(fit_type.encode())
+        for array in (x_data, y_data):
+            digest.update(str(array.shape).encode())
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+    
     def _calculate_r_squared(self, y_actual, y_predicted):
         """计算R²值"""
         ss_res = np.sum((y_actual - y_predicted) ** 2)
@@ -138,4 +339,104 @@ class DataProcessor:
             }
             
         except Exception as e:
-            return f"错误: {str(e)}"
\ No newline at end of file
+            return f"错误: {str(e)}"
+
+
+def _blockwise_pearson(values, block_size=256):
+    """分块计算成对删除NaN的Pearson相关系数矩阵，返回 (相关系数, 样本数)
+    
+    X 为去掉NaN（置0）的中心化数据，M 为有效值掩码，对每对列块 (I, J)：
+        n = M_I'M_J,  Sx = X_I'M_J,  Sy = M_I'X_J,  Sxx = (X_I²)'M_J,  Syy = M_I'(X_J²),  Sxy = X_I'X_J
+        r = (n·Sxy - Sx·Sy) / √((n·Sxx - Sx²)(n·Syy - Sy²))
+    没有NaN时先把各列标准化，每块只需一次矩阵乘法 r = Z_I'Z_J / N。
+    X、M、Z 都按列块即时生成，除输入外的内存占用为 O(行数 × block_size)。
+    """
+    m = values.shape[1]
+    complete = not np.isnan(values).any()
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        # 全为NaN的列均值为NaN，不需要 "Mean of empty slice" 警告
+        warnings.simplefilter('ignore', RuntimeWarning)
+        means = values.mean(axis=0) if complete else np.nanmean(values, axis=0)
+    stds = values.std(axis=0) if complete else None
+    
+    def block_arrays(columns):
+        """列块的 (标准化数据,) 或 (中心化数据, 掩码, 中心化数据平方)"""
+        block = values[:, columns]
+        if complete:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return ((block - means[columns]) / stds[columns],)
+        mask = ~np.isnan(block)
+        centered = np.where(mask, block - means[columns], 0.0)
+        return centered, mask.astype(float), centered ** 2
+    
+    corr = np.empty((m, m))
+    counts = np.empty((m, m))
+    for i in range(0, m, block_size):
+        I = slice(i, i + block_size)
+        left = block_arrays(I)
+        for j in range(i, m, block_size):
+            J = slice(j, j + block_size)
+            right = left if j == i else block_arrays(J)
+            if complete:
+                block = left[0].T @ right[0] / len(values)
+                n = np.full(block.shape, float(len(values)))
+                _store_block(corr, counts, I, J, block, n)
+                continue
+            (x_i, w_i, xx_i), (x_j, w_j, xx_j) = left, right
+            n = w_i.T @ w_j
+            sx = x_i.T @ w_j
+            sy = w_i.T @ x_j
+            sxx = xx_i.T @ w_j
+            syy = w_i.T @ xx_j
+            sxy = x_i.T @ x_j
+            with np.errstate(divide='ignore', invalid='ignore'):
+                block = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+            _store_block(corr, counts, I, J, block, n)
+    np.fill_diagonal(corr, np.where(np.diag(counts) > 1, 1.0, np.nan))
+    return corr, counts.astype(int)
+
+
+def _pairwise_counts(values, block_size=256):
+    """每对列都有值的行数，按列块计算"""
+    m = values.shape[1]
+    counts = np.empty((m, m), dtype=int)
+    for i in range(0, m, block_size):
+        I = slice(i, i + block_size)
+        w_i = (~np.isnan(values[:, I])).astype(float)
+        for j in range(i, m, block_size):
+            J = slice(j, j + block_size)
+            n = w_i.T @ (~np.isnan(values[:, J])).astype(float)
+            counts[I, J], counts[J, I] = n, n.T
+    return counts
+
+
+def _store_block(corr, counts, I, J, block, n):
+    """写入对称矩阵的 (I, J) 块和 (J, I) 块"""
+    block = np.clip(block, -1.0, 1.0)
+    corr[I, J], counts[I, J] = block, n
+    corr[J, I], counts[J, I] = block.T, n.T
+
+
+def _sorted_quantiles(ordered, count, quantiles):
+    """从按行排序（NaN在末尾）的二维数组中读取各行的分位数，count 为各行有效数据个数
+    
+    与 np.percentile 的线性插值相同；没有有效数据的行为NaN。
+    """
+    last = np.maximum(count - 1, 0)[:, None]
+    position = np.asarray(quantiles, dtype=float)[None, :] * last
+    below = np.floor(position).astype(int)
+    above = np.minimum(below + 1, last)
+    fraction = position - below
+    low = np.take_along_axis(ordered, below, axis=1)
+    high = np.take_along_axis(ordered, above, axis=1)
+    result = low + (high - low) * fraction
+    result[count == 0] = np.nan
+    return result.T
+
+
+def _chunk_statistics(chunk):
+    """在工作进程中统计一块数据，返回可合并的部分结果
+    
+    分位数直接进入草图（exact_limit=0），传回主进程的只有草图而不是原始数据。
+    """
+    return StreamingStatistics(exact_limit=0).update(chunk)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+表达式编译缓存模块
+功能：表达式字符串只编译一次，命名空间只构建一次，结果按LRU淘汰
+"""
+
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _as_2d_array(data):
+    """构造二维ndarray，替代已弃用的np.matrix"""
+    return np.atleast_2d(np.asarray(data, dtype=float))
+
+
+def build_math_namespace():
+    """构建基于math模块的求值命名空间"""
+    namespace = {
+        k: v for k, v in math.__dict__.items() if not k.startswith("__")
+    }
+    namespace.update({
+        "abs": abs, "round": round, "min": min, "max": max,
+        "sum": sum, "pow": pow, 'det': np.linalg.det, 'inv': np.linalg.inv,
+        'mat': _as_2d_array
+    })
+    return namespace
+
+
+def _numpy_log(x, base=None):
+    """与math.log同签名的向量化对数"""
+    if base is None:
+        return np.log(x)
+    return np.log(x) / np.log(base)
+
+
+def build_numpy_namespace():
+    """构建向量化求值命名空间：用NumPy ufunc替换同名的math函数
+
+    没有对应ufunc的函数（如factorial）仍保留math版本，
+    传入数组时会报错，由调用方回退到标量路径。
+    """
+    namespace = build_math_namespace()
+    namespace.update({
+        'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+        'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan, 'atan2': np.arctan2,
+        'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+        'asinh': np.arcsinh, 'acosh': np.arccosh, 'atanh': np.arctanh,
+        'exp': np.exp, 'expm1': np.expm1, 'exp2': np.exp2,
+        'log': _numpy_log, 'log10': np.log10, 'log2': np.log2, 'log1p': np.log1p,
+        'sqrt': np.sqrt, 'cbrt': np.cbrt, 'fabs': np.fabs, 'abs': np.abs,
+        'floor': np.floor, 'ceil': np.ceil, 'trunc': np.trunc,
+        'hypot': np.hypot, 'copysign': np.copysign, 'fmod': np.fmod,
+        'degrees': np.degrees, 'radians': np.radians, 'pow': np.power,
+        'isnan': np.isnan, 'isinf': np.isinf, 'isfinite': np.isfinite,
+        'np': np
+    })
+    return namespace
+
+
+class LRUCache:
+    """带命中统计的有界LRU缓存"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """读取缓存，命中时移动到队尾"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """写入缓存，超出容量时淘汰最久未使用的项"""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        """清空缓存及统计"""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """返回命中统计"""
+        total = self.hits + self.misses
+        return {
+            '命中': self.hits,
+            '未命中': self.misses,
+            '命中率': self.hits / total if total else 0.0,
+            '条目数': len(self._data),
+            '容量': self.maxsize
+        }
+
+
+class ExpressionCache(LRUCache):
+    """表达式编译缓存
+
+    以 (表达式, 变量) 为键缓存编译结果：
+    - 无变量时缓存可直接调用的无参函数
+    - 有变量时把表达式编译为 lambda，调用时不再重建命名空间
+    """
+
+    def __init__(self, maxsize=256, namespace=None):
+        super().__init__(maxsize)
+        self._globals = {"__builtins__": {}}
+        self._globals.update(namespace if namespace is not None else build_math_namespace())
+
+    def get_function(self, expression, variable=None):
+        """获取表达式对应的已编译函数
+
+        variable 为多个变量（列表/元组或 'x, y' 形式的字符串）时，
+        返回按该顺序接收参数的多元函数。
+        """
+        if isinstance(variable, (list, tuple)):
+            variable = ', '.join(variable)
+        key = (expression, variable)
+        func = self.get(key)
+        if func is None:
+            func = self._compile(expression, variable)
+            self.put(key, func)
+        return func
+
+    def evaluate(self, expression, variable=None, value=None):
+        """计算表达式的值"""
+        func = self.get_function(expression, variable)
+        if variable is None:
+            return func()
+        return func(value)
+
+    def _compile(self, expression, variable):
+        """编译表达式，只在缓存未命中时调用"""
+        if variable is None:
+            code = compile(expression, '<expression>', 'eval')
+            namespace = self._globals
+            # 局部命名空间每次新建，避免海象运算符污染共享的全局命名空间
+            return lambda: eval(code, namespace, {})
+
+        for name in variable.split(','):
+            if not name.strip().isidentifier():
+                raise ValueError(f"无效的变量名: {variable}")
+        # 先单独编译表达式，保证语法错误信息指向用户输入
+        compile(expression, '<expression>', 'eval')
+        code = compile(f"lambda {variable}: ({expression}\n)", '<expression>', 'eval')
+        return eval(code, self._globals)
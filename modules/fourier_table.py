@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+傅里叶变换对表
+功能：按表达式结构索引的常见变换对，配合线性、平移、伸缩、调制规则快速求变换，
+查不到时由调用方回退到sympy的积分求解
+
+约定与 sympy.fourier_transform 相同：
+    F(k) = ∫ f(t) e^{-2πikt} dt,    f(t) = ∫ F(k) e^{2πikt} dk
+"""
+
+from utils.lazy_import import lazy_import
+
+sp = lazy_import('sympy')
+
+
+def _linear(expr, t, real=True):
+    """expr = c*t + d（c≠0）时返回 (c, d)，否则返回None
+
+    real=True 时要求 c、d 为实数（平移和伸缩只对实参数有意义）。
+    """
+    c = sp.diff(expr, t)
+    if c == 0 or c.has(t):
+        return None
+    d = sp.expand(expr - c * t)
+    if d.has(t):
+        return None
+    if real and (not c.is_extended_real or d.is_extended_real is False):
+        return None
+    return c, d
+
+
+def _quadratic(expr, t):
+    """expr 为 t 的二次多项式时返回系数 (p, q, r)，否则返回None"""
+    if not expr.is_polynomial(t):
+        return None
+    poly = sp.Poly(expr, t)
+    if poly.degree() != 2:
+        return None
+    return tuple(poly.all_coeffs())
+
+
+def _scaled(G, c, d, k):
+    """伸缩平移规则：g(ct+d) 的变换为 (1/|c|) e^{2πikd/c} G(k/c)"""
+    return sp.exp(2 * sp.pi * sp.I * k * d / c) * G(k / c) / sp.Abs(c)
+
+
+def _rect(k, half_width):
+    """|k| < half_width 时为1的矩形函数（Heaviside差）"""
+    return sp.Heaviside(k + half_width) - sp.Heaviside(k - half_width)
+
+
+# ---- 变换对：每条规则接收 (f, t, k)，无法处理时返回None ----
+
+def _rule_exp(f, t, k):
+    """exp(-(a t² + b t))（高斯）与 exp(-a|ct+d|)（双边指数）"""
+    exponent = f.exp
+    quadratic = _quadratic(exponent, t)
+    if quadratic is not None:
+        p, q, r = quadratic
+        a, b = -p, -q
+        if not a.is_positive:
+            return None
+        return sp.sqrt(sp.pi / a) * sp.exp(sp.expand((b + 2 * sp.pi * sp.I * k) ** 2 / (4 * a) - r))
+
+    # exp(-a|L|)，L 为 t 的一次式
+    coeff, rest = exponent.as_independent(t, as_Add=False)
+    if isinstance(rest, sp.Abs) and (-coeff).is_positive:
+        linear = _linear(rest.args[0], t)
+        if linear is not None:
+            c, d = linear
+            a = -coeff
+            return _scaled(lambda s: 2 / (1 + 4 * sp.pi ** 2 * s ** 2), a * c, a * d, k)
+    return None
+
+
+def _rule_heaviside(f, t, k):
+    """Heaviside(ct+d)：δ(k)/2 + sign(c) e^{2πikd/c} / (2πik)"""
+    linear = _linear(f.args[0], t)
+    if linear is None:
+        return None
+    c, d = linear
+    return (sp.DiracDelta(k) / 2
+            + sp.sign(c) * sp.exp(2 * sp.pi * sp.I * k * d / c) / (2 * sp.pi * sp.I * k))
+
+
+def _rule_delta(f, t, k):
+    """DiracDelta(ct+d)：e^{2πikd/c} / |c|"""
+    if len(f.args) != 1:
+        return None
+    linear = _linear(f.args[0], t)
+    if linear is None:
+        return None
+    return _scaled(lambda s: sp.Integer(1), *linear, k)
+
+
+def _rule_one_sided_exp(f, t, k):
+    """Heaviside(ct+d)·exp(-a t)：单边指数衰减"""
+    step = next(arg for arg in f.args if isinstance(arg, sp.Heaviside))
+    decay = next(arg for arg in f.args if isinstance(arg, sp.exp))
+    linear = _linear(step.args[0], t)
+    exponent = _linear(decay.exp, t)
+    if linear is None or exponent is None or exponent[1] != 0:
+        return None
+    c, d = linear
+    a = -exponent[0]
+    t0 = -d / c
+    s = a + 2 * sp.pi * sp.I * k
+    if c.is_positive and a.is_positive:
+        # 在 t > t0 上衰减
+        return sp.exp(-s * t0) / s
+    if c.is_negative and a.is_negative:
+        # 在 t < t0 上衰减
+        return -sp.exp(-s * t0) / s
+    return None
+
+
+def _rule_reciprocal(f, t, k):
+    """1/(ct+d) 与 1/(p t² + q t + r)（洛伦兹型）
+
+    1/(t-z)：z 在上半平面时为 2πi e^{-2πikz} H(-k)，在下半平面时为 -2πi e^{-2πikz} H(k)，
+    z 为实数时取主值 -iπ sign(k) e^{-2πikz}。
+    """
+    if f.exp != -1:
+        return None
+    linear = _linear(f.base, t, real=False)
+    if linear is not None:
+        c, d = linear
+        z = -d / c
+        shift = sp.exp(-2 * sp.pi * sp.I * k * z) / c
+        if z.is_extended_real:
+            return -sp.I * sp.pi * sp.sign(k) * shift
+        if sp.im(z).is_positive:
+            return 2 * sp.pi * sp.I * sp.Heaviside(-k) * shift
+        if sp.im(z).is_negative:
+            return -2 * sp.pi * sp.I * sp.Heaviside(k) * shift
+        return None
+
+    quadratic = _quadratic(f.base, t)
+    if quadratic is None:
+        return None
+    p, q, r = quadratic
+    # 配方：p[(t + q/2p)² + m²]
+    m2 = sp.simplify(r / p - q ** 2 / (4 * p ** 2))
+    if not m2.is_positive or not p.is_extended_real or not q.is_extended_real:
+        return None
+    m = sp.sqrt(m2)
+    return sp.pi / (p * m) * sp.exp(-2 * sp.pi * m * sp.Abs(k)) * sp.exp(sp.pi * sp.I * k * q / p)
+
+
+def _rule_sinc(f, t, k):
+    """sinc(ct+d) 与 sin(at)/t：矩形频谱"""
+    if isinstance(f, sp.sinc):
+        linear = _linear(f.args[0], t)
+        if linear is None:
+            return None
+        c, d = linear
+        return (sp.pi / sp.Abs(c) * sp.exp(2 * sp.pi * sp.I * k * d / c)
+                * _rect(k, sp.Abs(c) / (2 * sp.pi)))
+
+    sine = next(arg for arg in f.args if isinstance(arg, sp.sin))
+    power = next(arg for arg in f.args if isinstance(arg, sp.Pow))
+    linear = _linear(sine.args[0], t)
+    if power != 1 / t or linear is None or linear[1] != 0:
+        return None
+    a = linear[0]
+    return sp.sign(a) * sp.pi * _rect(k, sp.Abs(a) / (2 * sp.pi))
+
+
+# 按结构索引：单个函数为其类型名，乘积为各因子类型名排序后的元组
+RULES = {
+    ('exp',): _rule_exp,
+    ('Heaviside',): _rule_heaviside,
+    ('DiracDelta',): _rule_delta,
+    ('Heaviside', 'exp'): _rule_one_sided_exp,
+    ('Pow',): _rule_reciprocal,
+    ('Pow', 'sin'): _rule_sinc,
+    ('sinc',): _rule_sinc,
+}
+
+
+def structure_key(expr):
+    """表达式的结构键"""
+    if isinstance(expr, sp.Mul):
+        return tuple(sorted(type(arg).__name__ for arg in expr.args))
+    return (type(expr).__name__,)
+
+
+class FourierTable:
+    """基于变换对表和运算规则的傅里叶变换
+
+    分解顺序：线性（逐项）→ 提取常数因子 → 调制（e^{iβt} 因子变为频移）
+    → tⁿ 因子（频域求导）→ 按结构查表（表项自带平移、伸缩）
+    → 三角函数改写为指数后重试。
+    任何一项查不到时整体返回None，由调用方回退到sympy。
+    """
+
+    max_depth = 4
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def transform(self, f, t, k):
+        """正变换，查不到时返回None"""
+        try:
+            result = self._transform(sp.sympify(f), t, k, 0)
+        except (TypeError, ValueError, AttributeError, sp.PolynomialError):
+            result = None
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # 合并拆分常数时产生的 exp(a)·exp(b)
+        return sp.powsimp(result)
+
+    def inverse_transform(self, F, k, t):
+        """逆变换：由对偶性 f(t) = 𝓕[F](-t)，查不到时返回None"""
+        tau = sp.Dummy('tau')
+        result = self.transform(F, k, tau)
+        return None if result is None else result.subs(tau, -t)
+
+    def stats(self):
+        """查表命中统计"""
+        total = self.hits + self.misses
+        return {
+            '命中': self.hits,
+            '未命中': self.misses,
+            '命中率': self.hits / total if total else 0.0,
+        }
+
+    def _transform(self, f, t, k, depth):
+        if depth > self.max_depth:
+            return None
+        if not f.has(t):
+            return f * sp.DiracDelta(k)
+
+        # 线性
+        if isinstance(f, sp.Add):
+            parts = [self._transform(term, t, k, depth) for term in f.args]
+            return None if any(p is None for p in parts) else sp.Add(*parts)
+
+        # 常数因子
+        coeff, rest = f.as_independent(t, as_Add=False)
+        if coeff != 1:
+            inner = self._transform(rest, t, k, depth)
+            return None if inner is None else coeff * inner
+
+        # 合并指数因子，拆出常数项和虚数一次项（调制）
+        rest, constant, shift = self._split_exponent(rest, t)
+        if constant != 0 or shift != 0:
+            inner = self._transform(rest, t, k, depth + 1)
+            return None if inner is None else sp.exp(constant) * inner.subs(k, k - shift)
+
+        # tⁿ·g(t) 的变换为 (i/2π)ⁿ dⁿG/dkⁿ
+        power, rest = self._split_power(rest, t)
+        if power:
+            inner = self._transform(rest, t, k, depth + 1)
+            return None if inner is None else (sp.I / (2 * sp.pi)) ** power * sp.diff(inner, k, power)
+
+        rule = RULES.get(structure_key(rest))
+        if rule is not None:
+            result = rule(rest, t, k)
+            if result is not None:
+                return result
+
+        # cos/sin 调制：改写为复指数后按线性和调制规则处理
+        if rest.has(sp.sin, sp.cos):
+            rewritten = sp.expand(rest.rewrite(sp.exp))
+            if rewritten != rest:
+                return self._transform(rewritten, t, k, depth + 1)
+        return None
+
+    @staticmethod
+    def _split_power(f, t):
+        """拆出 tⁿ 因子（n 为正整数），返回 (n, 其余部分)；
+        sin(at)/t 等负幂因子保留给查表"""
+        power, others = 0, []
+        for arg in sp.Mul.make_args(f):
+            base, exp = arg.as_base_exp()
+            if base == t and exp.is_Integer and exp > 0:
+                power += int(exp)
+            else:
+                others.append(arg)
+        return power, sp.Mul(*others)
+
+    @staticmethod
+    def _split_exponent(f, t):
+        """把各 exp 因子的指数合并为 常数 + 2πi·ν·t + 其余部分
+
+        返回 (去掉常数和调制后的表达式, 常数, 频移ν)。
+        """
+        factors = sp.Mul.make_args(f)
+        exponents = [arg.exp for arg in factors if isinstance(arg, sp.exp)]
+        if not exponents:
+            return f, 0, 0
+        others = [arg for arg in factors if not isinstance(arg, sp.exp)]
+
+        constant, remaining, shift = 0, 0, 0
+        for term in sp.Add.make_args(sp.expand(sp.Add(*exponents))):
+            if not term.has(t):
+                constant += term
+                continue
+            slope = sp.diff(term, t)
+            if not slope.has(t) and sp.expand(term - slope * t) == 0 and (slope / sp.I).is_extended_real \
+                    and slope != 0:
+                shift += slope / (2 * sp.pi * sp.I)
+            else:
+                remaining += term
+        return sp.Mul(*others) * sp.exp(remaining), constant, shift
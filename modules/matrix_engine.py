@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矩阵运算引擎
+功能：ndarray/稀疏矩阵原生运算、分解复用、对称矩阵特征值、矩阵表达式求值
+"""
+
+import ast
+
+import numpy as np
+
+from utils.lazy_import import lazy_import
+
+# scipy 在第一次用到时才导入
+linalg = lazy_import('scipy.linalg')
+sparse = lazy_import('scipy.sparse')
+sparse_linalg = lazy_import('scipy.sparse.linalg')
+
+
+def as_matrix(matrix):
+    """转换为ndarray或稀疏矩阵，已经是数组时不复制"""
+    if sparse.issparse(matrix):
+        return matrix
+    return np.asarray(matrix)
+
+
+def is_symmetric(matrix, tol=1e-12):
+    """判断矩阵是否对称（复矩阵判断是否为Hermite矩阵，即等于其共轭转置）
+
+    eigvalsh/eigsh/Cholesky 只适用于Hermite矩阵，复对称矩阵不能走这些快速路径。
+    """
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        return False
+    if sparse.issparse(matrix):
+        diff = abs(matrix - matrix.conj().T)
+        return diff.nnz == 0 or diff.max() <= tol * max(abs(matrix).max(), 1.0)
+    return np.allclose(matrix, matrix.conj().T, rtol=0, atol=tol * max(np.abs(matrix).max(), 1.0))
+
+
+class MatrixFactorization:
+    """矩阵分解结果，可反复用于求解 A x = b
+
+    稠密对称正定矩阵使用Cholesky分解，其余稠密矩阵使用LU分解，
+    稀疏矩阵使用SuperLU。
+    """
+
+    def __init__(self, matrix, assume='auto'):
+        self.matrix = as_matrix(matrix)
+        self.shape = self.matrix.shape
+        if self.matrix.ndim != 2 or self.shape[0] != self.shape[1]:
+            raise ValueError("只能分解方阵")
+
+        if sparse.issparse(self.matrix):
+            self.kind = 'splu'
+            self._factor = sparse_linalg.splu(sparse.csc_matrix(self.matrix))
+            return
+
+        self._factor = None
+        if assume in ('auto', 'cholesky') and is_symmetric(self.matrix):
+            try:
+                self._factor = linalg.cho_factor(self.matrix, check_finite=False)
+                self.kind = 'cholesky'
+            except linalg.LinAlgError:
+                if assume == 'cholesky':
+                    raise
+        if self._factor is None:
+            self._factor = linalg.lu_factor(self.matrix, check_finite=False)
+            self.kind = 'lu'
+
+    def solve(self, rhs):
+        """求解 A x = rhs，rhs 可以是向量或多列矩阵"""
+        if sparse.issparse(rhs):
+            rhs = rhs.toarray()
+        rhs = np.asarray(rhs)
+        if self.kind == 'splu':
+            return self._factor.solve(rhs)
+        if self.kind == 'cholesky':
+            return linalg.cho_solve(self._factor, rhs, check_finite=False)
+        return linalg.lu_solve(self._factor, rhs, check_finite=False)
+
+    def determinant(self):
+        """由分解结果计算行列式，复矩阵返回复数"""
+        if self.kind == 'cholesky':
+            # Hermite正定矩阵的Cholesky因子对角元为正实数
+            return float(np.prod(np.diag(self._factor[0]).real) ** 2)
+        if self.kind == 'lu':
+            lu, piv = self._factor
+            swaps = np.count_nonzero(piv != np.arange(len(piv)))
+            return _scalar((-1) ** swaps * np.prod(np.diag(lu)))
+        diag = self._factor.U.diagonal()
+        sign = _permutation_sign(self._factor.perm_r) * _permutation_sign(self._factor.perm_c)
+        return _scalar(sign * np.prod(diag))
+
+    def inverse(self):
+        """求逆矩阵（仅在确实需要逆矩阵本身时使用）"""
+        return self.solve(np.eye(self.shape[0]))
+
+
+def _scalar(value):
+    """numpy标量转为Python数值，保留复数"""
+    return complex(value) if np.iscomplexobj(value) else float(value)
+
+
+def _permutation_sign(perm):
+    """置换的奇偶性"""
+    perm = np.asarray(perm)
+    visited = np.zeros(len(perm), dtype=bool)
+    sign = 1
+    for start in range(len(perm)):
+        if visited[start]:
+            continue
+        length = 0
+        j = start
+        while not visited[j]:
+            visited[j] = True
+            j = perm[j]
+            length += 1
+        if length % 2 == 0:
+            sign = -sign
+    return sign
+
+
+# 未指定 k 时，不超过此阶数的稀疏矩阵转为稠密矩阵求全部特征值
+DENSE_EIGEN_LIMIT = 2000
+
+
+def eigenvalues(matrix, k=None, which='LM'):
+    """特征值
+
+    未指定 k 时返回全部特征值：对称（Hermite）矩阵使用 eigvalsh，其余使用 eigvals；
+    不超过 DENSE_EIGEN_LIMIT 阶的稀疏矩阵先转为稠密矩阵，更大的稀疏矩阵必须指定 k。
+    指定 k 时只求 which 所指的 k 个特征值（eigsh/eigs），结果是部分谱。
+    """
+    if k is None and sparse.issparse(matrix):
+        n = matrix.shape[0]
+        if n > DENSE_EIGEN_LIMIT:
+            raise ValueError(f"稀疏矩阵阶数为 {n}，求全部特征值代价过高，请指定 k 只求部分特征值")
+        matrix = matrix.toarray()
+    if k is not None:
+        if is_symmetric(matrix):
+            return sparse_linalg.eigsh(matrix, k=k, which=which, return_eigenvectors=False)
+        return sparse_linalg.eigs(matrix, k=k, which=which, return_eigenvectors=False)
+    if is_symmetric(matrix):
+        return linalg.eigvalsh(matrix, check_finite=False)
+    return linalg.eigvals(matrix, check_finite=False)
+
+
+def chain_flops(shapes, order='optimal'):
+    """矩阵连乘的浮点运算次数（乘加各算一次）
+
+    shapes 为各因子的形状；order='left' 为从左到右依次相乘的代价，
+    order='optimal' 为动态规划得到的最优加括号方式的代价。
+    """
+    dims = [shapes[0][0]] + [shape[1] for shape in shapes]
+    n = len(shapes)
+    if order == 'left':
+        return sum(2 * dims[0] * dims[i] * dims[i + 1] for i in range(1, n))
+    cost = [[0] * n for _ in range(n)]
+    for length in range(1, n):
+        for i in range(n - length):
+            j = i + length
+            cost[i][j] = min(
+                cost[i][k] + cost[k + 1][j] + 2 * dims[i] * dims[k + 1] * dims[j + 1]
+                for k in range(i, j)
+            )
+    return cost[0][n - 1]
+
+
+class MatrixExpressionEvaluator:
+    """矩阵表达式求值（基于ndarray）
+
+    - mat(...) 构造二维ndarray；矩阵之间的 * 与 @ 都表示矩阵乘法
+    - 连乘 A @ B @ C 整体交给 np.linalg.multi_dot，按最优顺序计算
+    - 连乘中的 inv(X) 改写为 solve，只有单独出现的 inv(X) 才真正求逆
+    - 通过AST逐节点求值，不使用eval
+    """
+
+    _BINARY = {
+        ast.Add: lambda a, b: a + b,
+        ast.Sub: lambda a, b: a - b,
+        ast.Div: lambda a, b: a / b,
+        ast.FloorDiv: lambda a, b: a // b,
+        ast.Mod: lambda a, b: a % b,
+        ast.Pow: lambda a, b: np.linalg.matrix_power(a, b) if _is_matrix(a) else a ** b,
+    }
+    _UNARY = {
+        ast.UAdd: lambda a: +a,
+        ast.USub: lambda a: -a,
+    }
+
+    def __init__(self, namespace=None):
+        self.namespace = dict(namespace or {})
+        self.namespace.update({
+            'mat': lambda data: np.atleast_2d(np.asarray(data, dtype=float)),
+            'inv': np.linalg.inv,
+            'det': np.linalg.det,
+            'solve': np.linalg.solve,
+            'transpose': np.transpose,
+            'eye': np.eye,
+        })
+        self._reset_report()
+
+    def _reset_report(self):
+        self.report = {'乘法链': 0, '节省FLOP': 0, '避免求逆': 0}
+
+    def evaluate(self, expression, variables=None):
+        """计算矩阵表达式，返回 (结果, 统计信息)"""
+        self._reset_report()
+        names = dict(self.namespace)
+        if variables:
+            names.update({k: as_matrix(v) for k, v in variables.items()})
+        tree = ast.parse(expression.strip(), mode='eval')
+        result = self._eval(tree.body, names)
+        return result, dict(self.report)
+
+    def _eval(self, node, names):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, complex)):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id not in names:
+                raise NameError(f"name '{node.id}' is not defined")
+            return names[node.id]
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return np.asarray([self._eval(item, names) for item in node.elts])
+        if isinstance(node, ast.UnaryOp) and type(node.op) in self._UNARY:
+            return self._UNARY[type(node.op)](self._eval(node.operand, names))
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Mult, ast.MatMult)):
+            return self._eval_product(node, names)
+        if isinstance(node, ast.BinOp) and type(node.op) in self._BINARY:
+            return self._BINARY[type(node.op)](self._eval(node.left, names), self._eval(node.right, names))
+        if isinstance(node, ast.Attribute) and node.attr == 'T':
+            return np.transpose(self._eval(node.value, names))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            func = self._eval(node.func, names)
+            return func(*[self._eval(arg, names) for arg in node.args])
+        raise ValueError(f"矩阵表达式不支持的语法: {ast.dump(node)[:40]}")
+
+    def _flatten_product(self, node):
+        """展开 a * b @ c ... 形式的连乘为因子列表"""
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Mult, ast.MatMult)):
+            return self._flatten_product(node.left) + self._flatten_product(node.right)
+        return [node]
+
+    def _eval_product(self, node, names):
+        """连乘求值：标量因子先合并，矩阵因子按最优顺序相乘"""
+        scalars = []
+        factors = []
+        for factor in self._flatten_product(node):
+            if (isinstance(factor, ast.Call) and isinstance(factor.func, ast.Name)
+                    and factor.func.id == 'inv' and names.get('inv') is np.linalg.inv
+                    and len(factor.args) == 1 and not factor.keywords):
+                factors.append(('inv', self._eval(factor.args[0], names)))
+                continue
+            value = self._eval(factor, names)
+            if isinstance(value, (list, tuple)):
+                value = np.asarray(value)
+            if _is_matrix(value):
+                factors.append(('mat', value))
+            elif np.ndim(value) == 0:
+                scalars.append(value)
+            else:
+                raise ValueError(f"连乘因子不是数值或矩阵: {type(value).__name__}")
+        scalar = scalars[0] if scalars else None
+        for value in scalars[1:]:
+            scalar = scalar * value
+        if not factors:
+            return scalar
+        product = self._resolve_inverses(factors)
+        return product if scalar is None else scalar * product
+
+    def _resolve_inverses(self, factors):
+        """把连乘中的 inv(X) 改写为线性方程组求解"""
+        for index, (kind, value) in enumerate(factors):
+            if kind != 'inv':
+                continue
+            left = [v for _, v in factors[:index]]
+            right = factors[index + 1:]
+            if right:
+                rhs = self._resolve_inverses(right)
+                solved = np.linalg.solve(value, rhs)
+                self._count_avoided_inverse(value)
+                return self._multiply(left + [solved])
+            if left:
+                lhs = self._multiply(left)
+                solved = np.linalg.solve(value.T, lhs.T).T
+                self._count_avoided_inverse(value)
+                return solved
+            return np.linalg.inv(value)
+        return self._multiply([v for _, v in factors])
+
+    def _count_avoided_inverse(self, matrix):
+        """记录以solve代替求逆节省的运算量：求逆约2n³，LU分解约2n³/3"""
+        n = matrix.shape[0]
+        self.report['避免求逆'] += 1
+        self.report['节省FLOP'] += int(2 * n ** 3 - 2 * n ** 3 / 3)
+
+    def _multiply(self, matrices):
+        if len(matrices) == 1:
+            return matrices[0]
+        if len(matrices) == 2:
+            return matrices[0] @ matrices[1]
+        shapes = [m.shape if m.ndim > 1 else
+                  ((1, m.shape[0]) if i == 0 else (m.shape[0], 1))
+                  for i, m in enumerate(matrices)]
+        self.report['乘法链'] += 1
+        self.report['节省FLOP'] += chain_flops(shapes, 'left') - chain_flops(shapes, 'optimal')
+        return np.linalg.multi_dot(matrices)
+
+
+def _is_matrix(value):
+    return isinstance(value, np.ndarray) and value.ndim >= 1
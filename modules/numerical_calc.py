@@ -5,39 +5,140 @@
 功能：四则运算、数值积分、数值求解等
 """
 
+import os
+import re
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-from scipy import integrate, optimize
-# from scipy.misc import derivative  # 删除这行
-from scipy.optimize import approx_fprime  # 添加这行
-import math
+
+from utils.lazy_import import lazy_import
+from .compile_bridge import LAMBDIFY_MODULES, CompileBridge
+from .expression_cache import ExpressionCache, LRUCache, build_math_namespace, build_numpy_namespace
+from .system_solver import SystemSolver
+from .matrix_engine import MatrixExpressionEvaluator, MatrixFactorization, as_matrix, eigenvalues
+
+# sympy/scipy 在第一次用到时才导入
+sp = lazy_import('sympy')
+integrate = lazy_import('scipy.integrate')
+optimize = lazy_import('scipy.optimize')
+sparse = lazy_import('scipy.sparse')
+qmc = lazy_import('scipy.stats.qmc')
+
+# 含矩阵函数或 @ 运算符的表达式走矩阵表达式求值
+_MATRIX_EXPRESSION = re.compile(r'\b(mat|inv|det|solve|transpose)\s*\(|@|\.T\b')
+
+_sympy_locals_cache = {}
+
+def _sympy_locals():
+    """math模块中与sympy同名但含义不同、或sympy中不存在的名字"""
+    if not _sympy_locals_cache:
+        _sympy_locals_cache.update({
+            'e': sp.E, 'pi': sp.pi, 'tau': 2 * sp.pi, 'inf': sp.oo,
+            'fabs': sp.Abs, 'log10': lambda x: sp.log(x, 10), 'log2': lambda x: sp.log(x, 2),
+            'log1p': lambda x: sp.log(1 + x), 'expm1': lambda x: sp.exp(x) - 1,
+            'asin': sp.asin, 'acos': sp.acos, 'atan': sp.atan,
+        })
+    return _sympy_locals_cache
 
 class NumericalCalculator:
-    def __init__(self):
-        pass
+    def __init__(self, cache_size=256):
+        # 表达式编译缓存：命名空间只构建一次，表达式只编译一次
+        self.expression_cache = ExpressionCache(maxsize=cache_size)
+        # 向量化表达式缓存：math函数替换为NumPy ufunc，可一次计算整个节点数组
+        self.vector_cache = ExpressionCache(maxsize=cache_size, namespace=build_numpy_namespace())
+        # 符号求导后lambdify得到的导函数，无法符号求导时缓存False
+        self.derivative_cache = LRUCache(maxsize=cache_size)
+        self.matrix_evaluator = MatrixExpressionEvaluator(namespace=build_math_namespace())
+        # 符号结果（sympy对象）编译成的数值核函数
+        self.compile_bridge = CompileBridge(cache_size=cache_size)
+        self.system_solver = SystemSolver()
+        self._gauss_rules = {}
+        self._executor = None
+        self._executor_workers = None
     
     def basic_arithmetic(self, expression):
         """基本四则运算"""
         try:
+            if _MATRIX_EXPRESSION.search(expression):
+                result, _ = self.matrix_evaluator.evaluate(expression)
+                return result
             # 安全的数学表达式求值
-            allowed_names = {
-                k: v for k, v in math.__dict__.items() if not k.startswith("__")
-            }
-            allowed_names.update({
-                "abs": abs, "round": round, "min": min, "max": max,
-                "sum": sum, "pow": pow, 'det': np.linalg.det, 'inv': np.linalg.inv,
-                'mat': np.matrix
-            })
-            
-            result = eval(expression, {"__builtins__": {}}, allowed_names)
+            result = self.expression_cache.evaluate(expression)
             return result
         except Exception as e:
             return f"错误: {str(e)}"
     
+    def evaluate_matrix_expression(self, expression, variables=None):
+        """矩阵表达式求值
+        
+        连乘按最优顺序计算（multi_dot），连乘中的 inv(X) 改写为 solve。
+        variables 可传入 {名称: 矩阵} 供表达式引用。
+        返回结果及乘法链数、节省的FLOP数、避免的求逆次数。
+        """
+        try:
+            result, report = self.matrix_evaluator.evaluate(expression, variables)
+            report['结果'] = result
+            return report
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    def cache_stats(self):
+        """表达式缓存命中统计"""
+        return {
+            '标量表达式': self.expression_cache.stats(),
+            '向量化表达式': self.vector_cache.stats(),
+            '导函数': self.derivative_cache.stats(),
+            '编译核函数': self.compile_bridge.cache_stats()
+        }
+    
+    def vectorized_function(self, func_str, variable, probe=None):
+        """获取向量化函数，表达式无法向量化时返回None"""
+        try:
+            func = self.vector_cache.get_function(func_str, variable)
+            if probe is None:
+                probe = np.linspace(0.1, 0.9, 5)
+            with np.errstate(all='ignore'):
+                values = np.asarray(func(probe), dtype=float)
+            if values.shape not in (probe.shape, ()):
+                return None
+            if values.shape == ():
+                # 标量结果只在与变量无关（常数表达式）时才能广播；
+                # 对整个数组做归约（如 sum(x)）的表达式换一组探测点结果会变，交给逐点计算
+                with np.errstate(all='ignore'):
+                    other = np.asarray(func(probe * 1.7 + 0.3), dtype=float)
+                if other.shape != () or not (other == values or (np.isnan(other) and np.isnan(values))):
+                    return None
+        except Exception:
+            return None
+        
+        def vector_func(x):
+            # 常数表达式返回标量，需要广播成与节点相同的形状
+            return np.broadcast_to(np.asarray(func(x), dtype=float), np.shape(x))
+        return vector_func
+    
+    def function_values(self, func_str, x_range=(-10, 10), num_points=1000, variable='x'):
+        """在等间距网格上计算函数值，返回 (x, y)，供绘图使用"""
+        x = np.linspace(x_range[0], x_range[1], num_points)
+        return x, self._evaluate_on_grid(func_str, variable, x)
+    
+    def evaluate_compiled(self, expr, variables, *values, backend='auto'):
+        """在网格上计算符号结果的值
+        
+        expr 为sympy对象（如符号求导、积分、变换的结果）或表达式字符串，
+        经cse后编译为NumPy/numexpr核函数并缓存，不再经过字符串和eval。
+        values 为各变量的取值数组，按NumPy规则广播。
+        """
+        try:
+            return self.compile_bridge.evaluate(expr, variables, *values, backend=backend)
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
     def calculate_derivative(self, func, x_val, dx=1e-8):
         """计算函数在指定点的导数"""
         try:
             # 使用approx_fprime替代原来的derivative
-            result = approx_fprime([x_val], lambda x: func(float(x)), dx)[0]
+            result = optimize.approx_fprime([x_val], lambda x: func(float(x[0])), dx)[0]
             return result
         except Exception as e:
             return f"错误: {str(e)}"
@@ -47,72 +148,558 @@ class NumericalCalculator:
         return self.basic_arithmetic(expression)
     
     def numerical_derivative(self, func_str, variable, point):
-        """数值求导 - 为GUI提供的接口"""
+        """数值求导 - 为GUI提供的接口
+        
+        优先对表达式做符号求导并lambdify为NumPy函数（结果精确且可缓存），
+        无法符号求导或导函数无法求值时回退到有限差分。point 可以是单个点或点数组，
+        传入数组时一次向量化调用得到全部导数值。函数本身在某点无定义时也按错误返回。
+        """
         try:
-            def func(x):
-                allowed_names = {
-                    k: v for k, v in math.__dict__.items() if not k.startswith("__")
-                }
-                allowed_names[variable] = x
-                return eval(func_str, {"__builtins__": {}}, allowed_names)
+            points = np.asarray(point, dtype=float)
+            values = function_values = None
+            compiled = self.symbolic_derivative(func_str, variable)
+            if compiled is not None:
+                function, derivative = compiled
+                try:
+                    with np.errstate(all='ignore'):
+                        function_values = np.broadcast_to(np.asarray(function(points), dtype=float), points.shape)
+                        values = np.broadcast_to(np.asarray(derivative(points), dtype=float), points.shape)
+                except (NameError, TypeError):
+                    # lambdify 无法打印或无法对数组求值的函数，改用有限差分
+                    values = function_values = None
+            if values is None:
+                vector_func = self.vectorized_function(func_str, variable)
+                if vector_func is not None:
+                    with np.errstate(all='ignore'):
+                        function_values = vector_func(points)
+                values = self._finite_difference(func_str, variable, points)
             
-            return self.calculate_derivative(func, point)
+            if isinstance(values, str):
+                return values
+            # 向量化求值不抛出定义域错误，超出定义域的点得到nan/inf，按错误返回
+            invalid = ~np.isfinite(values)
+            if function_values is not None:
+                invalid |= ~np.isfinite(function_values)
+            if invalid.any():
+                bad = ', '.join(f"{x:g}" for x in np.atleast_1d(points)[np.atleast_1d(invalid)][:5])
+                return f"错误: 在 {variable} = {bad} 处导数不存在（超出定义域或不可导）"
+            if points.ndim == 0:
+                return float(values)
+            return np.array(values)
         except Exception as e:
             return f"错误: {str(e)}"
     
-    def solve_equation_numerical(self, func_str, variable='x', initial_guess=0):
-        """数值求解方程 - 修复参数问题"""
+    def symbolic_derivative(self, func_str, variable):
+        """获取lambdify后的 (原函数, 导函数)，无法符号求导时返回None"""
+        key = (func_str, variable)
+        derivative = self.derivative_cache.get(key)
+        if derivative is None:
+            derivative = self._build_symbolic_derivative(func_str, variable)
+            self.derivative_cache.put(key, derivative)
+        return derivative or None
+    
+    def _build_symbolic_derivative(self, func_str, variable):
+        """符号求导并把原函数和导函数编译为NumPy/SciPy函数
+        
+        变量按实数处理，Abs 等函数的导数为 sign 而不是含 re/im 的表达式。
+        """
+        try:
+            var = sp.Symbol(variable, real=True)
+            local_names = dict(_sympy_locals())
+            local_names[variable] = var
+            expr = sp.sympify(func_str, locals=local_names)
+            if not expr.free_symbols <= {var}:
+                return False
+            return (sp.lambdify(var, expr, LAMBDIFY_MODULES),
+                    sp.lambdify(var, sp.diff(expr, var), LAMBDIFY_MODULES))
+        except Exception:
+            return False
+    
+    def _finite_difference(self, func_str, variable, points):
+        """有限差分求导：可向量化时用中心差分，否则逐点调用calculate_derivative"""
+        vector_func = self.vectorized_function(func_str, variable)
+        if vector_func is not None:
+            step = np.cbrt(np.finfo(float).eps) * np.maximum(1.0, np.abs(points))
+            with np.errstate(all='ignore'):
+                return (vector_func(points + step) - vector_func(points - step)) / (2 * step)
+        
+        func = self.expression_cache.get_function(func_str, variable)
+        values = np.empty(points.shape)
+        for index, x in np.ndenumerate(points):
+            result = self.calculate_derivative(func, float(x))
+            if isinstance(result, str):
+                return result
+            values[index] = result
+        return values
+    
+    @staticmethod
+    def _normalize_equation(func_str):
+        """把 'lhs = rhs' 形式的方程整理为 'lhs - rhs'"""
         func_str = func_str.replace('^', '**')
         if '=' in func_str:
             func_str = '-'.join(map(lambda x: '('+x+')', func_str.split('=')))
+        return func_str
+    
+    def solve_equation_numerical(self, func_str, variable='x', initial_guess=0):
+        """数值求解方程 - 修复参数问题"""
+        func_str = self._normalize_equation(func_str)
         try:
-            def func(x):
-                allowed_names = {
-                    k: v for k, v in math.__dict__.items() if not k.startswith("__")
-                }
-                allowed_names[variable] = x
-                return eval(func_str, {"__builtins__": {}}, allowed_names)
+            func = self.expression_cache.get_function(func_str, variable)
             
-            solution = optimize.fsolve(func, initial_guess)[0]
+            # fsolve 传入长度为1的数组，math 函数只接受标量
+            solution = optimize.fsolve(lambda x: func(float(x[0])), initial_guess)[0]
             return solution
         except Exception as e:
             return f"错误: {str(e)}"
     
-    def numerical_integration(self, func_str, variable, a, b):
+    def solve_system(self, equations, variables=None, bounds=(-10, 10), num_starts=64,
+                     symbolic_timeout=5.0, **kwargs):
+        """求解非线性方程组：先符号求解（限时），失败时多起点数值求根
+        
+        equations 为方程字符串列表或用 ';' 分隔的字符串，variables 如 'x, y'；
+        返回值见 SystemSolver.solve。
+        """
+        return self.system_solver.solve(equations, variables, bounds=bounds, num_starts=num_starts,
+                                        symbolic_timeout=symbolic_timeout, **kwargs)
+    
+    def solve_all_roots(self, func_str, variable, a, b, num_points=2001, xtol=1e-12,
+                        residual_tol=1e-8, max_workers=None, parallel_threshold=256):
+        """求区间 [a, b] 内的全部实根
+        
+        先在稠密网格上向量化求值，找出变号区间与 |f| 接近零的局部极小点，
+        再分别用 brentq 和有界极小化细化。区间数达到 parallel_threshold 时
+        细化步骤分发到进程池。返回去重后的根及收敛标志。
+        """
+        try:
+            func_str = self._normalize_equation(func_str)
+            a, b = float(a), float(b)
+            if not (np.isfinite(a) and np.isfinite(b)) or a >= b:
+                return "错误: 求根区间必须是有限区间且 a < b"
+            
+            grid = np.linspace(a, b, num_points)
+            y = self._evaluate_on_grid(func_str, variable, grid)
+            finite = np.isfinite(y)
+            
+            # 网格点恰好为零
+            exact = np.flatnonzero(finite & (y == 0))
+            # 变号区间
+            sign_change = np.flatnonzero(
+                finite[:-1] & finite[1:] & (np.sign(y[:-1]) * np.sign(y[1:]) < 0)
+            )
+            brackets = [(grid[i], grid[i + 1]) for i in sign_change]
+            # |f| 的局部极小点：可能是不变号的重根（如 x**2）
+            abs_y = np.abs(np.where(finite, y, np.inf))
+            interior = np.arange(1, num_points - 1)
+            is_min = (abs_y[interior] <= abs_y[interior - 1]) & (abs_y[interior] <= abs_y[interior + 1])
+            is_min &= np.sign(y[interior - 1]) == np.sign(y[interior + 1])
+            is_min &= abs_y[interior] > 0
+            minima = [(grid[i - 1], grid[i + 1]) for i in interior[is_min]]
+            
+            tasks = [('brentq', lo, hi) for lo, hi in brackets] + [('minimize', lo, hi) for lo, hi in minima]
+            if len(tasks) >= parallel_threshold:
+                workers = max_workers or os.cpu_count() or 1
+                size = max(1, -(-len(tasks) // (workers * 4)))
+                chunks = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+                executor = self._get_executor(workers)
+                jobs = [(func_str, variable, chunk, xtol, residual_tol) for chunk in chunks]
+                refined = [item for chunk in executor.map(_refine_root_brackets, jobs) for item in chunk]
+            else:
+                refined = _refine_root_brackets((func_str, variable, tasks, xtol, residual_tol), self)
+            
+            refined.extend((grid[i], True, 0.0, 'grid') for i in exact)
+            return self._deduplicate_roots(refined, max(xtol, 1e-9 * (b - a)))
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    def _evaluate_on_grid(self, func_str, variable, grid):
+        """在网格上求值，优先向量化，否则逐点计算（出错的点记为nan）"""
+        vector_func = self.vectorized_function(func_str, variable, grid[:5])
+        if vector_func is not None:
+            with np.errstate(all='ignore'):
+                return np.array(vector_func(grid), dtype=float)
+        
+        func = self.expression_cache.get_function(func_str, variable)
+        values = np.empty_like(grid)
+        for i, x in enumerate(grid):
+            try:
+                values[i] = func(x)
+            except (ArithmeticError, ValueError):
+                values[i] = np.nan
+        return values
+    
+    @staticmethod
+    def _deduplicate_roots(refined, tol):
+        """按位置合并重复的根，合并时优先保留收敛的结果"""
+        roots, converged, residuals, methods = [], [], [], []
+        for root, ok, residual, method in sorted(refined, key=lambda r: r[0]):
+            if roots and abs(root - roots[-1]) <= tol * max(1.0, abs(root)):
+                if ok and (not converged[-1] or residual < residuals[-1]):
+                    roots[-1], converged[-1], residuals[-1], methods[-1] = root, ok, residual, method
+                continue
+            roots.append(root)
+            converged.append(ok)
+            residuals.append(residual)
+            methods.append(method)
+        return {
+            '根': np.array(roots, dtype=float),
+            '收敛': np.array(converged, dtype=bool),
+            '残差': np.array(residuals, dtype=float),
+            '方法': methods
+        }
+    
+    def numerical_integration(self, func_str, variable, a, b, method='quad'):
         """数值积分 - 为GUI提供的接口"""
+        result = self.numerical_integration_details(func_str, variable, a, b, method)
+        if isinstance(result, str):
+            return result
+        return result['积分值']
+    
+    def numerical_integration_details(self, func_str, variable, a, b, method='auto',
+                                      order=32, tol=1.49e-8, max_level=12):
+        """数值积分，返回积分值、误差估计和实际使用的引擎
+        
+        method:
+            'quad'  - 逐点调用标量函数的 scipy.integrate.quad
+            'gauss' - 向量化的复合Gauss-Legendre求积，逐级加倍子区间直到收敛
+            'auto'  - 有限区间且表达式可向量化时用 'gauss'，否则回退到 'quad'
+        """
         try:
-            def func(x):
-                allowed_names = {
-                    k: v for k, v in math.__dict__.items() if not k.startswith("__")
-                }
-                allowed_names[variable] = x
-                return eval(func_str, {"__builtins__": {}}, allowed_names)
+            if method not in ('quad', 'gauss', 'auto'):
+                return f"错误: 不支持的积分方法 {method}"
             
-            result, error = integrate.quad(func, a, b)
+            if method != 'quad' and np.isfinite(a) and np.isfinite(b):
+                vector_func = self.vectorized_function(
+                    func_str, variable, np.linspace(a, b, 5)
+                )
+                if vector_func is not None:
+                    result = self._gauss_legendre(vector_func, a, b, order, tol, max_level)
+                    if result is not None:
+                        return result
+            
+            func = self.expression_cache.get_function(func_str, variable)
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always', integrate.IntegrationWarning)
+                value, error = integrate.quad(func, a, b)
+            result = {
+                '积分值': value,
+                '误差估计': error,
+                '引擎': 'quad'
+            }
+            messages = [str(w.message).strip() for w in caught if issubclass(w.category, integrate.IntegrationWarning)]
+            if messages:
+                # quad 判断积分可能发散或精度不足，结果不可信，提示信息随结果返回
+                result['警告'] = messages[0].splitlines()[0]
             return result
         except Exception as e:
             return f"错误: {str(e)}"
     
-    def matrix_operations(self, operation, matrix1, matrix2=None):
-        """矩阵运算"""
+    def multiple_integration(self, func_str, variables, limits, method='auto', tol=1e-6,
+                             max_samples=2 ** 22, nquad_max_dim=3, replicates=8,
+                             batch_size=2 ** 16, seed=None):
+        """多重积分
+        
+        variables: 积分变量列表或 'x, y' 形式的字符串
+        limits:    与变量一一对应的积分限 [(a1, b1), (a2, b2), ...]
+        method:
+            'nquad' - scipy.integrate.nquad 逐层自适应积分，适合低维
+            'qmc'   - 随机化Sobol准蒙特卡洛，样本分批向量化求值，
+                      样本数逐轮加倍直到误差估计满足 tol 或达到 max_samples
+            'auto'  - 维数不超过 nquad_max_dim 时用 'nquad'，否则用 'qmc'
+        """
+        try:
+            if isinstance(variables, str):
+                variables = [v.strip() for v in variables.split(',') if v.strip()]
+            limits = [(float(a), float(b)) for a, b in limits]
+            if len(variables) != len(limits):
+                return "错误: 积分变量与积分限个数不一致"
+            if method == 'auto':
+                method = 'nquad' if len(variables) <= nquad_max_dim else 'qmc'
+            
+            if method == 'nquad':
+                func = self.expression_cache.get_function(func_str, variables)
+                value, error = integrate.nquad(func, limits)
+                return {'积分值': value, '误差估计': error, '引擎': 'nquad'}
+            if method == 'qmc':
+                return self._qmc_integration(func_str, variables, limits, tol, max_samples,
+                                             replicates, batch_size, seed)
+            return f"错误: 不支持的积分方法 {method}"
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    def _qmc_integration(self, func_str, variables, limits, tol, max_samples,
+                         replicates, batch_size, seed):
+        """随机化准蒙特卡洛积分：多组独立加扰的Sobol序列，组间标准差作为误差估计"""
+        bounds = np.array(limits)
+        if not np.all(np.isfinite(bounds)):
+            return "错误: 准蒙特卡洛积分只支持有限积分区间"
+        lower, upper = bounds[:, 0], bounds[:, 1]
+        volume = float(np.prod(upper - lower))
+        dim = len(variables)
+        
+        func = self._multivariate_vector_function(func_str, variables, (lower + upper) / 2)
+        rng = np.random.default_rng(seed)
+        samplers = [qmc.Sobol(d=dim, scramble=True, seed=rng) for _ in range(replicates)]
+        sums = np.zeros(replicates)
+        count = 0
+        n_new = 2 ** 10
+        while True:
+            for i, sampler in enumerate(samplers):
+                remaining = n_new
+                while remaining > 0:
+                    size = min(batch_size, remaining)
+                    points = qmc.scale(sampler.random(size), lower, upper)
+                    with np.errstate(all='ignore'):
+                        sums[i] += np.sum(func(points))
+                    remaining -= size
+            count += n_new
+            estimates = volume * sums / count
+            value = float(np.mean(estimates))
+            error = float(np.std(estimates, ddof=1) / np.sqrt(replicates))
+            if error <= max(tol, tol * abs(value)) or count * 2 * replicates > max_samples:
+                break
+            n_new = count
+        return {
+            '积分值': value,
+            '误差估计': error,
+            '引擎': f'qmc-sobol({replicates}组)',
+            '样本数': count * replicates
+        }
+    
+    def _multivariate_vector_function(self, func_str, variables, probe_point):
+        """多元向量化函数，接收 (n, d) 样本数组；无法向量化时逐点计算"""
+        try:
+            func = self.vector_cache.get_function(func_str, variables)
+            probe = np.tile(probe_point, (3, 1))
+            values = np.asarray(func(*probe.T), dtype=float)
+            if values.shape in ((3,), ()):
+                return lambda points: np.broadcast_to(
+                    np.asarray(func(*points.T), dtype=float), points.shape[:1]
+                )
+        except Exception:
+            pass
+        scalar_func = self.expression_cache.get_function(func_str, variables)
+        return lambda points: np.array([scalar_func(*p) for p in points], dtype=float)
+    
+    def batch_integration(self, jobs, func_str=None, variable='x', method='auto',
+                          max_workers=None, chunksize=None, parallel_threshold=64):
+        """批量数值积分
+        
+        jobs 可以是:
+            - (func_str, a, b) 或 (func_str, variable, a, b) 组成的列表
+            - 给定 func_str 时，形如 [(a, b), ...] 的区间列表或 (n, 2) 数组
+        任务数达到 parallel_threshold 时按块分发到进程池，否则在当前进程顺序计算。
+        返回的积分值和误差估计为NumPy数组，失败的任务对应位置为nan。
+        """
+        try:
+            tasks = self._normalize_integration_jobs(jobs, func_str, variable, method)
+            if not tasks:
+                return {'积分值': np.array([]), '误差估计': np.array([]), '引擎': [], '错误': []}
+            
+            if len(tasks) < parallel_threshold:
+                results = _integrate_tasks(tasks, self)
+            else:
+                workers = max_workers or os.cpu_count() or 1
+                if chunksize is None:
+                    # 每个进程分到约4块，兼顾负载均衡与进程间通信开销
+                    chunksize = max(1, -(-len(tasks) // (workers * 4)))
+                chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+                executor = self._get_executor(workers)
+                results = [item for chunk in executor.map(_integrate_tasks, chunks) for item in chunk]
+            
+            values = np.array([r[0] for r in results], dtype=float)
+            errors = np.array([r[1] for r in results], dtype=float)
+            return {
+                '积分值': values,
+                '误差估计': errors,
+                '引擎': [r[2] for r in results],
+                '错误': [r[3] for r in results]
+            }
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    def _normalize_integration_jobs(self, jobs, func_str, variable, method):
+        """把各种批量任务格式统一为 (func_str, variable, a, b, method) 元组"""
+        if func_str is not None:
+            bounds = np.asarray(jobs, dtype=float).reshape(-1, 2)
+            return [(func_str, variable, float(a), float(b), method) for a, b in bounds]
+        
+        tasks = []
+        for job in jobs:
+            if len(job) == 3:
+                f, a, b = job
+                var = variable
+            elif len(job) == 4:
+                f, var, a, b = job
+            else:
+                raise ValueError(f"无效的积分任务: {job}")
+            tasks.append((str(f), str(var), float(a), float(b), method))
+        return tasks
+    
+    def _get_executor(self, workers):
+        """复用进程池，避免每次批量计算都重新启动进程"""
+        if self._executor is None or self._executor_workers != workers:
+            self.shutdown()
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+            self._executor_workers = workers
+        return self._executor
+    
+    def shutdown(self):
+        """关闭批量计算和方程组求解使用的进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+            self._executor_workers = None
+        self.system_solver.shutdown()
+    
+    def _gauss_legendre(self, vector_func, a, b, order, tol, max_level):
+        """复合Gauss-Legendre求积，每一级只调用一次向量化函数
+        
+        同时计算 ∫|f|：积分值与 ∫|f| 都在相邻两级间收敛才接受结果。
+        1/x 在 [-1, 1] 上这类发散积分的正负部分会相互抵消，只比较积分值会误判为收敛，
+        而 ∫|f| 随子区间加倍不断增长。未收敛或出现非有限值时返回None，由调用方回退到quad。
+        """
+        if order not in self._gauss_rules:
+            self._gauss_rules[order] = np.polynomial.legendre.leggauss(order)
+        nodes, weights = self._gauss_rules[order]
+        
+        def composite(intervals):
+            edges = np.linspace(a, b, intervals + 1)
+            half = (edges[1:] - edges[:-1]) / 2
+            mid = (edges[1:] + edges[:-1]) / 2
+            x = (mid[:, None] + half[:, None] * nodes[None, :]).ravel()
+            with np.errstate(all='ignore'):
+                y = vector_func(x).reshape(intervals, order)
+            if not np.all(np.isfinite(y)):
+                return None
+            return float(np.sum(half * (y @ weights))), float(np.sum(half * (np.abs(y) @ weights)))
+        
+        def converged(current, previous):
+            return abs(current - previous) <= max(tol, tol * abs(current))
+        
+        intervals = 1
+        previous = composite(intervals)
+        if previous is None:
+            return None
+        for _ in range(max_level):
+            intervals *= 2
+            current = composite(intervals)
+            if current is None:
+                return None
+            if converged(current[0], previous[0]) and converged(current[1], previous[1]):
+                return {
+                    '积分值': current[0],
+                    '误差估计': abs(current[0] - previous[0]),
+                    '引擎': f'gauss-legendre({order}点×{intervals}段)'
+                }
+            previous = current
+        return None
+    
+    def matrix_operations(self, operation, matrix1, matrix2=None, k=None):
+        """矩阵运算
+        
+        输入为嵌套列表时结果仍转换为列表（兼容原接口）；输入为ndarray或
+        scipy.sparse矩阵时直接返回数组，不做额外复制。
+        matrix1 也可以是 factorize 返回的 MatrixFactorization，用于复用分解结果。
+        
+        operation:
+            determinant / inverse / transpose / add / multiply
+            eigenvalues - 全部特征值；指定 k 时只返回 k 个（部分谱），大型稀疏矩阵必须指定 k
+            solve     - 求解 matrix1 · x = matrix2，用分解代替显式求逆
+            factorize - 返回可复用的 MatrixFactorization（LU/Cholesky/SuperLU）
+        """
         try:
-            mat1 = np.array(matrix1)
+            as_list = isinstance(matrix1, (list, tuple))
+            if isinstance(matrix1, MatrixFactorization):
+                factorization = matrix1
+                mat1 = matrix1.matrix
+            else:
+                factorization = None
+                mat1 = as_matrix(matrix1)
+            mat2 = as_matrix(matrix2) if matrix2 is not None else None
             
             if operation == "determinant":
+                if factorization is not None or sparse.issparse(mat1):
+                    return (factorization or MatrixFactorization(mat1)).determinant()
                 return np.linalg.det(mat1)
             elif operation == "inverse":
-                return np.linalg.inv(mat1).tolist()
+                if factorization is not None or sparse.issparse(mat1):
+                    result = (factorization or MatrixFactorization(mat1)).inverse()
+                else:
+                    result = np.linalg.inv(mat1)
+            elif operation == "solve" and mat2 is not None:
+                result = (factorization or MatrixFactorization(mat1)).solve(mat2)
+            elif operation == "factorize":
+                return factorization or MatrixFactorization(mat1)
             elif operation == "eigenvalues":
-                return np.linalg.eigvals(mat1).tolist()
+                result = eigenvalues(mat1, k=k)
             elif operation == "transpose":
-                return mat1.T.tolist()
-            elif operation == "add" and matrix2 is not None:
-                mat2 = np.array(matrix2)
-                return (mat1 + mat2).tolist()
-            elif operation == "multiply" and matrix2 is not None:
-                mat2 = np.array(matrix2)
-                return np.dot(mat1, mat2).tolist()
+                result = mat1.T
+            elif operation == "add" and mat2 is not None:
+                result = mat1 + mat2
+            elif operation == "multiply" and mat2 is not None:
+                result = mat1 @ mat2
             else:
                 return "不支持的操作"
+            
+            if as_list:
+                if sparse.issparse(result):
+                    result = result.toarray()
+                return np.asarray(result).tolist()
+            return result
         except Exception as e:
-            return f"错误: {str(e)}"
\ No newline at end of file
+            return f"错误: {str(e)}"
+
+
+# 进程池中每个工作进程各自持有一个计算器，同一进程处理的后续块可复用表达式缓存
+_worker_calculator = None
+
+
+def _integrate_tasks(tasks, calculator=None):
+    """计算一块积分任务，返回 (积分值, 误差估计, 引擎, 错误信息) 列表"""
+    global _worker_calculator
+    if calculator is None:
+        if _worker_calculator is None:
+            _worker_calculator = NumericalCalculator()
+        calculator = _worker_calculator
+    
+    results = []
+    for func_str, variable, a, b, method in tasks:
+        result = calculator.numerical_integration_details(func_str, variable, a, b, method)
+        if isinstance(result, str):
+            results.append((np.nan, np.nan, None, result))
+        else:
+            results.append((result['积分值'], result['误差估计'], result['引擎'], None))
+    return results
+
+
+def _refine_root_brackets(job, calculator=None):
+    """细化一组求根区间，返回 (根, 是否收敛, 残差, 方法) 列表
+    
+    变号区间中 |f| 反而大于两端点的视为极点，直接丢弃。
+    """
+    global _worker_calculator
+    func_str, variable, tasks, xtol, residual_tol = job
+    if calculator is None:
+        if _worker_calculator is None:
+            _worker_calculator = NumericalCalculator()
+        calculator = _worker_calculator
+    func = calculator.expression_cache.get_function(func_str, variable)
+    
+    results = []
+    for method, lo, hi in tasks:
+        try:
+            if method == 'brentq':
+                root, info = optimize.brentq(func, lo, hi, xtol=xtol, full_output=True, disp=False)
+                residual = abs(func(root))
+                if residual > max(abs(func(lo)), abs(func(hi))):
+                    continue
+                results.append((root, bool(info.converged) and residual <= residual_tol, residual, method))
+            else:
+                info = optimize.minimize_scalar(lambda x: abs(func(x)), bounds=(lo, hi),
+                                                method='bounded', options={'xatol': xtol})
+                residual = abs(func(info.x))
+                if residual <= residual_tol:
+                    results.append((info.x, bool(info.success), residual, method))
+        except Exception:
+            continue
+    return results
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常微分方程模块
+功能：解析右端表达式、编译为向量化函数、生成解析雅可比矩阵、分块输出数值解
+"""
+
+import numpy as np
+
+from utils.lazy_import import lazy_import
+from .compile_bridge import LAMBDIFY_MODULES
+from .expression_cache import LRUCache
+
+# sympy/scipy 在第一次用到时才导入
+sp = lazy_import('sympy')
+integrate = lazy_import('scipy.integrate')
+
+# scipy.integrate 中的步进求解器，'auto' 使用可自动切换刚性/非刚性的LSODA
+_SOLVERS = ('RK45', 'RK23', 'DOP853', 'Radau', 'BDF', 'LSODA')
+_IMPLICIT = ('Radau', 'BDF', 'LSODA')
+
+
+class CompiledODESystem:
+    """编译后的常微分方程组 dy/dt = f(t, y)
+
+    fun 与 jac 符合 scipy.integrate.solve_ivp 的调用约定，
+    fun 支持 vectorized=True 时传入的 (n, k) 状态数组。
+    """
+
+    def __init__(self, rhs, state_vars, time_var='t', params=None):
+        self.state_vars = list(state_vars)
+        self.time_var = time_var
+        t = sp.Symbol(time_var)
+        states = [sp.Symbol(name) for name in self.state_vars]
+        local_names = {name: symbol for name, symbol in zip(self.state_vars, states)}
+        local_names[time_var] = t
+        # 参数名（如 beta、gamma、E、I、N、S）也要解析为普通符号，否则会被当作sympy内置对象
+        param_symbols = {str(name): sp.Symbol(str(name)) for name in (params or {})}
+        local_names.update({name: symbol for name, symbol in param_symbols.items()
+                            if name not in local_names})
+
+        exprs = [sp.sympify(expr, locals=local_names) for expr in rhs]
+        if len(exprs) != len(states):
+            raise ValueError("方程个数与状态变量个数不一致")
+        if params:
+            values = {local_names[str(name)]: value for name, value in params.items()}
+            exprs = [expr.subs(values) for expr in exprs]
+        unknown = set().union(*(expr.free_symbols for expr in exprs)) - set(states) - {t}
+        if unknown:
+            raise ValueError(f"未知的符号: {', '.join(sorted(map(str, unknown)))}")
+
+        self.exprs = exprs
+        self.jacobian_expr = sp.Matrix(exprs).jacobian(states)
+        self._rhs = sp.lambdify([t] + states, exprs, LAMBDIFY_MODULES)
+        self._jac = sp.lambdify([t] + states, self.jacobian_expr, LAMBDIFY_MODULES)
+
+    def fun(self, t, y):
+        """右端函数；y 的形状为 (n,) 或 (n, k)"""
+        values = self._rhs(t, *y)
+        return np.array(np.broadcast_arrays(*values, y[0]))[:-1].astype(float)
+
+    def jac(self, t, y):
+        """解析雅可比矩阵"""
+        return np.array(self._jac(t, *y), dtype=float)
+
+
+class ODESolver:
+    def __init__(self, cache_size=64):
+        # 同一方程组只解析、求导、编译一次
+        self.system_cache = LRUCache(maxsize=cache_size)
+
+    def compile_system(self, rhs, state_vars, time_var='t', params=None):
+        """解析并编译方程组，结果按方程内容缓存"""
+        if isinstance(rhs, str):
+            rhs = [rhs]
+        if isinstance(state_vars, str):
+            state_vars = [v.strip() for v in state_vars.split(',') if v.strip()]
+        key = (tuple(rhs), tuple(state_vars), time_var,
+               tuple(sorted((str(k), float(v)) for k, v in (params or {}).items())))
+        system = self.system_cache.get(key)
+        if system is None:
+            system = CompiledODESystem(rhs, state_vars, time_var, params)
+            self.system_cache.put(key, system)
+        return system
+
+    def solve(self, rhs, state_vars, t_span, y0, method='auto', t_eval=None,
+              time_var='t', params=None, rtol=1e-6, atol=1e-9):
+        """求解初值问题
+
+        rhs:        右端表达式列表，如 ['y1', '-y0']
+        state_vars: 状态变量名列表，如 ['y0', 'y1']
+        method:     RK45/RK23/DOP853/Radau/BDF/LSODA，'auto' 为LSODA；
+                    隐式方法自动使用解析雅可比矩阵
+        """
+        try:
+            system = self.compile_system(rhs, state_vars, time_var, params)
+            method = 'LSODA' if method == 'auto' else method
+            options = {'jac': system.jac} if method in _IMPLICIT else {}
+            solution = integrate.solve_ivp(
+                system.fun, t_span, np.asarray(y0, dtype=float), method=method,
+                t_eval=t_eval, rtol=rtol, atol=atol, vectorized=True, **options
+            )
+            return {
+                't': solution.t,
+                'y': solution.y,
+                '成功': solution.success,
+                '信息': solution.message,
+                '函数求值次数': solution.nfev,
+                '雅可比求值次数': solution.njev,
+                '方法': method
+            }
+        except Exception as e:
+            return f"错误: {str(e)}"
+
+    def stream(self, rhs, state_vars, t_span, y0, num_points=1000, chunk_size=256,
+               method='auto', time_var='t', params=None, rtol=1e-6, atol=1e-9):
+        """逐步积分并分块产出等间距输出点上的解
+
+        每块产出 (t_chunk, y_chunk)，y_chunk 形状为 (状态数, 块长)。
+        只保留当前块，不在内存中保存完整轨迹。
+        """
+        system = self.compile_system(rhs, state_vars, time_var, params)
+        method = 'LSODA' if method == 'auto' else method
+        options = {'jac': system.jac} if method in _IMPLICIT else {}
+        t0, t_end = float(t_span[0]), float(t_span[1])
+        if method not in _SOLVERS:
+            raise ValueError(f"未知的求解方法: {method}")
+        solver = getattr(integrate, method)(system.fun, t0, np.asarray(y0, dtype=float), t_end,
+                                  rtol=rtol, atol=atol, vectorized=True, **options)
+
+        grid = np.linspace(t0, t_end, num_points)
+        direction = np.sign(t_end - t0) or 1.0
+        next_index = 0
+        buffer_t, buffer_y = [], []
+        while next_index < num_points:
+            if grid[next_index] == t0:
+                chunk_t, chunk_y = grid[next_index:next_index + 1], solver.y[:, None]
+                next_index += 1
+            else:
+                if solver.status != 'running':
+                    raise RuntimeError(f"积分提前终止: {solver.status}")
+                message = solver.step()
+                if solver.status == 'failed':
+                    raise RuntimeError(message)
+                # 当前步覆盖到的输出点，用该步的稠密输出插值
+                stop = next_index
+                while stop < num_points and direction * (grid[stop] - solver.t) <= 0:
+                    stop += 1
+                if stop == next_index:
+                    continue
+                chunk_t = grid[next_index:stop]
+                chunk_y = solver.dense_output()(chunk_t)
+                next_index = stop
+
+            buffer_t.append(chunk_t)
+            buffer_y.append(chunk_y)
+            buffered = sum(len(t) for t in buffer_t)
+            if buffered >= chunk_size:
+                all_t = np.concatenate(buffer_t)
+                all_y = np.concatenate(buffer_y, axis=1)
+                full = buffered - buffered % chunk_size
+                for start in range(0, full, chunk_size):
+                    yield all_t[start:start + chunk_size], all_y[:, start:start + chunk_size]
+                buffer_t, buffer_y = [all_t[full:]], [all_y[:, full:]]
+        if sum(len(t) for t in buffer_t):
+            yield np.concatenate(buffer_t), np.concatenate(buffer_y, axis=1)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分级化简模块
+功能：按代价从低到高依次尝试化简步骤，在时间和表达式规模预算内返回最简结果
+"""
+
+import contextlib
+import signal
+import threading
+import time
+
+from utils.lazy_import import lazy_import
+
+sp = lazy_import('sympy')
+
+# 化简步骤：(名称, 级别)。级别越高代价越大，只在预算允许时尝试
+#   0 - 廉价的规范化变换
+#   1 - 需要多项式分解或根式处理的变换
+#   2 - sympy.simplify 全量启发式搜索
+SIMPLIFY_PASSES = (
+    ('cancel', 0),
+    ('together', 0),
+    ('expand', 0),
+    ('powsimp', 0),
+    ('trigsimp', 0),
+    ('radsimp', 1),
+    ('factor', 1),
+    ('logcombine', 1),
+    ('simplify', 2),
+)
+
+# 各级别在剩余时间预算中所占的权重：剩余预算按权重分给尚未执行的步骤，
+# 单个步骤超出自己的份额即被打断，不会因为一个慢步骤耗尽全部预算
+_TIER_WEIGHT = {0: 1, 1: 2, 2: 4}
+
+# 各级别允许处理的最大表达式规模（count_ops）相对于 ops_budget 的倍数
+_TIER_SCALE = {0: None, 1: 4, 2: 1}
+
+
+class _PassTimeout(BaseException):
+    """单个化简步骤超出剩余时间预算
+
+    继承 BaseException：sympy 内部大量使用 except Exception，
+    继承 Exception 时超时信号可能被 sympy 吞掉，步骤不会真正中断。
+    """
+
+
+@contextlib.contextmanager
+def _deadline(seconds):
+    """在主线程中用 SIGALRM 打断超时的化简步骤
+    
+    没有 setitimer（Windows）或不在主线程时无法打断，只在步骤之间检查预算。
+    """
+    if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    
+    def on_alarm(signum, frame):
+        raise _PassTimeout()
+    
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, max(seconds, 1e-3))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def tiered_simplify(expr, time_budget=2.0, ops_budget=200, passes=SIMPLIFY_PASSES):
+    """分级化简
+
+    依次对当前最简结果应用各步骤，结果的 count_ops 更小时才采用。
+    - time_budget: 总时间预算（秒），用完后不再开始新的步骤
+    - ops_budget:  表达式规模预算，规模超过 4×ops_budget 时跳过1级步骤，
+                   超过 ops_budget 时跳过 sympy.simplify
+    剩余预算按级别权重分给尚未执行的步骤；在主线程中运行时，
+    超出份额的步骤会被打断并放弃其结果。
+
+    返回 (最简表达式, 报告)，报告中的 '有效步骤' 只列出确实降低了复杂度的步骤。
+    """
+    expr = sp.sympify(expr)
+    started = time.perf_counter()
+    best = expr
+    best_ops = sp.count_ops(expr)
+    report = {
+        '原始复杂度': best_ops,
+        '最终复杂度': best_ops,
+        '有效步骤': [],
+        '跳过步骤': [],
+        '耗时': 0.0,
+    }
+
+    for index, (name, tier) in enumerate(passes):
+        elapsed = time.perf_counter() - started
+        if elapsed >= time_budget:
+            report['跳过步骤'].append((name, '超出时间预算'))
+            continue
+        scale = _TIER_SCALE.get(tier)
+        if scale is not None and ops_budget is not None and best_ops > scale * ops_budget:
+            report['跳过步骤'].append((name, '表达式规模超出预算'))
+            continue
+
+        weights = sum(_TIER_WEIGHT[t] for _, t in passes[index:])
+        share = (time_budget - elapsed) * _TIER_WEIGHT[tier] / weights
+        step_started = time.perf_counter()
+        try:
+            with _deadline(share):
+                candidate = getattr(sp, name)(best)
+        except _PassTimeout:
+            report['跳过步骤'].append((name, '超出时间份额，已中断'))
+            continue
+        except Exception:
+            # 个别步骤不适用于某些表达式（如含非交换符号），跳过即可
+            continue
+        candidate_ops = sp.count_ops(candidate)
+        if candidate_ops < best_ops:
+            report['有效步骤'].append({
+                '步骤': name,
+                '化简前': best_ops,
+                '化简后': candidate_ops,
+                '耗时': round(time.perf_counter() - step_started, 4),
+            })
+            best, best_ops = candidate, candidate_ops
+
+    report['最终复杂度'] = best_ops
+    report['耗时'] = round(time.perf_counter() - started, 4)
+    return best, report
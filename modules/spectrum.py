@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数值频谱模块
+功能：对表达式采样或对数据列做FFT频谱分析，长信号用分段Welch平均估计功率谱密度
+"""
+
+import numpy as np
+
+from utils.lazy_import import lazy_import
+from .compile_bridge import CompileBridge
+
+signal = lazy_import('scipy.signal')
+
+
+def _window(window, length):
+    """窗函数数组；window 为None或'boxcar'时为矩形窗"""
+    if window is None:
+        return np.ones(length)
+    return signal.get_window(window, length)
+
+
+def _iter_chunks(data):
+    """数组（或数值列表）视为单块，否则视为逐块产出数组的可迭代对象"""
+    if isinstance(data, np.ndarray) or (isinstance(data, (list, tuple)) and (not data or np.isscalar(data[0]))):
+        yield np.asarray(data, dtype=float).ravel()
+        return
+    for chunk in data:
+        yield np.asarray(chunk, dtype=float).ravel()
+
+
+class SpectrumAnalyzer:
+    """数值频谱分析
+
+    - expression_spectrum: 在网格上采样表达式，用FFT近似连续傅里叶变换
+      （与 sympy.fourier_transform 约定相同：F(k) = ∫ f(t) e^{-2πikt} dt）
+    - data_spectrum:       采样数据的加窗单边幅度谱（rfft）
+    - welch_spectrum:      分段加窗平均的功率谱密度，可逐块输入，内存与信号长度无关
+    """
+
+    # Welch法每批处理的段数
+    batch_segments = 64
+
+    def __init__(self, compile_bridge=None):
+        self.compile_bridge = compile_bridge or CompileBridge()
+
+    def expression_spectrum(self, expression, variable='t', t_range=(-10, 10), num_points=4096, window=None):
+        """表达式的数值傅里叶变换
+
+        在 [t_range[0], t_range[1]) 上等间距采样 num_points 个点，
+        F(k_m) ≈ Δt·e^{-2πik_m t0}·FFT[f](m)，频率范围为 ±1/(2Δt)。
+        t_range 需覆盖信号的主要部分，否则截断会引起频谱泄漏（可用 window 减轻）。
+        """
+        try:
+            t0, t1 = float(t_range[0]), float(t_range[1])
+            if t1 <= t0 or num_points < 2:
+                return "错误: 采样区间或采样点数无效"
+            dt = (t1 - t0) / num_points
+            t = t0 + dt * np.arange(num_points)
+            samples = self.compile_bridge.evaluate(expression, variable, t) * _window(window, num_points)
+
+            freq = np.fft.fftshift(np.fft.fftfreq(num_points, dt))
+            spectrum = np.fft.fftshift(np.fft.fft(samples)) * dt * np.exp(-2j * np.pi * freq * t0)
+            return {
+                '频率': freq,
+                '频谱': spectrum,
+                '幅值': np.abs(spectrum),
+                '相位': np.angle(spectrum),
+                '采样间隔': dt,
+            }
+        except Exception as e:
+            return f"错误: {str(e)}"
+
+    def data_spectrum(self, data, sample_rate=1.0, window='hann', detrend=True):
+        """采样数据的单边幅度谱
+
+        幅值按窗函数的相干增益归一化，正弦分量的峰值约等于其振幅；
+        detrend=True 时先去掉均值，避免直流分量淹没其他频率。
+        """
+        try:
+            x = np.asarray(data, dtype=float).ravel()
+            x = x[np.isfinite(x)]
+            n = len(x)
+            if n < 2:
+                return "错误: 数据点数不足"
+            if detrend:
+                x = x - x.mean()
+            w = _window(window, n)
+            spectrum = np.fft.rfft(x * w)
+            magnitude = np.abs(spectrum) / w.sum()
+            # 单边谱：除直流和奈奎斯特频率外的分量折叠了负频率部分
+            magnitude[1:(n + 1) // 2] *= 2
+            return {
+                '频率': np.fft.rfftfreq(n, 1.0 / sample_rate),
+                '幅值': magnitude,
+                '相位': np.angle(spectrum),
+                '采样点数': n,
+                '频率分辨率': sample_rate / n,
+            }
+        except Exception as e:
+            return f"错误: {str(e)}"
+
+    def welch_spectrum(self, data, sample_rate=1.0, segment_length=1024, overlap=0.5, window='hann'):
+        """Welch法估计单边功率谱密度
+
+        data 可以是数组，也可以是逐块产出数组的可迭代对象（如按块读取的Excel列）；
+        块之间不足一段的数据留到下一块，各段去均值、加窗后累加功率谱，
+        结果与 scipy.signal.welch(detrend='constant', scaling='density') 一致。
+        信号短于一段时把段长缩短为信号长度。
+        """
+        try:
+            segment_length = int(segment_length)
+            step = segment_length - int(segment_length * overlap)
+            if segment_length < 2 or step < 1:
+                return "错误: 段长或重叠比例无效"
+
+            buffer = np.empty(0)
+            total = None
+            count = 0
+            w = _window(window, segment_length)
+            for chunk in _iter_chunks(data):
+                buffer = np.concatenate([buffer, chunk[np.isfinite(chunk)]])
+                if len(buffer) < segment_length:
+                    continue
+                starts = np.arange(0, len(buffer) - segment_length + 1, step)
+                # 每次最多取 batch 段组成二维数组，单块很长时也不会整体复制成段矩阵
+                for batch in range(0, len(starts), self.batch_segments):
+                    index = starts[batch:batch + self.batch_segments, None] + np.arange(segment_length)
+                    power = self._segment_power(buffer[index], w).sum(axis=0)
+                    total = power if total is None else total + power
+                count += len(starts)
+                buffer = buffer[starts[-1] + step:]
+
+            if count == 0:
+                # 信号不足一段：整段作为唯一的一段
+                if len(buffer) < 2:
+                    return "错误: 数据点数不足"
+                segment_length = len(buffer)
+                w = _window(window, segment_length)
+                total = self._segment_power(buffer[None, :], w)[0]
+                count = 1
+
+            psd = total / count / (sample_rate * (w ** 2).sum())
+            psd[1:(segment_length + 1) // 2] *= 2
+            return {
+                '频率': np.fft.rfftfreq(segment_length, 1.0 / sample_rate),
+                '功率谱密度': psd,
+                '段数': count,
+                '段长': segment_length,
+            }
+        except Exception as e:
+            return f"错误: {str(e)}"
+
+    @staticmethod
+    def _segment_power(segments, w):
+        """各段去均值、加窗后的 |rfft|²"""
+        segments = segments - segments.mean(axis=1, keepdims=True)
+        return np.abs(np.fft.rfft(segments * w, axis=1)) ** 2
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式统计模块
+功能：逐块累积数据的统计量，内存占用与数据总量无关，
+不同进程的部分结果可以合并
+"""
+
+import numpy as np
+
+
+class KLLSketch:
+    """KLL分位数草图
+
+    第 h 层保存的每个元素代表 2^h 个原始数据。某层超出容量时排序，
+    随机取奇数位或偶数位的一半提升到上一层；越低的层容量越小（按2/3递减），
+    总容量约为 3k。秩误差约为 1.7/k（k=200 时约1%）。
+    两个草图合并时逐层拼接后重新压缩，结果与一次性处理全部数据的草图精度相同。
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """加入一块数据"""
+        values = np.asarray(values, dtype=float).ravel()
+        if not len(values):
+            return self
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """合并另一个草图"""
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _capacity(self, h):
+        depth = len(self.levels) - 1 - h
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # 奇数个时留下一个不参与压缩
+                kept = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(kept)]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[h] = kept
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    @property
+    def exact(self):
+        """尚未发生压缩时草图保存的就是全部原始数据"""
+        return len(self.levels) == 1
+
+    def quantiles(self, q):
+        """分位数（q 取 0~1）；未压缩时与 np.percentile 的线性插值结果相同"""
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        if self.exact:
+            return np.percentile(self.levels[0], q * 100)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values)
+        values, cumulative = values[order], np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return values[np.minimum(index, len(values) - 1)]
+
+
+class StreamingStatistics:
+    """单遍流式统计
+
+    均值和方差用 Welford/Chan 的分块合并公式累积，最小值、最大值逐块更新，
+    中位数和四分位数由 KLL 草图估计。数据点数不超过 exact_limit 时
+    保留全部数据，分位数是精确值（与 np.percentile 相同）。
+    update 接收一块数据（NaN被忽略），merge 合并其他工作进程的部分结果。
+    """
+
+    def __init__(self, exact_limit=100_000, sketch_size=200, seed=None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.missing = 0
+        self.exact_limit = exact_limit
+        self.sketch = KLLSketch(k=sketch_size, seed=seed)
+        # 数据量较小时保留原始数据，超过 exact_limit 后交给草图
+        self._exact = []
+        self._exact_count = 0
+
+    def update(self, chunk):
+        """加入一块数据"""
+        values = np.asarray(chunk, dtype=float).ravel()
+        nan = np.isnan(values)
+        if nan.any():
+            self.missing += int(nan.sum())
+            values = values[~nan]
+        n = len(values)
+        if n == 0:
+            return self
+        mean = float(values.mean())
+        m2 = float(np.square(values - mean).sum())
+        self._combine(n, mean, m2, float(values.min()), float(values.max()))
+        self._add_quantile_data(values)
+        return self
+
+    def merge(self, other):
+        """合并另一个 StreamingStatistics 的部分结果"""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.minimum, other.maximum)
+            if other._exact is not None:
+                for values in other._exact:
+                    self._add_quantile_data(values)
+            else:
+                self._flush_exact()
+                self.sketch.merge(other.sketch)
+        self.missing += other.missing
+        return self
+
+    def _combine(self, n, mean, m2, minimum, maximum):
+        """Chan 等人的并行方差合并公式"""
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+
+    def _add_quantile_data(self, values):
+        if self._exact is None:
+            self.sketch.update(values)
+            return
+        self._exact.append(values)
+        self._exact_count += len(values)
+        if self._exact_count > self.exact_limit:
+            self._flush_exact()
+
+    def _flush_exact(self):
+        """把保留的原始数据交给草图，之后只用草图估计分位数"""
+        if self._exact is not None:
+            for values in self._exact:
+                self.sketch.update(values)
+            self._exact = None
+
+    @property
+    def approximate(self):
+        """分位数是否为草图估计值"""
+        return self._exact is None
+
+    def quantiles(self, q):
+        """分位数（q 取 0~1）"""
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        if self._exact is not None:
+            return np.percentile(np.concatenate(self._exact), q * 100)
+        return self.sketch.quantiles(q)
+
+    def result(self):
+        """统计结果，键与 DataProcessor.basic_statistics 相同"""
+        if self.count == 0:
+            raise ValueError("没有有效数据")
+        quartiles = self.quantiles([0.25, 0.5, 0.75])
+        variance = self.m2 / self.count
+        result = {
+            '数据点数': self.count,
+            '平均值': self.mean,
+            '中位数': float(quartiles[1]),
+            '标准差': float(np.sqrt(variance)),
+            '方差': variance,
+            '最小值': self.minimum,
+            '最大值': self.maximum,
+            '四分位数': quartiles.tolist(),
+        }
+        if self.missing:
+            result['缺失值'] = self.missing
+        if self.approximate:
+            result['分位数为近似值'] = True
+        return result
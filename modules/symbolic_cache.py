@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+符号计算结果缓存
+功能：以表达式的srepr和运算参数为键，内存LRU + 磁盘两级缓存
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from utils.lazy_import import lazy_import
+from .expression_cache import LRUCache
+
+sp = lazy_import('sympy')
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.scientific_calculator', 'symbolic_cache')
+
+
+class SymbolicResultCache:
+    """符号计算结果的两级缓存
+
+    键为 运算名 + 表达式的 srepr + 运算参数 的SHA-256摘要，
+    与表达式的书写方式（空格、括号）无关。
+    磁盘层每个结果一个pickle文件，总大小超过上限时按最近访问时间淘汰。
+    缓存目录无法创建或写入时（只读主目录等）退化为仅内存缓存。
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, memory_size=512, disk_limit_mb=256):
+        self.memory = LRUCache(maxsize=memory_size)
+        self.cache_dir = cache_dir
+        self.disk_limit = disk_limit_mb * 1024 * 1024
+        self.disk_hits = 0
+        self.disk_misses = 0
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError:
+                self.cache_dir = None
+
+    @staticmethod
+    def make_key(operation, expr, *args):
+        """计算缓存键"""
+        parts = [operation, sp.srepr(expr)] + [
+            sp.srepr(arg) if isinstance(arg, sp.Basic) else repr(arg) for arg in args
+        ]
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """读取缓存，未命中返回None"""
+        value = self.memory.get(key)
+        if value is not None or not self.cache_dir:
+            return value
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except (OSError, pickle.PickleError, EOFError, AttributeError):
+            self.disk_misses += 1
+            return None
+        self.disk_hits += 1
+        self.memory.put(key, value)
+        return value
+
+    def put(self, key, value):
+        """写入两级缓存"""
+        self.memory.put(key, value)
+        if not self.cache_dir:
+            return
+        tmp_path = None
+        try:
+            # 先写临时文件再替换，避免并发读到写了一半的文件
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, pickle.PickleError, TypeError, AttributeError) as e:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            if isinstance(e, OSError):
+                # 目录不可写（权限、磁盘已满、目录被删除），之后只使用内存缓存
+                self.cache_dir = None
+            return
+        self._evict()
+
+    def clear(self):
+        """清空两级缓存"""
+        self.memory.clear()
+        self.disk_hits = 0
+        self.disk_misses = 0
+        if not self.cache_dir:
+            return
+        for name, _, _ in self._disk_entries():
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def stats(self):
+        """命中统计"""
+        entries = self._disk_entries()
+        return {
+            '内存': self.memory.stats(),
+            '磁盘': {
+                '命中': self.disk_hits,
+                '未命中': self.disk_misses,
+                '条目数': len(entries),
+                '占用字节': sum(size for _, size, _ in entries),
+                '容量字节': self.disk_limit
+            }
+        }
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    def _disk_entries(self):
+        """磁盘缓存文件列表：(文件名, 大小, 最近访问时间)"""
+        if not self.cache_dir:
+            return []
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.pkl'):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            # 其他进程已删除该文件
+                            continue
+                        entries.append((entry.name, stat.st_size, stat.st_mtime))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self):
+        """磁盘占用超过上限时删除最久未访问的文件"""
+        if not self.cache_dir:
+            return
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.disk_limit:
+            return
+        for name, size, _ in sorted(entries, key=lambda e: e[2]):
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            total -= size
+            if total <= self.disk_limit:
+                break
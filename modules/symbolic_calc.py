@@ -5,58 +5,314 @@
 功能：微积分计算、方程求解、傅里叶变换等
 """
 
-import sympy as sp
-from sympy import symbols, diff, integrate, solve, fourier_transform, inverse_fourier_transform
-from sympy import sin, cos, exp, pi, oo, I
+import logging
+import random
+import time
+import warnings
+
 import numpy as np
-from latex2sympy2 import latex2sympy
+
+from utils.lazy_import import lazy_import
+from .compile_bridge import LAMBDIFY_MODULES
+from .fourier_table import FourierTable
+from .simplifier import tiered_simplify
+from .spectrum import SpectrumAnalyzer
+from .system_solver import parse_system
+from .symbolic_cache import DEFAULT_CACHE_DIR, SymbolicResultCache
+
+logger = logging.getLogger(__name__)
+
+# sympy/latex2sympy2 在第一次用到时才导入
+sp = lazy_import('sympy')
+latex2sympy2 = lazy_import('latex2sympy2')
+integrate = lazy_import('scipy.integrate')
+
+# 积分竞速默认参与的策略；'numeric' 只用于数值上下限的定积分
+RACE_STRATEGIES = ('manual', 'risch', 'meijerg', 'heurisch', 'numeric')
+
+# 分级化简报告中与耗时有关的跳过原因
+_TIME_SKIP_REASONS = ('超出时间预算', '超出时间份额，已中断')
 
 class SymbolicCalculator:
     def latex_to_sympy(self, latex_expr):
         try:
-            sympy_expr = latex2sympy(latex_expr)
+            sympy_expr = latex2sympy2.latex2sympy(latex_expr)
             return str(sympy_expr), sympy_expr
         except Exception as e:
             return f"错误: {str(e)}", None
             
-    def __init__(self):
-        self.x, self.y, self.z, self.t = symbols('x y z t')
-        self.w = symbols('w', real=True)
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        # 耗时运算的结果缓存；cache_dir=None 时只使用内存缓存
+        self.result_cache = SymbolicResultCache(cache_dir=cache_dir)
+        self._race_pool = None
+        self.last_race_timings = {}
+        self.last_race_winner = None
+        self.last_simplify_report = {}
+        # 常见信号先查变换对表，查不到才做sympy积分
+        self.fourier_table = FourierTable()
+        # 没有闭式解时用FFT给出数值频谱
+        self.spectrum = SpectrumAnalyzer()
+    
+    def __getattr__(self, name):
+        # 常用符号 x, y, z, t, w 在第一次访问时才创建，实例化时不导入sympy
+        if name in ('x', 'y', 'z', 't'):
+            return sp.Symbol(name)
+        if name == 'w':
+            return sp.Symbol('w', real=True)
+        raise AttributeError(name)
+    
+    def _cached(self, operation, expr, args, compute):
+        """按运算、表达式和参数查缓存，未命中时计算并写入"""
+        key = self.result_cache.make_key(operation, expr, *args)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = compute()
+            self.result_cache.put(key, result)
+        return result
+    
+    def cache_stats(self):
+        """结果缓存命中统计"""
+        return self.result_cache.stats()
+    
+    def shutdown(self):
+        """关闭积分竞速使用的工作进程"""
+        if self._race_pool is not None:
+            self._race_pool.shutdown()
+            self._race_pool = None
+    
+    def calculate_from_input(self, operation, expression, variable='x'):
+        """GUI输入的统一入口：先尝试按LaTeX解析，失败时按普通表达式计算"""
+        func = {
+            'differentiate': self.differentiate,
+            'integrate': self.integrate_symbolic,
+            'solve': self.solve_equation,
+            'fourier': self.fourier_transform,
+        }[operation]
+        try:
+            _, latex_expr = self.latex_to_sympy(expression)
+            if latex_expr is None:
+                raise ValueError
+            return func(str(latex_expr), variable)
+        except Exception:
+            return func(expression, variable)
     
     def differentiate(self, expression, variable='x', order=1):
         """求导数"""
         try:
             expr = sp.sympify(expression)
-            var = symbols(variable)
-            result = diff(expr, var, order)
+            var = sp.symbols(variable)
+            result = sp.diff(expr, var, order)
             return str(result), result
         except Exception as e:
             return f"错误: {str(e)}", None
     
-    def integrate_symbolic(self, expression, variable='x', limits=None):
-        """符号积分"""
+    def integrate_symbolic(self, expression, variable='x', limits=None, race=False):
+        """符号积分
+        
+        race=True 时多种积分算法在独立进程中同时运行，取最先通过验证的结果。
+        """
         try:
             expr = sp.sympify(expression)
-            var = symbols(variable)
+            var = sp.symbols(variable)
             
             if limits:
                 # 定积分
                 a, b = limits
-                result = integrate(expr, (var, a, b))
+                args = (var, a, b)
+                compute = lambda: sp.integrate(expr, (var, a, b))
             else:
                 # 不定积分
-                result = integrate(expr, var)
+                args = (var,)
+                compute = lambda: sp.integrate(expr, var)
+            if race:
+                result = self._integrate_race_cached(expr, var, limits, args)
+            else:
+                result = self._cached('integrate', expr, args, compute)
             
             return str(result), result
         except Exception as e:
             return f"错误: {str(e)}", None
     
+    def _integrate_race_cached(self, expr, var, limits, args):
+        """竞速积分的缓存
+        
+        精确积分已缓存的结果可以直接使用；竞速结果单独缓存，
+        'numeric' 策略胜出时得到的是浮点近似值，不写入缓存。
+        """
+        result = self.result_cache.get(self.result_cache.make_key('integrate', expr, *args))
+        if result is not None:
+            return result
+        key = self.result_cache.make_key('integrate_race', expr, *args)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = self.integrate_race(expr, var, limits)
+            if self.last_race_winner != 'numeric':
+                self.result_cache.put(key, result)
+        return result
+    
+    def integrate_race(self, expr, var, limits=None, strategies=RACE_STRATEGIES, timeout=60.0):
+        """积分算法竞速
+        
+        每种策略在单独的工作进程中运行，返回最先得到并通过验证的结果，
+        其余进程立即终止。各策略耗时记录在 last_race_timings 并写入日志，
+        胜出的策略记录在 last_race_winner。
+        """
+        from utils.sandbox import SandboxPool
+        
+        numeric_limits = limits is not None and all(sp.sympify(v).is_number for v in limits)
+        strategies = [s for s in strategies if s != 'numeric' or numeric_limits]
+        if self._race_pool is None or self._race_pool.max_workers < len(strategies):
+            if self._race_pool is not None:
+                self._race_pool.shutdown()
+            self._race_pool = SandboxPool(size=len(strategies), max_workers=len(strategies),
+                                          timeout=timeout, memory_limit_mb=None,
+                                          warm_imports=('sympy', 'modules.symbolic_calc'))
+        
+        jobs = {
+            strategy: self._race_pool.submit('modules.symbolic_calc:SymbolicCalculator',
+                                             'integrate_with_strategy', strategy, expr, var, limits,
+                                             timeout=timeout)
+            for strategy in strategies
+        }
+        timings = {}
+        winner = None
+        while winner is None and len(timings) < len(jobs):
+            for strategy, job in jobs.items():
+                if strategy in timings or not job.done():
+                    continue
+                try:
+                    result = job.result()
+                    timings[strategy] = (job.elapsed, '成功')
+                    winner = (strategy, result)
+                    break
+                except Exception as e:
+                    timings[strategy] = (job.elapsed, str(e))
+            else:
+                time.sleep(0.01)
+        
+        for strategy, job in jobs.items():
+            if strategy not in timings:
+                job.cancel()
+                timings[strategy] = (job.elapsed, '已终止')
+        self.last_race_timings = timings
+        self.last_race_winner = winner[0] if winner else None
+        for strategy, (elapsed, status) in timings.items():
+            logger.info("积分策略 %s: %.3f 秒, %s", strategy, elapsed, status)
+        
+        if winner is None:
+            raise ValueError("所有积分策略均未得到结果")
+        logger.info("积分竞速胜出策略: %s", winner[0])
+        return winner[1]
+    
+    def integrate_with_strategy(self, strategy, expr, var, limits=None):
+        """用指定策略积分并验证结果，在竞速工作进程中调用"""
+        target = (var, *limits) if limits else var
+        if strategy == 'numeric':
+            result = sp.Integral(expr, target).evalf()
+        elif strategy == 'heurisch':
+            from sympy.integrals.heurisch import heurisch
+            antiderivative = heurisch(expr, var)
+            if antiderivative is None:
+                raise ValueError("heurisch 未找到原函数")
+            if limits:
+                a, b = limits
+                result = sp.limit(antiderivative, var, b, '-') - sp.limit(antiderivative, var, a, '+')
+            else:
+                result = antiderivative
+        elif strategy in ('manual', 'risch', 'meijerg'):
+            result = sp.integrate(expr, target, **{strategy: True})
+        else:
+            raise ValueError(f"未知的积分策略: {strategy}")
+        
+        self._verify_integral(expr, var, limits, result)
+        return result
+    
+    @staticmethod
+    def _verify_integral(expr, var, limits, result, samples=4):
+        """验证积分结果：不含未求出的积分；不定积分在随机点数值检查导数
+        
+        表达式中的其他符号（参数）也在每个检查点取值；随机数使用固定种子，结果可复现。
+        上下限为数值且不含参数的定积分与 scipy quad 的结果对照。
+        """
+        if result is None or result.has(sp.Integral) or result.has(sp.nan, sp.zoo):
+            raise ValueError("积分未求出")
+        if limits:
+            if result.is_finite is False:
+                raise ValueError("定积分结果不是有限值")
+            reference = SymbolicCalculator._quad_reference(expr, var, limits)
+            if reference is None or result.free_symbols:
+                return
+            if not np.isfinite(reference):
+                raise ValueError("定积分发散，数值积分不收敛")
+            value = complex(result.evalf())
+            if abs(value - reference) > 1e-6 * (abs(reference) + 1.0):
+                raise ValueError(f"定积分数值验证失败: {value:.6g} 与 {reference:.6g} 不符")
+            return
+        
+        residual = sp.diff(result, var) - expr
+        symbols = sorted(residual.free_symbols | expr.free_symbols | {var}, key=str)
+        rng = random.Random(0)
+        checked = 0
+        for _ in range(samples * 3):
+            point = {symbol: sp.Float(rng.uniform(0.1, 3.0)) for symbol in symbols}
+            value = complex(residual.subs(point).evalf())
+            scale = abs(complex(expr.subs(point).evalf())) + 1.0
+            if value != value:  # nan：该点不在定义域内，换一个点
+                continue
+            if abs(value) > 1e-8 * scale:
+                raise ValueError("原函数验证失败")
+            checked += 1
+            if checked >= samples:
+                return
+        if checked == 0:
+            raise ValueError("无法验证原函数")
+    
+    @staticmethod
+    def _quad_reference(expr, var, limits):
+        """用 scipy quad 计算定积分的参考值
+        
+        表达式含参数、上下限不是数值、或 quad 自身给出警告（振荡、收敛慢）时返回 None，
+        表示无法对照；被积函数在区间内不可积时返回 inf/nan。
+        """
+        a, b = (sp.sympify(limit) for limit in limits)
+        if expr.free_symbols - {var} or a.free_symbols or b.free_symbols:
+            return None
+        try:
+            func = sp.lambdify(var, expr, LAMBDIFY_MODULES)
+            bounds = (float(a), float(b))
+            parts = []
+            with np.errstate(all='ignore'), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                for part in (np.real, np.imag):
+                    output = integrate.quad(lambda t: part(func(np.float64(t))), *bounds, full_output=1)
+                    if len(output) > 3 and np.isfinite(output[0]):
+                        return None
+                    parts.append(output[0])
+        except (TypeError, ValueError, ZeroDivisionError, NameError):
+            return None
+        return complex(parts[0], parts[1]) if np.isfinite(parts).all() else float('nan')
+    
     def solve_equation(self, equation, variable='x'):
         """求解方程"""
         try:
             eq = sp.sympify(equation)
-            var = symbols(variable)
-            solutions = solve(eq, var)
+            var = sp.symbols(variable)
+            solutions = self._cached('solve', eq, (var,), lambda: sp.solve(eq, var))
+            return [str(sol) for sol in solutions], solutions
+        except Exception as e:
+            return [f"错误: {str(e)}"], None
+    
+    def solve_system(self, equations, variables=None):
+        """求解方程组，每个解为 {未知数: 值} 字典
+        
+        equations、variables 的格式见 system_solver.parse_system。
+        多项式方程组由 sympy 用Gröbner基求解，可能很慢，
+        需要时间预算时请使用 NumericalCalculator.solve_system。
+        """
+        try:
+            exprs, symbols = parse_system(equations, variables)
+            solutions = self._cached('solve_system', sp.Tuple(*exprs), symbols,
+                                     lambda: sp.solve(exprs, symbols, dict=True))
             return [str(sol) for sol in solutions], solutions
         except Exception as e:
             return [f"错误: {str(e)}"], None
@@ -69,31 +325,67 @@ class SymbolicCalculator:
         """傅里叶变换"""
         try:
             expr = sp.sympify(expression)
-            t_var = symbols(variable)
-            w_var = symbols(freq_var)
+            t_var = sp.symbols(variable)
+            w_var = sp.symbols(freq_var)
             
-            result = fourier_transform(expr, t_var, w_var)
+            result = self._cached('fourier_transform', expr, (t_var, w_var),
+                                  lambda: self._table_or_sympy(
+                                      self.fourier_table.transform(expr, t_var, w_var),
+                                      lambda: sp.fourier_transform(expr, t_var, w_var)))
             return str(result), result
         except Exception as e:
             return f"错误: {str(e)}", None
     
+    def numeric_fourier_transform(self, expression, variable='t', t_range=(-10, 10), num_points=4096, window=None):
+        """数值傅里叶变换：在 t_range 上采样 num_points 个点做FFT
+        
+        用于sympy求不出闭式解（返回错误或未求值的 FourierTransform）的情况，
+        返回 SpectrumAnalyzer.expression_spectrum 的结果字典。
+        """
+        try:
+            expr = sp.sympify(expression)
+        except Exception as e:
+            return f"错误: {str(e)}"
+        return self.spectrum.expression_spectrum(expr, variable, t_range, num_points, window)
+    
+    @staticmethod
+    def _table_or_sympy(table_result, fallback):
+        """查表结果为None时调用sympy计算"""
+        return table_result if table_result is not None else fallback()
+    
     def inverse_fourier_transform_calc(self, expression, freq_var='w', variable='t'):
         """逆傅里叶变换"""
         try:
             expr = sp.sympify(expression)
-            w_var = symbols(freq_var)
-            t_var = symbols(variable)
+            w_var = sp.symbols(freq_var)
+            t_var = sp.symbols(variable)
             
-            result = inverse_fourier_transform(expr, w_var, t_var)
+            result = self._cached('inverse_fourier_transform', expr, (w_var, t_var),
+                                  lambda: self._table_or_sympy(
+                                      self.fourier_table.inverse_transform(expr, w_var, t_var),
+                                      lambda: sp.inverse_fourier_transform(expr, w_var, t_var)))
             return str(result), result
         except Exception as e:
             return f"错误: {str(e)}", None
     
-    def simplify_expression(self, expression):
-        """化简表达式"""
+    def simplify_expression(self, expression, time_budget=2.0, ops_budget=200):
+        """化简表达式
+        
+        分级化简：先做廉价的变换，预算允许时再尝试代价更高的步骤，
+        返回预算内得到的最简结果。各步骤的效果记录在 last_simplify_report。
+        有步骤因时间不足被跳过或中断时结果与机器负载有关，不写入缓存。
+        """
         try:
             expr = sp.sympify(expression)
-            result = sp.simplify(expr)
+            key = self.result_cache.make_key('simplify', expr, time_budget, ops_budget)
+            cached = self.result_cache.get(key)
+            if cached is None:
+                result, report = tiered_simplify(expr, time_budget, ops_budget)
+                if not any(reason in _TIME_SKIP_REASONS for _, reason in report['跳过步骤']):
+                    self.result_cache.put(key, (result, report))
+            else:
+                result, report = cached
+            self.last_simplify_report = report
             return str(result), result
         except Exception as e:
             return f"错误: {str(e)}", None
\ No newline at end of file
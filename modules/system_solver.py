@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+非线性方程组求解模块
+功能：先在时间预算内尝试sympy符号求解，得不到解时从Sobol起点出发多起点数值求根，
+起点分发到进程池，不同起点收敛到的同一个解只保留一次
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.lazy_import import lazy_import
+from .compile_bridge import LAMBDIFY_MODULES
+from .simplifier import _PassTimeout, _deadline
+
+sp = lazy_import('sympy')
+optimize = lazy_import('scipy.optimize')
+qmc = lazy_import('scipy.stats.qmc')
+
+
+def parse_system(equations, variables=None):
+    """把方程组整理为 (sympy表达式列表, Symbol列表)
+
+    equations: 字符串（或sympy对象）列表，也可以是用 ';' 或换行分隔的字符串；
+               'lhs = rhs' 形式整理为 lhs - rhs
+    variables: 'x, y' 形式的字符串或名称列表，省略时取全部自由符号（按名称排序）
+    """
+    if isinstance(equations, str):
+        equations = [e for e in equations.replace('\n', ';').split(';') if e.strip()]
+    exprs = []
+    for equation in equations:
+        if isinstance(equation, str):
+            equation = equation.replace('^', '**').replace('==', '=')
+            if '=' in equation:
+                lhs, rhs = equation.split('=', 1)
+                equation = sp.sympify(lhs) - sp.sympify(rhs)
+        exprs.append(sp.sympify(equation))
+    if not exprs:
+        raise ValueError("方程组为空")
+
+    free = set().union(*(e.free_symbols for e in exprs))
+    if variables is None:
+        symbols = sorted(free, key=str)
+    else:
+        if isinstance(variables, str):
+            variables = [v.strip() for v in variables.split(',') if v.strip()]
+        by_name = {str(s): s for s in free}
+        symbols = [by_name.get(str(v), sp.Symbol(str(v))) for v in variables]
+    unknown = free - set(symbols)
+    if unknown:
+        raise ValueError(f"方程中含有未指定为未知数的符号: {', '.join(sorted(map(str, unknown)))}")
+    return exprs, symbols
+
+
+def _can_spawn():
+    """守护进程（如沙箱工作进程）不能再创建子进程"""
+    return not multiprocessing.current_process().daemon
+
+
+class SystemSolver:
+    """非线性方程组求解
+
+    1. 符号求解：sympy.solve（多项式方程组内部使用Gröbner基）在沙箱进程中运行，
+       超出 symbolic_timeout 即终止
+    2. 数值求解：符号求解失败、超时或没有解时，在 bounds 内取 Sobol 起点，
+       每个起点用 scipy.optimize.root 求根，雅可比矩阵由sympy符号求导得到；
+       起点多时分块分发到进程池，残差满足要求的解按位置去重
+    在守护进程中调用时（不能创建子进程）两步都在当前进程中进行。
+    """
+
+    def __init__(self):
+        self._sandbox = None
+        self._symbolic_calc = None
+        self._executor = None
+        self._executor_workers = None
+
+    def solve(self, equations, variables=None, bounds=(-10, 10), num_starts=64, symbolic_timeout=5.0,
+              tol=1e-10, workers=None, seed=0, parallel_threshold=32):
+        """求解方程组
+
+        bounds 为所有未知数共用的 (下界, 上界)，或每个未知数各一对。
+        返回字典：'解' 为 (解的个数, 未知数个数) 数组（只含实数解），
+        '方法' 为 '符号' 或 '多起点数值'；符号求解成功时 '符号解' 为各解的字符串，
+        数值求解时 '收敛起点数' 为收敛到各解的起点个数。
+        """
+        try:
+            exprs, symbols = parse_system(equations, variables)
+            names = [str(s) for s in symbols]
+
+            symbolic = self.solve_symbolic(exprs, symbols, symbolic_timeout)
+            if symbolic:
+                solutions, texts = self._numeric_values(symbolic, symbols)
+                return {
+                    '变量': names,
+                    '解': solutions,
+                    '残差': np.zeros(len(solutions)),
+                    '符号解': texts,
+                    '方法': '符号',
+                }
+
+            if len(exprs) < len(symbols):
+                return "错误: 符号求解失败，数值求解要求方程个数不少于未知数个数"
+            starts = self._sobol_starts(bounds, len(symbols), num_starts, seed)
+            found = self._multistart(exprs, symbols, starts, tol, workers, parallel_threshold)
+            solutions, residuals, counts = self._deduplicate(found, len(symbols))
+            return {
+                '变量': names,
+                '解': solutions,
+                '残差': residuals,
+                '收敛起点数': counts,
+                '起点数': len(starts),
+                '方法': '多起点数值',
+            }
+        except Exception as e:
+            return f"错误: {str(e)}"
+
+    def solve_symbolic(self, exprs, symbols, timeout):
+        """在时间预算内符号求解，失败、超时或无解时返回空列表"""
+        target = ('modules.symbolic_calc:SymbolicCalculator', 'solve_system')
+        try:
+            if _can_spawn():
+                if self._sandbox is None:
+                    from utils.sandbox import SandboxPool
+                    self._sandbox = SandboxPool(size=1, max_workers=1, timeout=None, memory_limit_mb=None,
+                                                warm_imports=('sympy', 'modules.symbolic_calc'))
+                _, solutions = self._sandbox.call(*target, exprs, symbols, timeout=timeout)
+            else:
+                if self._symbolic_calc is None:
+                    from .symbolic_calc import SymbolicCalculator
+                    self._symbolic_calc = SymbolicCalculator()
+                with _deadline(timeout):
+                    _, solutions = self._symbolic_calc.solve_system(exprs, symbols)
+        except (_PassTimeout, Exception):
+            # 超时、sympy无法求解等情况都交给数值求解
+            return []
+        return solutions or []
+
+    @staticmethod
+    def _numeric_values(symbolic, symbols):
+        """符号解的字符串及其中的实数值解（含自由参数或复数的解不计入数值解）"""
+        texts, values = [], []
+        for solution in symbolic:
+            texts.append(', '.join(f"{s} = {solution.get(s, s)}" for s in symbols))
+            point = [solution.get(s, s) for s in symbols]
+            if any(sp.sympify(v).free_symbols for v in point):
+                continue
+            point = np.array([complex(sp.N(v)) for v in point])
+            if np.all(np.abs(point.imag) <= 1e-12 * (1 + np.abs(point.real))):
+                values.append(point.real)
+        return np.array(values, dtype=float).reshape(-1, len(symbols)), texts
+
+    @staticmethod
+    def _sobol_starts(bounds, dim, num_starts, seed):
+        """在 bounds 内取加扰Sobol起点，比随机起点覆盖更均匀"""
+        bounds = np.broadcast_to(np.asarray(bounds, dtype=float), (dim, 2))
+        sampler = qmc.Sobol(d=dim, scramble=True, seed=seed)
+        # Sobol序列取2的幂个点时均匀性最好
+        points = sampler.random_base2(int(np.ceil(np.log2(max(num_starts, 2)))))[:num_starts]
+        return qmc.scale(points, bounds[:, 0], bounds[:, 1])
+
+    def _multistart(self, exprs, symbols, starts, tol, workers, parallel_threshold):
+        """从各起点求根，返回 (解, 残差) 列表；所有起点都出错时抛出第一个错误"""
+        system = (tuple(sp.srepr(e) for e in exprs), tuple(sp.srepr(s) for s in symbols))
+        if len(starts) < parallel_threshold or not _can_spawn():
+            chunks = [_solve_from_starts((system, starts, tol))]
+        else:
+            workers = workers or os.cpu_count() or 1
+            size = max(1, -(-len(starts) // (workers * 4)))
+            jobs = [(system, starts[i:i + size], tol) for i in range(0, len(starts), size)]
+            executor = self._get_executor(workers)
+            chunks = list(executor.map(_solve_from_starts, jobs))
+        found = [item for results, _, _ in chunks for item in results]
+        failures = sum(count for _, count, _ in chunks)
+        if failures == len(starts):
+            # 每个起点都出错说明方程本身无法数值求值，不能当作“没有解”
+            error = next(message for _, _, message in chunks if message)
+            raise ValueError(f"数值求解失败（全部 {failures} 个起点出错）: {error}")
+        return found
+
+    @staticmethod
+    def _deduplicate(found, dim, rtol=1e-6):
+        """合并相对距离在 rtol 以内的解，保留残差最小的一个，并统计收敛到该解的起点数"""
+        solutions, residuals, counts = [], [], []
+        for point, residual in sorted(found, key=lambda item: item[1]):
+            if solutions:
+                distance = np.max(np.abs(np.array(solutions) - point) / (1 + np.abs(point)), axis=1)
+                nearest = int(np.argmin(distance))
+                if distance[nearest] <= rtol:
+                    counts[nearest] += 1
+                    continue
+            solutions.append(point)
+            residuals.append(residual)
+            counts.append(1)
+        solutions = np.array(solutions, dtype=float).reshape(-1, dim)
+        # 按各分量字典序排列，结果与起点顺序无关
+        order = np.lexsort(solutions.T[::-1]) if len(solutions) else np.array([], dtype=int)
+        return solutions[order], np.array(residuals, dtype=float)[order], np.array(counts, dtype=int)[order]
+
+    def _get_executor(self, workers):
+        """复用进程池，避免每次求解都重新启动进程"""
+        if self._executor is None or self._executor_workers != workers:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+            self._executor_workers = workers
+        return self._executor
+
+    def shutdown(self):
+        """关闭符号求解沙箱和多起点求解进程池"""
+        if self._sandbox is not None:
+            self._sandbox.shutdown()
+            self._sandbox = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+# 工作进程中按方程组缓存编译好的残差函数和雅可比矩阵
+_worker_systems = {}
+
+
+def _compile_system(system):
+    """把 (方程srepr, 未知数srepr) 编译为残差函数和雅可比矩阵函数"""
+    if system not in _worker_systems:
+        exprs = [sp.sympify(e) for e in system[0]]
+        symbols = [sp.sympify(s) for s in system[1]]
+        residual = sp.lambdify(symbols, exprs, LAMBDIFY_MODULES)
+        jacobian = sp.lambdify(symbols, sp.Matrix(exprs).jacobian(symbols), LAMBDIFY_MODULES)
+        _worker_systems[system] = (
+            lambda x: np.asarray(residual(*x), dtype=float),
+            lambda x: np.asarray(jacobian(*x), dtype=float),
+            len(exprs) == len(symbols),
+        )
+    return _worker_systems[system]
+
+
+def _solve_from_starts(job):
+    """从一组起点求根，返回 (残差不超过 tol 的 (解, 残差) 列表, 出错的起点数, 第一个错误信息)
+
+    方程个数等于未知数个数时用 hybr（Powell混合法），方程更多时用 lm（最小二乘）。
+    """
+    system, starts, tol = job
+    residual, jacobian, square = _compile_system(system)
+    method = 'hybr' if square else 'lm'
+    results = []
+    failures = 0
+    first_error = None
+    with np.errstate(all='ignore'):
+        for start in starts:
+            try:
+                info = optimize.root(residual, start, jac=jacobian, method=method)
+                error = float(np.max(np.abs(residual(info.x))))
+            except Exception as e:
+                failures += 1
+                if first_error is None:
+                    first_error = f"{type(e).__name__}: {e}"
+                continue
+            if np.all(np.isfinite(info.x)) and error <= tol:
+                results.append((info.x, error))
+    return results, failures, first_error
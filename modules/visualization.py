@@ -5,25 +5,57 @@
 功能：绘制折线图、曲线图、散点图等
 """
 
-import matplotlib.pyplot as plt
+import io
+
 import numpy as np
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib
-matplotlib.use('TkAgg')
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei']
-plt.rcParams['axes.unicode_minus'] = False
+from utils.lazy_import import lazy_import
+from .compile_bridge import CompileBridge
+
+
+def _configure_matplotlib(pyplot):
+    """pyplot 第一次导入后设置后端和中文字体"""
+    import matplotlib
+    matplotlib.use('TkAgg')
+    
+    # 设置中文字体
+    pyplot.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei']
+    pyplot.rcParams['axes.unicode_minus'] = False
+
+
+# matplotlib 在第一次创建图形时才导入
+plt = lazy_import('matplotlib.pyplot', on_import=_configure_matplotlib)
+backend_tkagg = lazy_import('matplotlib.backends.backend_tkagg')
+mathtext = lazy_import('matplotlib.mathtext')
+font_manager = lazy_import('matplotlib.font_manager')
+
+
+def render_latex_png(expression, fontsize=12, dpi=100):
+    """把LaTeX公式渲染为PNG字节串
+    
+    直接使用mathtext排版，不经过pyplot和画布，可在后台线程中调用。
+    公式无效时抛出ValueError。
+    """
+    buffer = io.BytesIO()
+    mathtext.math_to_image(f'${expression}$', buffer, prop=font_manager.FontProperties(size=fontsize),
+                           dpi=dpi, format='png')
+    return buffer.getvalue()
 
 class DataVisualizer:
-    def __init__(self):
+    def __init__(self, sandbox=None):
         self.figure = None
         self.canvas = None
+        # 设置后函数求值在沙箱工作进程中执行，避免失控表达式卡住界面
+        self.sandbox = sandbox
+        self._numerical_calc = None
+        self._data_processor = None
+        # 符号结果直接编译为数值核函数绘图
+        self.compile_bridge = CompileBridge()
     
     def create_figure(self, parent_widget):
         """创建matplotlib图形"""
         self.figure = plt.Figure(figsize=(10, 6), dpi=100)
-        self.canvas = FigureCanvasTkAgg(self.figure, parent_widget)
+        self.canvas = backend_tkagg.FigureCanvasTkAgg(self.figure, parent_widget)
         return self.canvas.get_tk_widget()
     
     def plot_line(self, x_data, y_data, title="折线图", xlabel="X轴", ylabel="Y轴", label="数据"):
@@ -59,21 +91,20 @@ class DataVisualizer:
             return f"错误: {str(e)}"
     
     def plot_function(self, func_str, x_range=(-10, 10), num_points=1000, title="函数图像"):
-        """绘制函数图像"""
+        """绘制函数图像
+        
+        数据点在当前线程中计算（设置了沙箱时阻塞等待工作进程）；
+        界面中应使用 submit_function_values 提交计算，完成后再调用 draw_function。
+        """
+        try:
+            x, y = self.function_values(func_str, x_range, num_points)
+            return self.draw_function(func_str, x, y, title)
+        except Exception as e:
+            return f"错误: {type(e).__name__}: {e}"
+    
+    def draw_function(self, func_str, x, y, title="函数图像"):
+        """用已经算好的数据点绘制函数图像"""
         try:
-            x = np.linspace(x_range[0], x_range[1], num_points)
-            
-            # 安全计算函数值
-            import math
-            allowed_names = {
-                k: v for k, v in math.__dict__.items() if not k.startswith("__")
-            }
-            allowed_names.update({
-                'x': x, 'np': np
-            })
-            
-            y = eval(func_str, {"__builtins__": {}}, allowed_names)
-            
             self.figure.clear()
             ax = self.figure.add_subplot(111)
             ax.plot(x, y, label=f'y = {func_str}')
@@ -84,9 +115,157 @@ class DataVisualizer:
             ax.grid(True, alpha=0.3)
             self.canvas.draw()
             return "函数图像绘制成功"
+        except Exception as e:
+            return f"错误: {type(e).__name__}: {e}"
+    
+    def plot_expression(self, expr, variable='x', x_range=(-10, 10), num_points=1000,
+                        title="函数图像", backend='auto'):
+        """绘制符号结果（sympy对象）的图像
+        
+        表达式经cse编译为核函数后在网格上直接求值，不经过字符串和eval。
+        结果含复数时分别绘制实部和虚部。
+        """
+        try:
+            x = np.linspace(x_range[0], x_range[1], num_points)
+            y = self.compile_bridge.evaluate(expr, variable, x, backend=backend)
+            
+            self.figure.clear()
+            ax = self.figure.add_subplot(111)
+            if np.iscomplexobj(y):
+                ax.plot(x, y.real, label=f'Re[{expr}]')
+                ax.plot(x, y.imag, label=f'Im[{expr}]', linestyle='--')
+            else:
+                ax.plot(x, y, label=f'y = {expr}')
+            ax.set_title(title)
+            ax.set_xlabel(variable)
+            ax.set_ylabel('y')
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+            self.canvas.draw()
+            return "函数图像绘制成功"
         except Exception as e:
             return f"错误: {str(e)}"
     
+    def plot_spectrum(self, freq, magnitude, phase=None, title="频谱", ylabel="幅值", log_scale=False):
+        """绘制频谱：上图为幅值（log_scale=True 时用对数纵轴，适合功率谱密度），
+        给出 phase 时下图为相位"""
+        try:
+            self.figure.clear()
+            ax = self.figure.add_subplot(211 if phase is not None else 111)
+            if log_scale:
+                ax.semilogy(freq, magnitude)
+            else:
+                ax.plot(freq, magnitude)
+            ax.set_title(title)
+            ax.set_ylabel(ylabel)
+            ax.grid(True, alpha=0.3)
+            if phase is not None:
+                phase_ax = self.figure.add_subplot(212, sharex=ax)
+                phase_ax.plot(freq, phase, color='tab:orange')
+                phase_ax.set_ylabel('相位 (rad)')
+                phase_ax.grid(True, alpha=0.3)
+                phase_ax.set_xlabel('频率')
+            else:
+                ax.set_xlabel('频率')
+            self.canvas.draw()
+            return "频谱绘制成功"
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    def plot_heatmap(self, matrix, labels=None, title="相关系数矩阵", vmin=-1.0, vmax=1.0,
+                     cmap='coolwarm', annotate_limit=15):
+        """绘制热力图（如相关系数矩阵）
+        
+        matrix 可以是二维数组或DataFrame（此时默认用列名作标签）；
+        行列数不超过 annotate_limit 时在格子中标注数值。
+        """
+        try:
+            if labels is None and hasattr(matrix, 'columns'):
+                labels = [str(c) for c in matrix.columns]
+            values = np.asarray(matrix, dtype=float)
+            
+            self.figure.clear()
+            ax = self.figure.add_subplot(111)
+            image = ax.imshow(values, cmap=cmap, vmin=vmin, vmax=vmax, aspect='auto', interpolation='nearest')
+            self.figure.colorbar(image, ax=ax)
+            if labels is not None and len(labels) <= 50:
+                ax.set_xticks(range(len(labels)))
+                ax.set_yticks(range(len(labels)))
+                ax.set_xticklabels(labels, rotation=90)
+                ax.set_yticklabels(labels)
+            if max(values.shape) <= annotate_limit:
+                for (i, j), value in np.ndenumerate(values):
+                    if np.isfinite(value):
+                        ax.text(j, i, f"{value:.2f}", ha='center', va='center', fontsize=8)
+            ax.set_title(title)
+            self.canvas.draw()
+            return "热力图绘制成功"
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    def plot_stream(self, chunks, labels=None, title="数值解", xlabel="t", ylabel="y", max_points=5000):
+        """逐块绘制流式数据（如ODESolver.stream的输出）
+        
+        chunks 产出 (x_chunk, y_chunk)，y_chunk 形状为 (曲线数, 块长)。
+        每条曲线最多保留 max_points 个点，超过后成倍抽稀，
+        因此绘图占用的内存与轨迹总长度无关。
+        """
+        try:
+            self.figure.clear()
+            ax = self.figure.add_subplot(111)
+            ax.set_title(title)
+            ax.set_xlabel(xlabel)
+            ax.set_ylabel(ylabel)
+            ax.grid(True, alpha=0.3)
+            
+            lines = None
+            xs, ys = np.empty(0), None
+            stride, seen = 1, 0
+            for x_chunk, y_chunk in chunks:
+                y_chunk = np.atleast_2d(y_chunk)
+                # 只保留全局序号为 stride 整数倍的点，跨块时抽稀间隔保持一致
+                keep = np.flatnonzero((seen + np.arange(len(x_chunk))) % stride == 0)
+                seen += len(x_chunk)
+                xs = np.concatenate([xs, x_chunk[keep]])
+                ys = y_chunk[:, keep] if ys is None else np.concatenate([ys, y_chunk[:, keep]], axis=1)
+                if len(xs) > max_points:
+                    xs, ys = xs[::2], ys[:, ::2]
+                    stride *= 2
+                
+                if lines is None:
+                    names = labels or [f"{ylabel}{i}" for i in range(len(ys))]
+                    lines = [ax.plot(xs, row, label=name)[0] for row, name in zip(ys, names)]
+                    ax.legend()
+                else:
+                    for line, row in zip(lines, ys):
+                        line.set_data(xs, row)
+                ax.relim()
+                ax.autoscale_view()
+                self.canvas.draw_idle()
+                self.canvas.flush_events()
+            
+            self.canvas.draw()
+            return "数值解绘制成功"
+        except Exception as e:
+            return f"错误: {str(e)}"
+    
+    def function_values(self, func_str, x_range=(-10, 10), num_points=1000):
+        """计算函数图像的数据点，设置了沙箱时在工作进程中计算（阻塞等待结果）"""
+        if self.sandbox is not None:
+            return self.sandbox.call('modules.numerical_calc:NumericalCalculator', 'function_values',
+                                     func_str, x_range, num_points)
+        if self._numerical_calc is None:
+            from .numerical_calc import NumericalCalculator
+            self._numerical_calc = NumericalCalculator()
+        return self._numerical_calc.function_values(func_str, x_range, num_points)
+    
+    def submit_function_values(self, func_str, x_range=(-10, 10), num_points=1000):
+        """把函数图像数据点的计算提交到沙箱，立即返回 SandboxJob；没有设置沙箱时返回None"""
+        if self.sandbox is None:
+            return None
+        return self.sandbox.submit('modules.numerical_calc:NumericalCalculator', 'function_values',
+                                   func_str, x_range, num_points)
+    
     def plot_histogram(self, data, bins=30, title="直方图", xlabel="值", ylabel="频数"):
         """绘制直方图"""
         try:
@@ -121,19 +300,22 @@ class DataVisualizer:
         except Exception as e:
             return f"错误: {str(e)}"
     
-    def plot_curve_fitting(self, x_data, y_data, fit_type='linear', title="曲线拟合"):
-        """绘制曲线拟合图像"""
+    def plot_curve_fitting(self, x_data, y_data, fit_type='linear', title="曲线拟合", fit_result=None):
+        """绘制曲线拟合图像
+        
+        fit_result 为 DataProcessor.curve_fitting 返回的拟合结果，给出时直接用它
+        在平滑网格上求值，不再重新拟合；否则先拟合（相同数据的拟合结果有缓存）。
+        """
         try:
-            from .data_processing import DataProcessor
-            processor = DataProcessor()
-            
-            # 获取拟合结果
-            fit_result = processor.curve_fitting(x_data, y_data, fit_type)
+            if fit_result is None:
+                if self._data_processor is None:
+                    from .data_processing import DataProcessor
+                    self._data_processor = DataProcessor()
+                fit_result = self._data_processor.curve_fitting(x_data, y_data, fit_type)
             
             if isinstance(fit_result, str):  # 错误情况
                 return fit_result
             
-            fitted_y = fit_result['拟合数据']
             equation = fit_result['拟合方程']
             r_squared = fit_result['R²']
             
@@ -158,22 +340,7 @@ class DataVisualizer:
                 x_range = (x_max - x_min) * 0.1
                 x_smooth = np.linspace(x_min - x_range, x_max + x_range, 100)
             
-            if fit_type == 'linear':
-                # 线性拟合
-                from scipy import stats
-                slope, intercept, _, _, _ = stats.linregress(x_data, y_data)
-                y_smooth = slope * x_smooth + intercept
-            elif fit_type == 'polynomial':
-                # 多项式拟合
-                coeffs = np.polyfit(x_data, y_data, 2)
-                y_smooth = np.polyval(coeffs, x_smooth)
-            elif fit_type == 'exponential':
-                # 指数拟合
-                from scipy.optimize import curve_fit
-                def exp_func(x, a, b, c):
-                    return a * np.exp(b * x) + c
-                popt, _ = curve_fit(exp_func, x_data, y_data, maxfev=1000)
-                y_smooth = exp_func(x_smooth, *popt)
+            y_smooth = fit_result.predict(x_smooth)
             
             ax.plot(x_smooth, y_smooth, 'r-', label=f'拟合曲线 (R²={r_squared:.4f})', linewidth=2)
             
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""批量计算测试"""
+
+import io
+import json
+
+import pytest
+
+from utils.batch_runner import run_batch, run_job
+
+
+@pytest.mark.parametrize('module', ['numerical', 'NumericalCalculator', 'modules.numerical_calc:NumericalCalculator'])
+def test_whitelisted_module_names(module):
+    record = run_job({'id': 1, 'module': module, 'method': 'matrix_operations',
+                      'args': ['determinant', [[1, 2], [3, 4]]]})
+    assert record['成功'], record
+    assert record['结果'] == pytest.approx(-2)
+
+
+@pytest.mark.parametrize('module, method', [
+    ('os:system', 'echo'),
+    ('os', 'system'),
+    ('subprocess:Popen', 'wait'),
+    ('numerical', '__class__'),
+    ('numerical', '_build_symbolic_derivative'),
+])
+def test_disallowed_targets_are_rejected(module, method):
+    record = run_job({'module': module, 'method': method, 'args': ['echo unsafe']})
+    assert not record['成功']
+    assert record['结果'].startswith('错误: ValueError')
+
+
+def test_run_batch_sequential_writes_one_line_per_job():
+    jobs = enumerate([
+        {'id': 'a', 'module': 'data', 'method': 'basic_statistics', 'args': [[1, 2, 3]]},
+        {'id': 'b', 'module': 'os:system', 'method': 'echo'},
+    ])
+    output = io.StringIO()
+    summary = run_batch(jobs, output=output, workers=1)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [r['id'] for r in records] == ['a', 'b']
+    assert records[0]['结果']['平均值'] == 2
+    assert (summary['成功'], summary['失败']) == (1, 1)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""符号-数值编译桥测试"""
+
+import math
+
+import numpy as np
+import pytest
+from scipy import special
+
+from modules.compile_bridge import CompileBridge, CompiledKernel
+
+
+def test_elementary_expression_matches_numpy():
+    x = np.linspace(-2, 2, 11)
+    result = CompileBridge().evaluate('sin(x)*x + exp(-x**2)', 'x', x)
+    np.testing.assert_allclose(result, np.sin(x) * x + np.exp(-x ** 2))
+
+
+@pytest.mark.parametrize('expr, expected', [
+    ('sqrt(pi)*erf(x)/2', lambda x: math.sqrt(math.pi) * special.erf(x) / 2),
+    ('gamma(x)', special.gamma),
+    ('polygamma(1, x)', lambda x: special.polygamma(1, x)),
+    ('besselj(0, x)', lambda x: special.jv(0, x)),
+])
+def test_special_functions_vectorize(expr, expected):
+    # 特殊函数必须能直接处理数组，不能退化为只接受标量的实现
+    x = np.array([0.5, 1.0, 2.5])
+    np.testing.assert_allclose(CompileBridge().evaluate(expr, 'x', x), expected(x))
+
+
+def test_common_subexpressions_are_counted_once():
+    kernel = CompiledKernel('sin(x)**2 + sin(x)*cos(y) + exp(sin(x)*cos(y))', 'x, y')
+    assert kernel.subexpressions == 2
+    x = np.linspace(0, 1, 5)
+    np.testing.assert_allclose(kernel(x, x), np.sin(x) ** 2 + np.sin(x) * np.cos(x) + np.exp(np.sin(x) * np.cos(x)))
+
+
+def test_constant_expression_fills_grid():
+    np.testing.assert_allclose(CompileBridge().evaluate('pi + 2', 'x', np.zeros(4)), np.full(4, math.pi + 2))
+
+
+def test_chunked_evaluation_matches_single_pass():
+    x = np.linspace(0, 10, 1001)
+    bridge = CompileBridge()
+    np.testing.assert_allclose(bridge.evaluate('erf(x)*x', 'x', x, chunk_size=64),
+                               bridge.evaluate('erf(x)*x', 'x', x))
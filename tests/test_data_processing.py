@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""数据处理模块测试"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.data_processing import KENDALL_MAX_COLUMNS, DataProcessor
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(200, 6))
+    data[:, 1] += data[:, 0]
+    df = pd.DataFrame(data, columns=list('abcdef'))
+    df.iloc[rng.choice(200, 30, replace=False), 2] = np.nan
+    df.iloc[rng.choice(200, 15, replace=False), 4] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman', 'kendall'])
+def test_correlation_matrix_matches_pandas(frame, method):
+    result = DataProcessor().correlation_matrix(frame, method, block_size=4)
+    np.testing.assert_allclose(result['相关系数'].to_numpy(), frame.corr(method=method).to_numpy(), atol=1e-10)
+    np.testing.assert_array_equal(result['样本数'].to_numpy(), frame.notna().astype(int).T @ frame.notna().astype(int))
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman'])
+def test_correlation_matrix_without_nan_matches_pandas(frame, method):
+    complete = frame.dropna()
+    result = DataProcessor().correlation_matrix(complete, method, block_size=4)
+    np.testing.assert_allclose(result['相关系数'].to_numpy(), complete.corr(method=method).to_numpy(), atol=1e-10)
+
+
+def test_all_nan_column_does_not_warn(frame):
+    frame['g'] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result = DataProcessor().correlation_matrix(frame, 'pearson')
+    assert np.isnan(result['相关系数'].loc['g']).all()
+
+
+def test_kendall_rejects_too_many_columns():
+    df = pd.DataFrame(np.zeros((3, KENDALL_MAX_COLUMNS + 1)))
+    assert DataProcessor().correlation_matrix(df, 'kendall').startswith('错误')
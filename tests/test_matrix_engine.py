@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""矩阵运算引擎测试"""
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from modules.matrix_engine import (
+    DENSE_EIGEN_LIMIT, MatrixExpressionEvaluator, MatrixFactorization, eigenvalues, is_symmetric,
+)
+from modules.numerical_calc import NumericalCalculator
+
+
+def test_sparse_eigenvalues_return_full_spectrum():
+    np.testing.assert_allclose(np.sort(eigenvalues(sparse.csr_matrix(np.diag([1.0, 2.0, 3.0])))), [1, 2, 3])
+    matrix = sparse.random(10, 10, density=0.5, random_state=0) + sparse.eye(10)
+    assert len(eigenvalues(matrix.tocsr())) == 10
+
+
+def test_small_sparse_matrix_falls_back_to_dense():
+    np.testing.assert_allclose(np.sort(eigenvalues(sparse.csr_matrix([[5.0]]))), [5.0])
+    np.testing.assert_allclose(np.sort(eigenvalues(sparse.csr_matrix([[2.0, 0], [0, 1.0]]))), [1, 2])
+
+
+def test_large_sparse_matrix_requires_k():
+    n = DENSE_EIGEN_LIMIT + 1
+    matrix = sparse.diags(np.arange(1.0, n + 1)).tocsr()
+    with pytest.raises(ValueError):
+        eigenvalues(matrix)
+    np.testing.assert_allclose(np.sort(eigenvalues(matrix, k=2)), [n - 1, n])
+
+
+def test_complex_symmetric_matrix_is_not_hermitian():
+    matrix = np.array([[1, 1j], [1j, 1]])
+    assert not is_symmetric(matrix)
+    result = NumericalCalculator().matrix_operations('eigenvalues', matrix.tolist())
+    np.testing.assert_allclose(sorted(result, key=lambda z: z.imag), [1 - 1j, 1 + 1j])
+
+
+def test_factorization_determinant_keeps_complex_values():
+    matrix = np.array([[1, 2j], [3, 4]])
+    assert MatrixFactorization(matrix).determinant() == pytest.approx(np.linalg.det(matrix))
+    assert MatrixFactorization(sparse.csc_matrix(matrix)).determinant() == pytest.approx(np.linalg.det(matrix))
+
+
+def test_list_operand_is_multiplied_elementwise():
+    evaluator = MatrixExpressionEvaluator()
+    result, _ = evaluator.evaluate('[1, 2] * 2 + det(mat([[1, 0], [0, 1]]))')
+    np.testing.assert_allclose(result, [3, 5])
+    result, _ = evaluator.evaluate('2 * (1, 2) * 3')
+    np.testing.assert_allclose(result, [6, 12])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""数值计算模块测试"""
+
+import numpy as np
+import pytest
+from scipy import special
+
+from modules.numerical_calc import NumericalCalculator
+
+
+@pytest.fixture
+def calc():
+    return NumericalCalculator()
+
+
+def test_derivative_of_special_function(calc):
+    assert calc.numerical_derivative('gamma(x)', 'x', 2.0) == pytest.approx(special.digamma(2.0))
+
+
+def test_derivative_vectorized_over_points(calc):
+    np.testing.assert_allclose(calc.numerical_derivative('x**3', 'x', [1.0, 2.0, -1.0]), [3.0, 12.0, 3.0])
+
+
+def test_derivative_of_abs_is_exact(calc):
+    assert calc.numerical_derivative('Abs(x)', 'x', -2.0) == -1.0
+    assert calc.numerical_derivative('abs(x)', 'x', 3.0) == 1.0
+
+
+@pytest.mark.parametrize('expr, point', [
+    ('log(x)', -1.0),
+    ('sqrt(x)', -1.0),
+    ('1/x', 0.0),
+])
+def test_derivative_outside_domain_is_error(calc, expr, point):
+    result = calc.numerical_derivative(expr, 'x', point)
+    assert isinstance(result, str) and result.startswith('错误')
+
+
+def test_derivative_error_names_bad_points(calc):
+    result = calc.numerical_derivative('sqrt(x)', 'x', [1.0, -4.0, 4.0])
+    assert isinstance(result, str) and '-4' in result
+
+
+@pytest.mark.parametrize('expr, a, b, expected', [
+    ('sin(x)', 0, 1, 1 - np.cos(1)),
+    ('exp(-x**2)', -3, 3, np.sqrt(np.pi) * special.erf(3)),
+    ('abs(x - 0.3)', -1, 1, 1.09),
+])
+def test_gauss_integration_matches_closed_form(calc, expr, a, b, expected):
+    result = calc.numerical_integration_details(expr, 'x', a, b, method='gauss')
+    assert result['积分值'] == pytest.approx(expected, rel=1e-7)
+
+
+@pytest.mark.parametrize('expr', ['1/x', '1/(x - 0.3)'])
+def test_divergent_integral_is_not_reported_as_gauss_converged(calc, expr):
+    # 正负两侧相互抵消的发散积分不能被当作收敛
+    result = calc.numerical_integration_details(expr, 'x', -1, 1, method='auto')
+    assert isinstance(result, str) or (result['引擎'] == 'quad' and '警告' in result)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""常微分方程模块测试"""
+
+import numpy as np
+import pytest
+
+from modules.ode_solver import ODESolver
+
+
+@pytest.fixture
+def solver():
+    return ODESolver()
+
+
+def test_harmonic_oscillator(solver):
+    t = np.linspace(0, 2 * np.pi, 50)
+    result = solver.solve(['y1', '-y0'], 'y0, y1', (0, 2 * np.pi), [1, 0], t_eval=t)
+    np.testing.assert_allclose(result['y'][0], np.cos(t), atol=1e-5)
+
+
+def test_parameter_names_that_clash_with_sympy(solver):
+    # beta、gamma、N、I、S 都是sympy中的内置名称，作为参数时必须解析为普通符号
+    params = {'beta': 0.3, 'gamma': 0.1, 'N': 1000}
+    rhs = ['-beta*S*I/N', 'beta*S*I/N - gamma*I', 'gamma*I']
+    result = solver.solve(rhs, 'S, I, R', (0, 10), [990, 10, 0], params=params)
+    assert isinstance(result, dict) and result['成功']
+    assert result['y'][:, -1].sum() == pytest.approx(1000)
+
+
+def test_special_function_in_rhs(solver):
+    result = solver.solve(['besselj(0, t)'], 'y', (0, 5), [0], method='Radau')
+    assert isinstance(result, dict) and result['成功']
+
+
+def test_stream_matches_solve(solver):
+    rhs, t_span = ['-2*y'], (0, 1)
+    chunks = list(solver.stream(rhs, 'y', t_span, [1.0], num_points=101, chunk_size=32))
+    t = np.concatenate([c[0] for c in chunks])
+    y = np.concatenate([c[1] for c in chunks], axis=1)
+    assert all(len(c[0]) <= 32 for c in chunks)
+    np.testing.assert_allclose(y[0], np.exp(-2 * t), rtol=1e-4)
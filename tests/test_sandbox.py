@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""沙箱进程池测试"""
+
+import pytest
+
+from utils.sandbox import SandboxError, SandboxPool, SandboxTimeout
+
+NUMERICAL = 'modules.numerical_calc:NumericalCalculator'
+
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = SandboxPool(size=1, max_workers=2, timeout=30.0, memory_limit_mb=None,
+                       warm_imports=('numpy', 'modules.numerical_calc'))
+    yield pool
+    pool.shutdown()
+
+
+def test_call_returns_result(pool):
+    assert pool.call(NUMERICAL, 'evaluate_expression', '2**10') == 1024
+
+
+def test_method_keyword_is_forwarded_to_target(pool):
+    # 目标方法自己的 method= 参数不能与 submit 的 method 冲突
+    result = pool.call(NUMERICAL, 'numerical_integration', 'x**2', 'x', 0, 1, method='gauss')
+    assert result == pytest.approx(1 / 3)
+
+
+def test_errors_are_reported(pool):
+    with pytest.raises(SandboxError):
+        pool.call('modules.numerical_calc:NoSuchClass', 'evaluate_expression', '1')
+
+
+def test_timeout_terminates_worker(pool):
+    with pytest.raises(SandboxTimeout):
+        pool.call('time:sleep', None, 5, timeout=0.5)
+    # 超时的进程被替换后仍可继续计算
+    assert pool.call(NUMERICAL, 'evaluate_expression', '1+1') == 2
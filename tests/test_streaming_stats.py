@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""流式统计模块测试"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.data_processing import DataProcessor
+from modules.streaming_stats import KLLSketch, StreamingStatistics
+
+
+@pytest.fixture
+def data():
+    return np.random.default_rng(0).lognormal(size=200_000)
+
+
+def test_welford_merge_matches_numpy(data):
+    partials = [StreamingStatistics(exact_limit=0, seed=i).update(chunk)
+                for i, chunk in enumerate(np.array_split(data, 7))]
+    total = StreamingStatistics(exact_limit=0)
+    for partial in partials:
+        total.merge(partial)
+    result = total.result()
+    assert result['数据点数'] == len(data)
+    np.testing.assert_allclose(result['平均值'], data.mean(), rtol=1e-12)
+    np.testing.assert_allclose(result['方差'], data.var(), rtol=1e-10)
+    assert result['最小值'] == data.min() and result['最大值'] == data.max()
+
+
+def test_kll_merge_rank_error(data):
+    merged = KLLSketch(seed=0)
+    for i, chunk in enumerate(np.array_split(data, 5)):
+        merged.merge(KLLSketch(seed=i).update(chunk))
+    assert merged.count == len(data)
+    ordered = np.sort(data)
+    for q in (0.25, 0.5, 0.75):
+        rank = np.searchsorted(ordered, merged.quantiles(q)) / len(data)
+        assert abs(rank - q) < 0.02
+
+
+def test_exact_mode_matches_percentile(data):
+    sample = data[:1000].copy()
+    sample[::10] = np.nan
+    stats = StreamingStatistics()
+    for chunk in np.array_split(sample, 3):
+        stats.update(chunk)
+    result = stats.result()
+    valid = sample[~np.isnan(sample)]
+    assert '分位数为近似值' not in result
+    assert result['缺失值'] == 100
+    np.testing.assert_allclose(result['四分位数'], np.percentile(valid, [25, 50, 75]))
+
+
+def test_file_statistics_reads_csv_in_chunks(tmp_path, data):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'x': data[:5000], 'y': 'a'}).to_csv(path, index=False)
+    result = DataProcessor().file_statistics(str(path), 'x', chunk_size=700)
+    assert result['数据点数'] == 5000
+    np.testing.assert_allclose(result['平均值'], data[:5000].mean())
+    np.testing.assert_allclose(result['中位数'], np.median(data[:5000]))
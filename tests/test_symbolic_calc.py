@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""符号计算模块测试"""
+
+import pytest
+import sympy as sp
+
+from modules.symbolic_calc import SymbolicCalculator
+
+x, a = sp.symbols('x a')
+
+
+def test_definite_integral_matches_quad():
+    SymbolicCalculator._verify_integral(sp.exp(-x ** 2), x, (-sp.oo, sp.oo), sp.sqrt(sp.pi))
+    SymbolicCalculator._verify_integral(sp.log(x), x, (0, 1), sp.Integer(-1))
+
+
+def test_wrong_definite_integral_is_rejected():
+    with pytest.raises(ValueError):
+        SymbolicCalculator._verify_integral(sp.log(x), x, (0, 1), sp.Integer(1))
+
+
+def test_divergent_definite_integral_is_rejected():
+    # heurisch 用原函数 -1/x 在 [-1, 1] 上作差会得到 -2
+    with pytest.raises(ValueError):
+        SymbolicCalculator().integrate_with_strategy('heurisch', x ** -2, x, (-1, 1))
+
+
+def test_parametric_definite_integral_is_not_checked_numerically():
+    SymbolicCalculator._verify_integral(a * x, x, (0, 1), a / 2)
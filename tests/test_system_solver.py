@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""非线性方程组求解测试"""
+
+import numpy as np
+import pytest
+from scipy import special
+
+from modules import system_solver
+from modules.system_solver import SystemSolver, parse_system
+
+
+@pytest.fixture
+def solver():
+    solver = SystemSolver()
+    yield solver
+    solver.shutdown()
+
+
+def test_parse_system_accepts_equations_and_separators():
+    exprs, symbols = parse_system('x^2 + y^2 = 4; x == y')
+    assert [str(s) for s in symbols] == ['x', 'y']
+    assert len(exprs) == 2
+
+
+def test_parse_system_rejects_unlisted_symbols():
+    with pytest.raises(ValueError):
+        parse_system('x + a*y; x - y', 'x, y')
+
+
+def test_multistart_handles_special_functions(solver, monkeypatch):
+    # 跳过符号求解，直接走多起点数值求解
+    monkeypatch.setattr(SystemSolver, 'solve_symbolic', lambda self, exprs, symbols, timeout: [])
+    result = solver.solve('erf(x) - y; x + y - 1', 'x, y', num_starts=16)
+    assert result['方法'] == '多起点数值'
+    x, y = result['解'][0]
+    assert special.erf(x) == pytest.approx(y) and x + y == pytest.approx(1)
+
+
+def test_deduplicates_solutions_from_many_starts(solver, monkeypatch):
+    monkeypatch.setattr(SystemSolver, 'solve_symbolic', lambda self, exprs, symbols, timeout: [])
+    result = solver.solve('x**2 - 1; y - x', 'x, y', bounds=(-3, 3), num_starts=16)
+    np.testing.assert_allclose(result['解'], [[-1, -1], [1, 1]], atol=1e-8)
+    assert result['收敛起点数'].sum() <= 16
+
+
+def test_error_in_every_start_is_reported(solver, monkeypatch):
+    def broken(system):
+        def residual(x):
+            raise TypeError('cannot evaluate')
+        return residual, residual, True
+    monkeypatch.setattr(SystemSolver, 'solve_symbolic', lambda self, exprs, symbols, timeout: [])
+    monkeypatch.setattr(system_solver, '_compile_system', broken)
+    result = solver.solve('x - 1; y - 2', 'x, y', num_starts=8)
+    assert isinstance(result, str) and 'cannot evaluate' in result
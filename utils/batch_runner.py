@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量计算
+功能：从JSONL/CSV文件读取计算任务，在进程池中分发给各计算模块，结果完成一条输出一条
+"""
+
+import csv
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+# 任务中 module 字段可用的简称，也可以直接写类名或 'module:Class'（只限下列计算模块）
+MODULES = {
+    'symbolic': 'modules.symbolic_calc:SymbolicCalculator',
+    'numerical': 'modules.numerical_calc:NumericalCalculator',
+    'data': 'modules.data_processing:DataProcessor',
+    'ode': 'modules.ode_solver:ODESolver',
+}
+MODULES.update({target.split(':')[1]: target for target in list(MODULES.values())})
+
+# 每个工作进程内的计算模块实例，同一进程中的任务复用
+_instances = {}
+
+
+def read_jobs(path):
+    """逐条读取任务，不把整个文件读入内存
+
+    JSONL 每行一个对象：{"id", "module", "method", "args", "kwargs"}；
+    CSV 表头包含同名列，args/kwargs 列为JSON文本。空行和 # 开头的行被跳过。
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if os.path.splitext(path)[1].lower() == '.csv':
+            for index, row in enumerate(csv.DictReader(f)):
+                yield index, {
+                    'id': row.get('id') or index,
+                    'module': row.get('module', ''),
+                    'method': row.get('method', ''),
+                    'args': json.loads(row['args']) if row.get('args') else [],
+                    'kwargs': json.loads(row['kwargs']) if row.get('kwargs') else {},
+                }
+        else:
+            index = 0
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                yield index, json.loads(line)
+                index += 1
+
+
+def to_jsonable(value):
+    """把计算结果转换为可写入JSON的形式（数组转列表，sympy对象转字符串）"""
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return value if np.isfinite(value) else str(value)
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return to_jsonable(value.tolist())
+    if isinstance(value, np.generic):
+        return to_jsonable(value.item())
+    if isinstance(value, complex):
+        return {'实部': to_jsonable(value.real), '虚部': to_jsonable(value.imag)}
+    return str(value)
+
+
+def _is_error(result):
+    """计算模块以 "错误: ..." 字符串（或以其开头的列表/元组）表示失败"""
+    if isinstance(result, (list, tuple)) and result:
+        result = result[0]
+        if isinstance(result, (list, tuple)) and result:
+            result = result[0]
+    return isinstance(result, str) and result.startswith('错误')
+
+
+def run_job(job):
+    """执行一个任务，返回结果记录（在工作进程中调用）"""
+    started = time.perf_counter()
+    record = {'id': job.get('id'), 'module': job.get('module'), 'method': job.get('method')}
+    try:
+        module = job.get('module', '')
+        # 只允许调用计算器模块，任务文件不能借此导入任意模块
+        target = MODULES.get(module, module)
+        method = job.get('method', '')
+        if target not in MODULES.values():
+            raise ValueError(f"未知的计算模块: {module}")
+        if not method or method.startswith('_'):
+            raise ValueError(f"不允许调用的方法: {method}")
+        if target not in _instances:
+            module_name, class_name = target.split(':')
+            _instances[target] = getattr(importlib.import_module(module_name), class_name)()
+        result = getattr(_instances[target], method)(*job.get('args', []), **job.get('kwargs', {}))
+        record['成功'] = not _is_error(result)
+        record['结果'] = to_jsonable(result)
+    except Exception as e:
+        record['成功'] = False
+        record['结果'] = f"错误: {type(e).__name__}: {e}"
+    record['耗时'] = round(time.perf_counter() - started, 6)
+    return record
+
+
+def run_batch(jobs, output=sys.stdout, workers=None, max_in_flight=None):
+    """并行执行任务，每完成一个就写出一行JSON结果
+
+    jobs 为 (序号, 任务) 的可迭代对象（如 read_jobs 的返回值），按需读取；
+    同时提交到进程池的任务最多 max_in_flight 个（默认为进程数的4倍），
+    因此内存占用与任务总数无关。结果按完成顺序输出，带序号和任务id。
+    workers=1 时在当前进程中顺序执行。
+    返回汇总信息。
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    summary = {'总数': 0, '成功': 0, '失败': 0}
+    started = time.perf_counter()
+
+    def collect(future):
+        try:
+            return future.result()
+        except Exception as e:
+            # 工作进程崩溃或结果无法传回
+            return {'成功': False, '结果': f"错误: {type(e).__name__}: {e}", '耗时': None}
+
+    def emit(index, record):
+        record = {'序号': index, **record}
+        output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output.flush()
+        summary['总数'] += 1
+        summary['成功' if record['成功'] else '失败'] += 1
+
+    if workers == 1:
+        for index, job in jobs:
+            emit(index, run_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            for index, job in jobs:
+                if len(pending) >= max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        emit(pending.pop(future), collect(future))
+                pending[executor.submit(run_job, job)] = index
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    emit(pending.pop(future), collect(future))
+
+    summary['耗时'] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main(input_path, output_path=None, workers=None):
+    """命令行批量模式入口，结果写入 output_path（默认标准输出），汇总写入标准错误"""
+    output = open(output_path, 'w', encoding='utf-8') if output_path and output_path != '-' else sys.stdout
+    try:
+        summary = run_batch(read_jobs(input_path), output, workers)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    return 0 if summary['失败'] == 0 else 1
@@ -1,8 +1,11 @@
-import pandas as pd
 import numpy as np
-from openpyxl import Workbook
 import os
 
+from utils.lazy_import import lazy_import
+
+# pandas 在第一次读写文件时才导入，openpyxl 由pandas按需加载
+pd = lazy_import('pandas')
+
 class ExcelHandler:
     def __init__(self):
         pass
@@ -18,16 +21,54 @@ class ExcelHandler:
         """
         try:
             if chunk_size:
-                # 分块读取大文件
-                chunks = pd.read_excel(file_path, sheet_name=sheet_name, 
-                                      usecols=usecols, chunksize=chunk_size)
-                return chunks  # 返回迭代器，供后续处理
+                # 分块读取大文件（pd.read_excel 不支持 chunksize）
+                return self.iter_chunks(file_path, chunk_size, sheet_name=sheet_name, usecols=usecols)
             else:
                 df = pd.read_excel(file_path, sheet_name=sheet_name, usecols=usecols)
                 return df
         except Exception as e:
             return f"读取Excel文件错误: {str(e)}"
     
+    def iter_chunks(self, file_path, chunk_size=100_000, sheet_name=0, usecols=None):
+        """按块读取Excel/CSV文件，逐块产出DataFrame，内存占用只与块大小有关
+        
+        CSV 使用 pandas 的 chunksize；xlsx 用 openpyxl 只读模式逐行读取，
+        第一行为表头。
+        """
+        if os.path.splitext(file_path)[1].lower() == '.csv':
+            yield from pd.read_csv(file_path, usecols=usecols, chunksize=chunk_size)
+            return
+        
+        import openpyxl
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [str(name) if name is not None else f'Unnamed: {i}' for i, name in enumerate(header)]
+            indices = [i for i, name in enumerate(header) if usecols is None or name in usecols]
+            columns = [header[i] for i in indices]
+            
+            buffer = []
+            for row in rows:
+                buffer.append([row[i] if i < len(row) else None for i in indices])
+                if len(buffer) >= chunk_size:
+                    yield pd.DataFrame(buffer, columns=columns)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=columns)
+        finally:
+            workbook.close()
+    
+    def iter_column_chunks(self, file_path, column, chunk_size=100_000, sheet_name=0):
+        """按块读取一列，逐块产出浮点数组（非数值记为NaN），用于流式统计和频谱分析"""
+        for chunk in self.iter_chunks(file_path, chunk_size, sheet_name=sheet_name, usecols=[column]):
+            if column not in chunk.columns:
+                raise KeyError(f"列 '{column}' 不存在")
+            yield pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=float)
+    
     def write_excel(self, data, file_path, sheet_name='Sheet1', mode='w'):
         """写入Excel文件
         
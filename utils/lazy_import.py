@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟导入
+功能：重量级依赖在第一次使用时才导入，并记录每个模块的导入耗时
+"""
+
+import contextlib
+import importlib
+import sys
+import threading
+import time
+import types
+
+# 进程启动基准时间（本模块应尽早被导入）
+_START = time.perf_counter()
+_lock = threading.RLock()
+# 已触发的延迟导入：(模块名, 耗时秒数, 触发时刻距启动的秒数)
+_import_log = []
+# 启动阶段耗时：(阶段名, 耗时秒数)
+_phase_log = []
+
+
+class LazyModule(types.ModuleType):
+    """模块代理，第一次访问属性时才真正导入
+
+    导入后把真实模块的属性复制到代理上，之后的属性访问没有额外开销。
+    on_import 在导入完成后以真实模块为参数调用一次，用于导入后的配置。
+    """
+
+    def __init__(self, name, on_import=None):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_on_import'] = on_import
+
+    def _load(self):
+        with _lock:
+            module = self.__dict__['_lazy_module']
+            if module is not None:
+                return module
+            already_loaded = self.__name__ in sys.modules
+            started = time.perf_counter()
+            module = importlib.import_module(self.__name__)
+            elapsed = time.perf_counter() - started
+            # 只记录真正发生的导入，其他代理或普通import已加载的不重复计入
+            if not already_loaded:
+                _import_log.append((self.__name__, elapsed, started - _START))
+            self.__dict__.update(module.__dict__)
+            self.__dict__['_lazy_module'] = module
+            on_import = self.__dict__['_lazy_on_import']
+            if on_import is not None:
+                on_import(module)
+            return module
+
+    def __getattr__(self, name):
+        # 真实模块上后来才出现的属性（如之后导入的子模块）直接转发
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = '已导入' if self.__dict__['_lazy_module'] is not None else '未导入'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name, on_import=None):
+    """返回延迟导入的模块代理；模块已导入时直接返回模块本身"""
+    module = sys.modules.get(name)
+    if module is not None and on_import is None:
+        return module
+    return LazyModule(name, on_import)
+
+
+def is_loaded(module):
+    """代理是否已经触发导入"""
+    if isinstance(module, LazyModule):
+        return module.__dict__['_lazy_module'] is not None
+    return True
+
+
+@contextlib.contextmanager
+def startup_phase(label):
+    """记录一个启动阶段的耗时
+
+    用法:
+        with startup_phase('创建主窗口'):
+            ...
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phase_log.append((label, time.perf_counter() - started))
+
+
+def import_log():
+    """已触发的延迟导入记录的副本"""
+    with _lock:
+        return list(_import_log)
+
+
+def startup_report():
+    """启动耗时报告（文本），包括各启动阶段和各延迟导入的耗时
+
+    导入耗时包含其依赖的导入时间；嵌套触发的导入会同时计入外层模块。
+    """
+    lines = [f"启动至今: {time.perf_counter() - _START:.3f} 秒"]
+    if _phase_log:
+        lines.append("启动阶段:")
+        lines.extend(f"  {label:<20} {elapsed * 1000:8.1f} ms" for label, elapsed in _phase_log)
+    entries = import_log()
+    if entries:
+        lines.append("延迟导入（按耗时排序）:")
+        for name, elapsed, at in sorted(entries, key=lambda e: -e[1]):
+            lines.append(f"  {name:<40} {elapsed * 1000:8.1f} ms  (第 {at:.2f} 秒触发)")
+    else:
+        lines.append("尚未触发任何延迟导入")
+    return '\n'.join(lines)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+沙箱计算进程池
+功能：在可复用的工作进程中执行计算，支持超时、内存上限和取消
+"""
+
+import importlib
+import multiprocessing
+import time
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不限制内存
+    resource = None
+
+
+class SandboxError(Exception):
+    """沙箱计算失败"""
+
+
+class SandboxTimeout(SandboxError):
+    """计算超时，工作进程已被终止"""
+
+
+class SandboxCancelled(SandboxError):
+    """计算被取消，工作进程已被终止"""
+
+
+def _resolve_target(target, instances):
+    """解析 'module:Name'，类会被实例化一次并在工作进程内复用"""
+    if target not in instances:
+        module_name, _, attr = target.partition(':')
+        obj = getattr(importlib.import_module(module_name), attr)
+        instances[target] = obj() if isinstance(obj, type) else obj
+    return instances[target]
+
+
+def _worker_main(conn, memory_limit, warm_imports):
+    """工作进程主循环"""
+    if resource is not None and memory_limit:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ValueError, OSError):
+            pass
+    for module_name in warm_imports:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+    # 通知主进程预热完成，任务的超时从此时开始计算
+    conn.send(('ready', None))
+
+    instances = {}
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+        target, method, args, kwargs = message
+        try:
+            obj = _resolve_target(target, instances)
+            func = getattr(obj, method) if method else obj
+            reply = ('ok', func(*args, **kwargs))
+        except MemoryError:
+            reply = ('error', "内存超出限制")
+        except BaseException as e:
+            reply = ('error', f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # 结果无法序列化时只返回错误信息
+            conn.send(('error', f"结果无法传回主进程: {e}"))
+
+
+class _Worker:
+    def __init__(self, context, memory_limit, warm_imports):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit, warm_imports), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.busy = False
+        # 收到工作进程的 'ready' 消息后为True
+        self.ready = False
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(0.5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class SandboxJob:
+    """提交到沙箱的一次计算
+
+    超时从工作进程完成预热导入后开始计算，导入 sympy/scipy 的时间不占用计算的时间预算。
+    """
+
+    def __init__(self, pool, worker, timeout):
+        self._pool = pool
+        self._worker = worker
+        self._timeout = timeout
+        self._deadline = None
+        self._finished = False
+        self._value = None
+        self._error = None
+        self.started = time.monotonic()
+        self.elapsed = None
+        if worker.ready:
+            self._start_clock()
+
+    def _start_clock(self):
+        if self._timeout:
+            self._deadline = time.monotonic() + self._timeout
+
+    def done(self):
+        """非阻塞检查是否结束（完成、出错、超时或取消）"""
+        if self._finished:
+            return True
+        while not self._finished and self._worker.conn.poll():
+            self._receive()
+        if not self._finished and self._deadline is not None and time.monotonic() >= self._deadline:
+            self._abort(SandboxTimeout("计算超时，已终止"))
+        return self._finished
+
+    def result(self, timeout=None):
+        """等待并返回计算结果，失败时抛出 SandboxError"""
+        wait_until = time.monotonic() + timeout if timeout is not None else None
+        while not self._finished:
+            limits = [t for t in (self._deadline, wait_until) if t is not None]
+            remaining = max(0.0, min(limits) - time.monotonic()) if limits else None
+            if self._worker.conn.poll(remaining):
+                self._receive()
+            elif self._deadline is not None and time.monotonic() >= self._deadline:
+                self._abort(SandboxTimeout("计算超时，已终止"))
+            elif wait_until is not None and time.monotonic() >= wait_until:
+                raise TimeoutError("等待结果超时")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def cancel(self):
+        """取消计算，终止正在执行的工作进程"""
+        if not self._finished:
+            self._abort(SandboxCancelled("计算已取消"))
+
+    @property
+    def cancelled(self):
+        return isinstance(self._error, SandboxCancelled)
+
+    def _receive(self):
+        try:
+            status, payload = self._worker.conn.recv()
+        except (EOFError, OSError):
+            self._abort(SandboxError("工作进程异常退出（可能超出内存限制）"))
+            return
+        if status == 'ready':
+            self._worker.ready = True
+            self._start_clock()
+            return
+        if status == 'ok':
+            self._value = payload
+        else:
+            self._error = SandboxError(payload)
+        self._finish()
+        self._pool._release(self._worker)
+
+    def _abort(self, error):
+        self._error = error
+        self._finish()
+        self._pool._discard(self._worker)
+
+    def _finish(self):
+        self._finished = True
+        self.elapsed = time.monotonic() - self.started
+
+
+class SandboxPool:
+    """可复用的沙箱工作进程池
+
+    参数:
+        size: 常驻的预热进程数
+        max_workers: 同时运行的最大进程数
+        timeout: 默认超时秒数，None 表示不限制；从工作进程预热完成后开始计时
+        memory_limit_mb: 每个工作进程的地址空间上限（仅支持类Unix系统）
+        warm_imports: 工作进程启动时预先导入的模块
+    """
+
+    def __init__(self, size=1, max_workers=4, timeout=10.0, memory_limit_mb=2048,
+                 warm_imports=('numpy',)):
+        self.size = size
+        self.max_workers = max(size, max_workers)
+        self.timeout = timeout
+        self.memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self.warm_imports = tuple(warm_imports)
+        self._context = multiprocessing.get_context('spawn')
+        self._workers = []
+        for _ in range(size):
+            self._spawn()
+
+    def submit(self, target, method=None, /, *args, timeout=None, **kwargs):
+        """提交计算，立即返回 SandboxJob
+
+        target: 'module:Class'（在工作进程中实例化并复用）或 'module:function'
+        method: target 为类时要调用的方法名
+        target、method 只能按位置传入，调用的方法自己的 method= 等关键字参数原样转发
+        """
+        worker = next((w for w in self._workers if not w.busy), None)
+        if worker is None:
+            if len(self._workers) >= self.max_workers:
+                raise SandboxError("工作进程全部忙碌，请稍后再试")
+            worker = self._spawn()
+        worker.busy = True
+        job = SandboxJob(self, worker, self.timeout if timeout is None else timeout)
+        try:
+            worker.conn.send((target, method, args, kwargs))
+        except Exception as e:
+            job._abort(SandboxError(f"任务无法发送到工作进程: {e}"))
+        return job
+
+    def call(self, target, method=None, /, *args, timeout=None, **kwargs):
+        """提交计算并等待结果"""
+        return self.submit(target, method, *args, timeout=timeout, **kwargs).result()
+
+    def shutdown(self):
+        """关闭全部工作进程"""
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except Exception:
+                pass
+        for worker in self._workers:
+            worker.process.join(0.5)
+            if worker.process.is_alive():
+                worker.kill()
+        self._workers = []
+
+    def _spawn(self):
+        worker = _Worker(self._context, self.memory_limit, self.warm_imports)
+        self._workers.append(worker)
+        return worker
+
+    def _release(self, worker):
+        worker.busy = False
+
+    def _discard(self, worker):
+        """终止失控的工作进程，并补足常驻进程数"""
+        if worker in self._workers:
+            self._workers.remove(worker)
+        worker.kill()
+        if len(self._workers) < self.size:
+            self._spawn()